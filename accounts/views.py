@@ -2,30 +2,49 @@ from django.shortcuts import render
 
 # Create your views here.
 # accounts/views.py
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.template.response import TemplateResponse
 from .forms import CustomUserCreationForm
 from clubs.models import Club
 from announcements.models import Announcement
-from django.db.models import Avg, Count # For average rating and member count on home
+from django.db.models import F # For ordering featured clubs on home
+from feedback.models import RatingSummary
+from college_club_management.asyncviews import as_list
+from college_club_management.caching import cached_compute
 
-def home(request):
-    global_announcements = Announcement.objects.filter(is_global=True).order_by('-created_at')[:5]
-    
+FEATURED_CLUBS_CACHE_SECONDS = 300
+
+def featured_clubs():
     # Order featured clubs by average rating (if available) or by member count
-    featured_clubs = Club.objects.annotate(
-        avg_rating=Avg('ratings__rating'),
-        member_count=Count('members')
-    ).order_by('-avg_rating', '-member_count')[:3] # Prioritize avg rating, then member count
+    # Ratings come from the denormalized RatingSummary rows and member_count is a maintained
+    # column, so neither needs an aggregate over the Rating or membership tables
+    return list(Club.objects.annotate(
+        **RatingSummary.annotations_for(Club)
+    ).order_by(F('avg_rating').desc(nulls_last=True), '-member_count')[:3]) # Prioritize avg rating, then member count
+
+async def home(request):
+    # Async under ASGI: the announcements and featured clubs are fetched concurrently, and
+    # the TemplateResponse is rendered by Django in a thread (templates are sync)
+    global_announcements = Announcement.objects.filter(is_global=True).order_by('-created_at')[:5]
 
+    # The featured clubs are the same for everyone, so they're shared through the cache; when they
+    # expire, one request recomputes them while the others keep getting the previous list
+    global_announcements, featured = await asyncio.gather(
+        as_list(global_announcements),
+        sync_to_async(cached_compute)('home:featured_clubs', FEATURED_CLUBS_CACHE_SECONDS, featured_clubs),
+    )
     context = {
         'global_announcements': global_announcements,
-        'featured_clubs': featured_clubs,
+        'featured_clubs': featured,
     }
-    return render(request, 'home.html', context)
+    return TemplateResponse(request, 'home.html', context)
 
 def signup(request):
     if request.method == 'POST':
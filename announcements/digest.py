@@ -0,0 +1,145 @@
+# announcements/digest.py
+"""
+Daily email digest of new announcements and upcoming events.
+
+A digest's content depends only on which clubs a user can see (the same
+joined + managed rule as the announcement feed), so each distinct club set
+is rendered once and the rendered message reused for every user sharing it.
+Users are streamed in primary-key order with their memberships joined in
+(one query, .iterator()), so memory stays flat however many students there
+are, and messages are sent in batches over a single reused mail connection.
+"""
+import logging
+from collections import defaultdict
+from datetime import time, timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import FilteredRelation, IntegerField, Q, Value
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from clubs.models import Club
+from events.models import Event
+from .models import Announcement
+
+logger = logging.getLogger(__name__)
+
+
+class DigestContent:
+    """New announcements and upcoming events in the digest window, bucketed by club."""
+
+    def __init__(self, since, days_ahead=7):
+        today = timezone.localdate()
+        self.since = since
+        self.until = today + timedelta(days=days_ahead)
+        announcements = Announcement.objects.filter(created_at__gte=since).select_related('club').order_by('-created_at', 'id')
+        events = Event.objects.filter(date__gte=today, date__lte=self.until, club__isnull=False).select_related('club')
+
+        self.global_announcements = []
+        self.announcements_by_club = defaultdict(list)
+        for announcement in announcements:
+            if announcement.is_global:
+                self.global_announcements.append(announcement)
+            elif announcement.club_id:
+                self.announcements_by_club[announcement.club_id].append(announcement)
+        self.events_by_club = defaultdict(list)
+        for event in events.order_by('date', 'time', 'id'):
+            self.events_by_club[event.club_id].append(event)
+        self.club_ids = frozenset(self.announcements_by_club) | frozenset(self.events_by_club)
+        self.managed = defaultdict(set) # manager id -> clubs with content they manage
+        for club_id, manager_id in Club.objects.filter(pk__in=self.club_ids, manager__isnull=False).order_by().values_list('pk', 'manager_id'):
+            self.managed[manager_id].add(club_id)
+
+    def is_empty(self):
+        return not self.global_announcements and not self.club_ids
+
+    def for_clubs(self, club_ids):
+        """Template context for a user who can see club_ids (a subset of self.club_ids)."""
+        announcements = list(self.global_announcements)
+        events = []
+        for club_id in club_ids:
+            announcements.extend(self.announcements_by_club.get(club_id, ()))
+            events.extend(self.events_by_club.get(club_id, ()))
+        announcements.sort(key=lambda announcement: announcement.created_at, reverse=True)
+        events.sort(key=lambda event: (event.date, event.time or time.min))
+        return {'announcements': announcements, 'events': events, 'since': self.since, 'until': self.until}
+
+
+def iter_recipients(content):
+    """
+    Yields (email, frozenset of visible club IDs with content) for every active
+    user with an email address, streaming users and their relevant memberships
+    in a single ordered query.
+    """
+    users = get_user_model().objects.filter(is_active=True).exclude(email='').order_by('pk')
+    if content.club_ids:
+        users = users.annotate(
+            relevant=FilteredRelation('memberships', condition=Q(memberships__club_id__in=content.club_ids))
+        ).values_list('pk', 'email', 'user_type', 'relevant__club_id')
+    else:
+        # Only global announcements: an empty IN condition would make the join match no users at all
+        users = users.annotate(relevant_club_id=Value(None, output_field=IntegerField())).values_list(
+            'pk', 'email', 'user_type', 'relevant_club_id')
+    for (pk, email, user_type), rows in groupby(users.iterator(chunk_size=2000), key=lambda row: row[:3]):
+        if user_type == 'college_admin':
+            club_ids = content.club_ids # Admins see every club's announcements in the feed too
+        else:
+            club_ids = frozenset(row[3] for row in rows if row[3] is not None) | content.managed.get(pk, frozenset())
+        yield email, frozenset(club_ids)
+
+
+def render_digest(context):
+    """Returns (subject, text body, html body) for one digest."""
+    count = len(context['announcements']) + len(context['events'])
+    subject = f"Your club digest: {count} update{'s' if count != 1 else ''}"
+    context = {**context, 'site_url': getattr(settings, 'SITE_URL', '').rstrip('/')}
+    return (
+        subject,
+        render_to_string('announcements/email/digest.txt', context),
+        render_to_string('announcements/email/digest.html', context),
+    )
+
+
+def send_digests(since, days_ahead=7, batch_size=200, connection=None, dry_run=False):
+    """
+    Builds and sends the digest for the window starting at since. Returns
+    (messages sent, distinct digests rendered). Users with nothing new get no email.
+    """
+    content = DigestContent(since, days_ahead)
+    if content.is_empty():
+        return 0, 0
+
+    rendered = {} # club set -> (subject, text, html), or None when that set has nothing new
+    sent = 0
+    batch = []
+    connection = connection or get_connection()
+    from_email = settings.DEFAULT_FROM_EMAIL
+
+    def flush():
+        nonlocal sent, batch
+        if batch and not dry_run:
+            sent += connection.send_messages(batch) or 0
+        elif batch:
+            sent += len(batch)
+        batch = []
+
+    with connection: # Opened once, reused for every batch
+        for email, club_ids in iter_recipients(content):
+            if club_ids not in rendered:
+                context = content.for_clubs(club_ids)
+                rendered[club_ids] = render_digest(context) if context['announcements'] or context['events'] else None
+            digest = rendered[club_ids]
+            if digest is None:
+                continue
+            subject, text, html = digest
+            message = EmailMultiAlternatives(subject, text, from_email, [email], connection=connection)
+            message.attach_alternative(html, 'text/html')
+            batch.append(message)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    logger.info("Sent %s digest emails from %s distinct digests", sent, len(rendered))
+    return sent, len(rendered)
@@ -0,0 +1,56 @@
+# announcements/feed.py
+"""
+Per-user announcement feed.
+
+A user's visible club set (joined + managed clubs) is resolved once and cached,
+so the list and detail views filter with a plain IN-list over indexed columns
+instead of re-running membership subqueries (and DISTINCT) on every request.
+The cached set is dropped by announcements.signals whenever the user joins or
+leaves a club or a club's manager changes.
+"""
+from django.core.cache import cache
+from django.db.models import Q
+
+from clubs.models import user_club_ids
+from .models import Announcement
+
+VISIBLE_CLUBS_CACHE_TIMEOUT = 60 * 60 # Invalidated explicitly, so this is only a safety net
+
+
+def _visible_clubs_key(user_id):
+    return f'announcements:visible_clubs:{user_id}'
+
+
+def visible_club_ids(user):
+    """Returns the sorted list of club IDs whose announcements user may see."""
+    if not user.is_authenticated:
+        return []
+    key = _visible_clubs_key(user.pk)
+    club_ids = cache.get(key)
+    if club_ids is None:
+        joined_ids, managed_ids = user_club_ids(user)
+        club_ids = sorted(joined_ids | managed_ids)
+        cache.set(key, club_ids, VISIBLE_CLUBS_CACHE_TIMEOUT)
+    return club_ids
+
+
+def invalidate_visible_clubs(*user_ids):
+    """Drops the cached visible club set for the given users."""
+    cache.delete_many([_visible_clubs_key(user_id) for user_id in user_ids if user_id])
+
+
+def visible_announcements(user):
+    """
+    Announcements user may see, newest first, with author and club joined in.
+    College admins see everything; everyone else sees global announcements plus
+    those of their clubs. Each branch of the filter is served by one of the
+    (is_global, created_at) / (club, created_at) indexes on Announcement.
+    """
+    queryset = Announcement.objects.select_related('author', 'club').order_by('-created_at', 'id')
+    if user.is_authenticated and getattr(user, 'user_type', None) == 'college_admin':
+        return queryset # Admins see all, no specific filter needed
+
+    club_ids = visible_club_ids(user)
+    if not club_ids:
+        return queryset.filter(is_global=True)
+    return queryset.filter(Q(is_global=True) | Q(club_id__in=club_ids))
@@ -0,0 +1,210 @@
+# announcements/live.py
+"""
+Live announcement stream (Server-Sent Events, see views.announcement_stream).
+
+Each new announcement is published once, after its transaction commits
+(announcements.signals), as a small JSON event. Every worker process keeps
+one Broadcaster, which hands events to the streams connected to it. A
+stream is a coroutine waiting on its own asyncio.Queue, so an idle
+connection holds no thread.
+
+How events reach every worker's broadcaster depends on the database:
+- PostgreSQL: published with NOTIFY on CHANNEL. Each worker LISTENs on one
+  dedicated connection that the event loop watches (psycopg2, as pinned in
+  requirements.txt). It fans out whatever arrives, its own events included.
+- Anything else (SQLite in development): delivered in-process only.
+  Announcements saved by another process, such as a second worker or the
+  job worker, show up when the stream next reconnects.
+
+Streams close after ANNOUNCEMENT_STREAM_MAX_SECONDS. The browser reconnects
+with Last-Event-ID and the view replays what was missed, so gaps (including
+a LISTEN connection being re-established) are filled, and changes to the
+user's club memberships are picked up.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.text import Truncator
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'announcements'
+QUEUE_SIZE = 100 # Events a stream may fall behind by before it is closed (and replays on reconnect)
+LISTEN_RETRY_SECONDS = 5
+
+
+def uses_notify():
+    return connections[DEFAULT_DB_ALIAS].vendor == 'postgresql'
+
+
+def serialize(announcement):
+    """The event sent for an announcement. Also what a stream filters on, so it carries is_global and club_id."""
+    return {
+        'id': announcement.pk,
+        'title': announcement.title,
+        'content': Truncator(announcement.content).chars(200), # Keeps NOTIFY payloads well under 8000 bytes
+        'is_global': announcement.is_global,
+        'club_id': announcement.club_id,
+        'club': announcement.club.title if announcement.club_id else None,
+        'author': announcement.author.username if announcement.author_id else None,
+        'created_at': announcement.created_at.isoformat(),
+        'url': announcement.get_absolute_url(),
+    }
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: announcement\ndata: {json.dumps(event)}\n\n"
+
+
+class Subscription:
+    """One connected stream: its queue, and the event loop the queue belongs to."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, event):
+        # Runs on self.loop. A stream this far behind is closed rather than growing without bound
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broadcaster:
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock() # dispatch() is called from sync threads as well as the event loop
+        self._listener = None
+
+    def subscribe(self):
+        """Registers a stream on the running event loop (starting this worker's LISTEN task if needed)."""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(loop)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        if uses_notify() and (self._listener is None or self._listener.done()):
+            self._listener = loop.create_task(PostgresListener(self).run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, event):
+        """Hands event to every stream in this process. Safe to call from any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                self.unsubscribe(subscription) # Its loop has been closed
+
+
+broadcaster = Broadcaster()
+
+
+class PostgresListener:
+    """LISTENs on CHANNEL over a dedicated connection, read when the event loop sees it's readable."""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                connection = await sync_to_async(self.connect, thread_sensitive=False)()
+            except Exception:
+                logger.exception("Could not LISTEN for announcements; retrying in %ss", LISTEN_RETRY_SECONDS)
+                await asyncio.sleep(LISTEN_RETRY_SECONDS)
+                continue
+            lost = loop.create_future()
+            loop.add_reader(connection.fileno(), self.read, connection, lost)
+            try:
+                await lost
+            finally:
+                loop.remove_reader(connection.fileno())
+                connection.close()
+            logger.warning("Announcement LISTEN connection lost; reconnecting")
+
+    @staticmethod
+    def connect():
+        # A connection of its own, outside Django's per-thread handling, kept in autocommit so LISTEN takes effect
+        wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+        connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        return connection
+
+    def read(self, connection, lost):
+        try:
+            connection.poll()
+        except Exception:
+            if not lost.done():
+                lost.set_result(None)
+            return
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self.broadcaster.dispatch(event)
+
+
+def publish(announcement):
+    """Sends a new announcement to every connected stream. Called once its transaction has committed."""
+    event = serialize(announcement)
+    if uses_notify():
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(event)])
+    else:
+        broadcaster.dispatch(event)
+
+
+def visible_to(event, club_ids, global_only=False):
+    """club_ids None means every announcement (college admins)."""
+    if global_only:
+        return event['is_global']
+    return club_ids is None or event['is_global'] or event['club_id'] in club_ids
+
+
+def preamble(replay, retry_ms):
+    """The start of every stream: how long the browser waits before reconnecting, then the replayed events."""
+    return f'retry: {retry_ms}\n\n' + ''.join(format_event(event) for event in replay)
+
+
+async def stream(subscription, replay, accepts):
+    """
+    The SSE body: the preamble, then live events and keepalive comments until
+    the stream times out, falls too far behind or the client disconnects.
+    """
+    last_id = max((event['id'] for event in replay), default=0)
+    try:
+        yield preamble(replay, settings.ANNOUNCEMENT_STREAM_RETRY_MS)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ANNOUNCEMENT_STREAM_MAX_SECONDS
+        while not subscription.overflowed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), min(remaining, settings.ANNOUNCEMENT_STREAM_HEARTBEAT_SECONDS))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n' # Keeps proxies from closing an idle connection
+                continue
+            # Subscribed before the replay query ran, so skip anything it already sent
+            if event['id'] > last_id and accepts(event):
+                last_id = event['id']
+                yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
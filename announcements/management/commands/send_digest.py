@@ -0,0 +1,29 @@
+# announcements/management/commands/send_digest.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from announcements.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = "Emails every user a digest of new announcements and upcoming events for their clubs. Run once a day (e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Include announcements posted in the last N hours.")
+        parser.add_argument('--days-ahead', type=int, default=7, help="Include events in the next N days.")
+        parser.add_argument('--batch-size', type=int, default=200, help="Messages handed to the mail backend per call.")
+        parser.add_argument('--dry-run', action='store_true', help="Render digests and count recipients without sending.")
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        sent, rendered = send_digests(
+            since=started - timedelta(hours=options['hours']),
+            days_ahead=options['days_ahead'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = (timezone.now() - started).total_seconds()
+        verb = "Would send" if options['dry_run'] else "Sent"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sent} digest(s) from {rendered} distinct digest(s) in {elapsed:.1f}s."))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0002_alter_announcement_options_and_more'),
+        ('clubs', '0002_single_membership_table'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['is_global', '-created_at'], name='announce_global_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['club', '-created_at'], name='announce_club_created_idx'),
+        ),
+    ]
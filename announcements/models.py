@@ -27,6 +27,11 @@ class Announcement(models.Model):
 
     class Meta:
         ordering = ['-created_at'] # Order by most recent first
+        indexes = [
+            # Back the two branches of the per-user feed (see announcements/feed.py)
+            models.Index(fields=['is_global', '-created_at'], name='announce_global_created_idx'),
+            models.Index(fields=['club', '-created_at'], name='announce_club_created_idx'),
+        ]
         verbose_name = "Announcement"
         verbose_name_plural = "Announcements"
 
@@ -0,0 +1,43 @@
+# announcements/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from clubs.models import Club, ClubMembership
+from clubs.signals import memberships_imported
+from . import live
+from .feed import invalidate_visible_clubs
+from .models import Announcement
+
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def membership_changed(sender, instance, **kwargs):
+    # Joining or leaving a club changes which club announcements the user sees
+    invalidate_visible_clubs(instance.user_id)
+
+@receiver(memberships_imported)
+def memberships_bulk_imported(sender, club, user_ids, **kwargs):
+    invalidate_visible_clubs(*user_ids)
+
+@receiver(pre_save, sender=Club)
+def remember_previous_manager(sender, instance, **kwargs):
+    instance._previous_manager_id = None
+    if instance.pk:
+        instance._previous_manager_id = Club.objects.filter(pk=instance.pk).values_list('manager_id', flat=True).first()
+
+@receiver(post_save, sender=Club)
+def club_manager_changed(sender, instance, created, **kwargs):
+    previous_manager_id = getattr(instance, '_previous_manager_id', None)
+    if created or previous_manager_id != instance.manager_id:
+        invalidate_visible_clubs(previous_manager_id, instance.manager_id)
+
+@receiver(post_delete, sender=Club)
+def club_deleted(sender, instance, **kwargs):
+    # Memberships cascade (and invalidate their users); the manager has no membership row
+    invalidate_visible_clubs(instance.manager_id)
+
+@receiver(post_save, sender=Announcement)
+def announcement_created(sender, instance, created, **kwargs):
+    # Pushed to live streams only once committed, so a rolled-back announcement is never shown
+    if created:
+        transaction.on_commit(lambda: live.publish(instance))
@@ -1,3 +1,73 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from clubs.models import Club
+from .digest import send_digests
+from .models import Announcement
+
+User = get_user_model()
+
+
+class DigestRecipientsTests(TestCase):
+    def setUp(self):
+        self.since = timezone.now() - timedelta(days=1)
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', user_type='college_admin')
+        self.manager = User.objects.create_user('manager', 'manager@example.com', 'pw', user_type='club_officer')
+        self.member = User.objects.create_user('member', 'member@example.com', 'pw')
+        self.outsider = User.objects.create_user('outsider', 'outsider@example.com', 'pw')
+        User.objects.create_user('no_email', '', 'pw')
+        User.objects.create_user('inactive', 'inactive@example.com', 'pw', is_active=False)
+        self.club = Club.objects.create(title='Chess', description='Chess club', manager=self.manager)
+        self.club.add_member(self.member)
+
+    def recipients(self):
+        return sorted(address for message in mail.outbox for address in message.to)
+
+    def test_global_only_digest_goes_to_every_active_user_with_email(self):
+        Announcement.objects.create(title='Campus closed', content='Snow day', author=self.admin, is_global=True)
+
+        sent, rendered = send_digests(self.since)
+
+        self.assertEqual((sent, rendered), (4, 1))
+        self.assertEqual(self.recipients(), [
+            'admin@example.com', 'manager@example.com', 'member@example.com', 'outsider@example.com',
+        ])
+
+    def test_club_announcement_reaches_members_manager_and_admins_only(self):
+        Announcement.objects.create(title='Tournament', content='Saturday', author=self.manager,
+                                    is_global=False, club=self.club)
+
+        sent, _ = send_digests(self.since)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(self.recipients(), ['admin@example.com', 'manager@example.com', 'member@example.com'])
+        self.assertIn('Tournament', mail.outbox[0].body)
+
+    def test_nothing_new_sends_nothing(self):
+        self.assertEqual(send_digests(self.since), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+class AnnouncementCursorPaginationTests(TestCase):
+    def test_pages_follow_newest_first_with_ties_broken_by_id(self):
+        author = User.objects.create_user('admin', 'admin@example.com', None, user_type='college_admin')
+        now = timezone.now()
+        for n in range(23):
+            announcement = Announcement.objects.create(title=f'News {n}', content='', author=author, is_global=True)
+            # Groups of three share a timestamp, so the descending created_at needs the ascending id to split them
+            Announcement.objects.filter(pk=announcement.pk).update(created_at=now - timedelta(minutes=n // 3))
+        expected = list(Announcement.objects.order_by('-created_at', 'id'))
+
+        seen, query = [], '?cursor='
+        while query:
+            response = self.client.get(reverse('announcement_list') + query)
+            seen.extend(response.context['announcements'])
+            query = response.context['next_page_url'] # Relative: just the query string
+
+        self.assertEqual(seen, expected)
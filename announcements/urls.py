@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     path('', views.AnnouncementListView.as_view(), name='announcement_list'),
     path('<int:pk>/', views.AnnouncementDetailView.as_view(), name='announcement_detail'),
+    path('stream/', views.announcement_stream, name='announcement_stream'), # Server-Sent Events, see announcements/live.py
     path('create/', views.AnnouncementCreateView.as_view(), name='announcement_create'),
     path('<int:pk>/update/', views.AnnouncementUpdateView.as_view(), name='announcement_update'),
     path('<int:pk>/delete/', views.AnnouncementDeleteView.as_view(), name='announcement_delete'),
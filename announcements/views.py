@@ -1,13 +1,20 @@
 # announcements/views.py
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import get_object_or_404
-from django.db.models import Q # For complex queries
 
 from .models import Announcement
 from .forms import AnnouncementForm
-from clubs.models import Club # For filtering by club
+from .feed import visible_announcements, visible_club_ids
+from . import live
+from college_club_management.pagination import CursorPaginationMixin
+from college_club_management.asyncviews import request_user
 
 # Custom Mixins for Permissions (assuming you have these or similar)
 # college_club_management/decorators.py
@@ -20,38 +27,33 @@ from clubs.models import Club # For filtering by club
 #         return self.request.user.is_authenticated and self.request.user.user_type == 'club_manager'
 
 
-class AnnouncementListView(ListView):
+class SingleFetchObjectMixin:
+    """Loads the announcement once for both test_func and the view itself."""
+    def get_object(self, queryset=None):
+        if getattr(self, '_announcement', None) is None:
+            self._announcement = super().get_object(queryset)
+        return self._announcement
+
+
+class AnnouncementListView(CursorPaginationMixin, ListView):
     model = Announcement
     template_name = 'announcements/announcement_list.html'
     context_object_name = 'announcements'
     paginate_by = 10 # Display 10 announcements per page
+    cursor_ordering = ('-created_at', 'id') # Keyset for ?cursor= pagination
+    cursor_count_mode = 'estimated'
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
-        # Filter for global announcements
-        q_global = Q(is_global=True)
-        
-        # Filter for announcements specific to clubs the user is involved with
-        q_user_clubs = Q()
-        if self.request.user.is_authenticated:
-            # If user is a member of any club
-            if hasattr(self.request.user, 'joined_clubs'): # Assuming your CustomUser has 'joined_clubs'
-                user_club_ids = self.request.user.joined_clubs.values_list('id', flat=True)
-                q_user_clubs |= Q(club__id__in=user_club_ids)
-
-            # If user is a manager of any club
-            if hasattr(self.request.user, 'managed_clubs'): # Assuming your CustomUser has 'managed_clubs'
-                managed_club_ids = self.request.user.managed_clubs.values_list('id', flat=True)
-                q_user_clubs |= Q(club__id__in=managed_club_ids)
-            
-            # If user is a College Admin, they see all announcements
-            if hasattr(self.request.user, 'user_type') and self.request.user.user_type == 'college_admin':
-                return queryset.order_by('-created_at') # Admins see all, no specific filter needed
-
-        # Combine global and user-specific club announcements
-        # Use .distinct() to prevent duplicates if an announcement matches multiple criteria
-        return queryset.filter(q_global | q_user_clubs).order_by('-created_at').distinct()
+        # Global announcements plus those of the user's clubs (cached visible set, no subqueries or DISTINCT)
+        return visible_announcements(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Evaluated once here, so the newest id the live stream starts after costs no extra query
+        announcements = list(context['object_list'])
+        context['object_list'] = context[self.context_object_name] = announcements
+        context['newest_announcement_id'] = max((announcement.pk for announcement in announcements), default=0)
+        return context
 
 
 class AnnouncementDetailView(DetailView):
@@ -61,24 +63,8 @@ class AnnouncementDetailView(DetailView):
     pk_url_kwarg = 'pk'
 
     def get_queryset(self):
-        # Ensure only relevant announcements are viewable
-        queryset = super().get_queryset()
-        if self.request.user.is_authenticated:
-            # College Admins can view any announcement
-            if self.request.user.user_type == 'college_admin':
-                return queryset
-            
-            # Other users can view global announcements or announcements for their clubs
-            q_user_specific = Q(is_global=True)
-            if hasattr(self.request.user, 'joined_clubs'):
-                q_user_specific |= Q(club__in=self.request.user.joined_clubs.all())
-            if hasattr(self.request.user, 'managed_clubs'):
-                q_user_specific |= Q(club__in=self.request.user.managed_clubs.all())
-            
-            return queryset.filter(q_user_specific)
-        else:
-            # Unauthenticated users can only view global announcements
-            return queryset.filter(is_global=True)
+        # Ensure only relevant announcements are viewable (same rules as the list)
+        return visible_announcements(self.request.user)
 
 
 class AnnouncementCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
@@ -100,7 +86,7 @@ class AnnouncementCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView
         form.instance.author = self.request.user # Set the author automatically
         return super().form_valid(form)
 
-class AnnouncementUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class AnnouncementUpdateView(LoginRequiredMixin, UserPassesTestMixin, SingleFetchObjectMixin, UpdateView):
     model = Announcement
     form_class = AnnouncementForm
     template_name = 'announcements/announcement_form.html'
@@ -113,7 +99,7 @@ class AnnouncementUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView
         if self.request.user.user_type == 'college_admin':
             return True
         # Club Manager can edit their own announcements (if club-specific)
-        if self.request.user.user_type == 'club_manager' and announcement.author == self.request.user:
+        if self.request.user.user_type == 'club_manager' and announcement.author_id == self.request.user.pk:
             return True
         return False # No permission
 
@@ -122,7 +108,7 @@ class AnnouncementUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView
         kwargs['user'] = self.request.user # Pass the current user to the form
         return kwargs
 
-class AnnouncementDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class AnnouncementDeleteView(LoginRequiredMixin, UserPassesTestMixin, SingleFetchObjectMixin, DeleteView):
     model = Announcement
     template_name = 'announcements/announcement_confirm_delete.html'
     success_url = reverse_lazy('announcement_list')
@@ -134,6 +120,47 @@ class AnnouncementDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView
         if self.request.user.user_type == 'college_admin':
             return True
         # Club Manager can delete their own announcements (if club-specific)
-        if self.request.user.user_type == 'club_manager' and announcement.author == self.request.user:
+        if self.request.user.user_type == 'club_manager' and announcement.author_id == self.request.user.pk:
             return True
-        return False # No permission
\ No newline at end of file
+        return False # No permission
+
+async def announcement_stream(request):
+    """
+    Server-Sent Events stream of new announcements the user may see (see live.py).
+    ?scope=global limits it to global ones (the home ticker). The newest id the page
+    already shows comes as ?last_id, and as the Last-Event-ID header on reconnects.
+    """
+    user = await request_user(request)
+    is_admin = user.is_authenticated and user.user_type == 'college_admin'
+    club_ids = None if is_admin else set(await sync_to_async(visible_club_ids)(user))
+    global_only = request.GET.get('scope') == 'global'
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_id') or 0)
+    except ValueError:
+        last_id = 0
+
+    # Subscribe before the replay query, so nothing saved in between is missed
+    subscription = live.broadcaster.subscribe() if isinstance(request, ASGIRequest) else None
+
+    replay = []
+    if last_id:
+        queryset = Announcement.objects.select_related('author', 'club').filter(pk__gt=last_id).order_by('id')
+        if global_only:
+            queryset = queryset.filter(is_global=True)
+        elif club_ids is not None:
+            queryset = queryset.filter(Q(is_global=True) | Q(club_id__in=club_ids))
+        replay = [live.serialize(announcement) async for announcement in queryset[:live.QUEUE_SIZE]]
+
+    if subscription is None:
+        # Under WSGI an open stream would hold a worker thread, so send what was missed
+        # and have the browser come back later, i.e. slow polling
+        response = HttpResponse(live.preamble(replay, settings.ANNOUNCEMENT_STREAM_POLL_SECONDS * 1000),
+                                content_type='text/event-stream')
+    else:
+        response = StreamingHttpResponse(
+            live.stream(subscription, replay, lambda event: live.visible_to(event, club_ids, global_only)),
+            content_type='text/event-stream',
+        )
+        response['X-Accel-Buffering'] = 'no' # Stop nginx-style proxies from buffering the stream
+    response['Cache-Control'] = 'no-cache'
+    return response
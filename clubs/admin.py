@@ -3,14 +3,19 @@ from django.contrib import admin
 # Register your models here.
 # clubs/admin.py
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 from .models import Club, ClubMembership
+from college_club_management.pagination import EstimatedCountPaginator
 
 @admin.register(Club)
 class ClubAdmin(admin.ModelAdmin):
-    list_display = ('title', 'manager_username', 'photo_preview', 'created_at', 'updated_at')
+    list_display = ('title', 'manager_username', 'member_count', 'photo_preview', 'created_at', 'updated_at')
+    list_select_related = ('manager',) # manager_username would otherwise cost a query per row
     search_fields = ('title', 'description', 'manager__username')
     prepopulated_fields = {'slug': ('title',)}
-    filter_horizontal = ('members',) # For easier management of many-to-many members
+    autocomplete_fields = ('manager',)
+    readonly_fields = ('members_link',)
     list_filter = ('manager',) # Filter by manager
 
     def photo_preview(self, obj):
@@ -24,9 +29,21 @@ class ClubAdmin(admin.ModelAdmin):
         return obj.manager.username if obj.manager else "N/A"
     manager_username.short_description = 'Manager'
 
+    def members_link(self, obj):
+        # Members are managed on the (paginated) membership changelist rather than
+        # an inline, which would render every member of a large club
+        if not obj.pk:
+            return "Save the club to add members."
+        url = reverse('admin:clubs_clubmembership_changelist') + f'?club__id__exact={obj.pk}'
+        return format_html('<a href="{}">{} member(s)</a>', url, obj.member_count)
+    members_link.short_description = 'Members'
+
 @admin.register(ClubMembership)
 class ClubMembershipAdmin(admin.ModelAdmin):
     list_display = ('user', 'club', 'date_joined')
-    list_filter = ('club', 'user')
+    list_select_related = ('user', 'club')
+    list_filter = ('club',) # No per-user sidebar; use search for users
     search_fields = ('user__username', 'club__title')
-    raw_id_fields = ('user', 'club') # Use raw ID for performance with many users/clubs
+    autocomplete_fields = ('user', 'club') # Search-as-you-type instead of full choice lists
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False # Skips the second, unfiltered COUNT(*)
@@ -16,4 +16,16 @@ class ClubForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         # Filter manager choices to only show CustomUser instances with user_type='club_officer'
         self.fields['manager'].queryset = CustomUser.objects.filter(user_type='club_officer')
-        self.fields['manager'].required = False # Manager can be set later
\ No newline at end of file
+        self.fields['manager'].required = False # Manager can be set later
+
+class RosterImportForm(forms.Form):
+    roster = forms.FileField(
+        help_text="CSV with a 'username' and/or 'email' column, or one username/email per line."
+    )
+    max_upload_size = 5 * 1024 * 1024
+
+    def clean_roster(self):
+        roster = self.cleaned_data['roster']
+        if roster.size > self.max_upload_size:
+            raise forms.ValidationError("Roster files must be smaller than 5 MB.")
+        return roster
@@ -0,0 +1,24 @@
+# clubs/management/commands/generate_renditions.py
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clubs import renditions
+from clubs.models import Club
+
+
+class Command(BaseCommand):
+    help = "Generates the resized WebP/JPEG renditions for every club photo that doesn't have them yet."
+
+    def handle(self, *args, **options):
+        todo = {}
+        for club in Club.objects.exclude(photo='').exclude(photo__isnull=True).only('photo').iterator():
+            digest = renditions.source_digest(club.photo)
+            if digest and renditions.rendered_widths(digest) is None:
+                todo[digest] = club.photo.path # Identical uploads share one set of renditions
+        with ProcessPoolExecutor(max_workers=settings.RENDITION_WORKERS) as pool:
+            for digest, path in todo.items():
+                pool.submit(renditions.render_variants, path, renditions.rendition_dir(digest),
+                            renditions.WIDTHS, renditions.FORMATS)
+        self.stdout.write(self.style.SUCCESS(f"Generated renditions for {len(todo)} photo(s)."))
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_m2m_into_memberships(apps, schema_editor):
+    # Rows added through club.members.add() only exist in the implicit M2M table;
+    # copy them into ClubMembership before that table is dropped.
+    Club = apps.get_model('clubs', 'Club')
+    ClubMembership = apps.get_model('clubs', 'ClubMembership')
+    Through = Club.members.through
+    ClubMembership.objects.bulk_create(
+        [
+            ClubMembership(club_id=row.club_id, user_id=row.customuser_id)
+            for row in Through.objects.all().iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_member_count(apps, schema_editor):
+    Club = apps.get_model('clubs', 'Club')
+    ClubMembership = apps.get_model('clubs', 'ClubMembership')
+    for club in Club.objects.all().iterator():
+        Club.objects.filter(pk=club.pk).update(member_count=ClubMembership.objects.filter(club_id=club.pk).count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_m2m_into_memberships, migrations.RunPython.noop),
+        # Django can't add through= to an existing M2M, so drop the implicit table in the
+        # database and only switch the field over in the migration state.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RemoveField(
+                    model_name='club',
+                    name='members',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='club',
+                    name='members',
+                    field=models.ManyToManyField(blank=True, related_name='joined_clubs', through='clubs.ClubMembership', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_member_count, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,7 @@
 
 # Create your models here.
 # clubs/models.py
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
 from django.utils.text import slugify
 from django.urls import reverse
@@ -12,8 +12,10 @@ class Club(models.Model):
     title = models.CharField(max_length=200, unique=True)
     slug = models.SlugField(unique=True, blank=True, max_length=255) # Max length for slug
     description = models.TextField()
-    # Using AUTH_USER_MODEL for members
-    members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='joined_clubs', blank=True)
+    # Using AUTH_USER_MODEL for members; ClubMembership is the single source of truth for who joined
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, through='ClubMembership', related_name='joined_clubs', blank=True)
+    # Denormalized number of ClubMembership rows, maintained by clubs.signals
+    member_count = models.PositiveIntegerField(default=0, editable=False)
     photo = models.ImageField(upload_to='club_photos/', blank=True, null=True)
     # Manager: A club officer assigned to manage this club.
     manager = models.ForeignKey(
@@ -30,6 +32,7 @@ class Club(models.Model):
     # Generic relations for feedback and ratings
     ratings = GenericRelation('feedback.Rating')
     feedback = GenericRelation('feedback.Feedback')
+    rating_summaries = GenericRelation('feedback.RatingSummary') # Denormalized count/sum, at most one row
 
 
     class Meta:
@@ -46,6 +49,30 @@ class Club(models.Model):
     def get_absolute_url(self):
         return reverse('club_detail', kwargs={'slug': self.slug})
 
+    def add_member(self, user):
+        """
+        Inserts the membership if it doesn't exist yet. Relies on the unique
+        (user, club) constraint instead of an exists-check, so a double submit
+        can't create two rows. Returns True if the user was added.
+        """
+        try:
+            with transaction.atomic():
+                ClubMembership.objects.create(user=user, club=self)
+        except IntegrityError:
+            return False
+        return True
+
+    def remove_member(self, user):
+        """Deletes the membership if present. Returns True if the user was removed."""
+        with transaction.atomic():
+            deleted, _ = ClubMembership.objects.filter(user=user, club=self).delete()
+        return deleted > 0
+
+    def refresh_member_count(self):
+        """Recomputes member_count from ClubMembership (repairs any drift)."""
+        self.member_count = ClubMembership.objects.filter(club=self).count()
+        Club.objects.filter(pk=self.pk).update(member_count=self.member_count)
+
 class ClubMembership(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='memberships')
     club = models.ForeignKey(Club, on_delete=models.CASCADE)
@@ -55,4 +82,15 @@ class ClubMembership(models.Model):
         unique_together = ('user', 'club') # A user can join a club only once
 
     def __str__(self):
-        return f"{self.user.username} - {self.club.title}"
\ No newline at end of file
+        return f"{self.user.username} - {self.club.title}"
+
+def user_club_ids(user):
+    """
+    Returns (joined_ids, managed_ids) as sets of club IDs for user, using two
+    narrow ID-only queries. Anonymous users get two empty sets.
+    """
+    if not user.is_authenticated:
+        return set(), set()
+    joined_ids = set(ClubMembership.objects.filter(user=user).values_list('club_id', flat=True))
+    managed_ids = set(Club.objects.filter(manager=user).order_by().values_list('id', flat=True))
+    return joined_ids, managed_ids
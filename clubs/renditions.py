@@ -0,0 +1,160 @@
+# clubs/renditions.py
+"""
+Resized renditions of club photos.
+
+Each uploaded photo gets fixed-width WebP and JPEG variants, stored under
+MEDIA_ROOT/renditions/<digest>/ where <digest> is a hash of the source bytes,
+so identical uploads share renditions and a replaced photo never serves stale
+ones. Images are resized by the job queue (clubs.tasks) right after upload,
+or when a page asks for renditions that don't exist yet (photos uploaded
+before renditions existed). Until then the template falls back to the
+original file. Web processes never resize anything themselves; a backlog can
+be worked through with `manage.py generate_renditions`, which uses a process pool.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+from jobs import queue
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (320, 640, 960, 1280)
+FORMATS = {'webp': ('WEBP', {'quality': 80, 'method': 4}), 'jpg': ('JPEG', {'quality': 82, 'progressive': True, 'optimize': True})}
+RENDITIONS_DIR = 'renditions'
+MANIFEST = 'manifest.txt'
+
+_lock = threading.Lock()
+_queued = set() # digests this process has already queued a rendition job for
+_digests = {} # (path, size, mtime) -> digest
+_manifests = {} # digest -> widths available on disk (read once per process)
+
+
+def _local_path(fieldfile):
+    try:
+        return fieldfile.path
+    except (NotImplementedError, ValueError):
+        return None # Remote storage or no file: renditions are only built for local media
+
+
+def source_digest(fieldfile):
+    """Content hash of the photo, memoized per (path, size, mtime) so the bytes are read once."""
+    path = _local_path(fieldfile)
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _digests:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        _digests[key] = sha.hexdigest()[:32]
+    return _digests[key]
+
+
+def _rendition_name(digest, width, ext):
+    return f'{RENDITIONS_DIR}/{digest[:2]}/{digest}/{width}.{ext}'
+
+
+def _write_manifest(dest_dir, widths):
+    path = os.path.join(dest_dir, MANIFEST)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(' '.join(str(width) for width in widths))
+    os.replace(tmp, path)
+
+
+def render_variants(source_path, dest_dir, widths, formats):
+    """
+    Does the resizing; only uses Pillow, so it can run in a process pool.
+    Writes <width>.<ext> for every width up to the source width, then a
+    manifest listing them. Returns the widths written.
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(dest_dir, exist_ok=True)
+    written = []
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            for width in widths:
+                if width > image.width and written:
+                    break # Never upscale
+                target = min(width, image.width)
+                height = max(1, round(image.height * target / image.width))
+                resized = image.resize((target, height), Image.LANCZOS)
+                for ext, (pil_format, options) in formats.items():
+                    final = os.path.join(dest_dir, f'{width}.{ext}')
+                    tmp = f'{final}.{os.getpid()}.tmp'
+                    resized.save(tmp, pil_format, **options)
+                    os.replace(tmp, final) # Atomic: readers never see a half-written file
+                written.append(width)
+    except Exception: # Unreadable/unsupported source: the template keeps using the original
+        logging.getLogger(__name__).exception("Could not render variants for %s", source_path)
+        written = []
+    # Written last (even when empty) so other processes know the job is finished
+    _write_manifest(dest_dir, written)
+    return written
+
+
+def rendition_dir(digest):
+    """Directory on disk holding the renditions of the photo with this digest."""
+    return os.path.join(settings.MEDIA_ROOT, RENDITIONS_DIR, digest[:2], digest)
+
+
+def rendered_widths(digest):
+    """Widths available for digest, or None if its renditions haven't been generated yet."""
+    if digest in _manifests:
+        return _manifests[digest]
+    try:
+        with open(os.path.join(rendition_dir(digest), MANIFEST)) as f:
+            widths = tuple(int(width) for width in f.read().split())
+    except (OSError, ValueError):
+        return None
+    _manifests[digest] = widths
+    return widths
+
+
+def schedule(fieldfile, digest):
+    """Queues a generate_club_renditions job for a club's photo, once per process per photo."""
+    with _lock:
+        if digest in _queued:
+            return
+        _queued.add(digest)
+    # By name: clubs.tasks imports this module
+    queue.enqueue('clubs.tasks.generate_club_renditions', [fieldfile.instance.pk])
+
+
+def generate(fieldfile):
+    """Builds fieldfile's renditions in the calling process unless they already exist."""
+    digest = source_digest(fieldfile)
+    if not digest or rendered_widths(digest) is not None:
+        return None
+    return render_variants(fieldfile.path, rendition_dir(digest), WIDTHS, FORMATS)
+
+
+def available_renditions(fieldfile):
+    """
+    Returns {ext: [(url, width), ...]} for fieldfile's renditions, or {} when
+    they don't exist yet (in which case a job is queued to generate them).
+    """
+    digest = source_digest(fieldfile)
+    if not digest:
+        return {}
+    widths = rendered_widths(digest)
+    if widths is None:
+        schedule(fieldfile, digest)
+        return {}
+    return {
+        ext: [(settings.MEDIA_URL + _rendition_name(digest, width, ext), width) for width in widths]
+        for ext in FORMATS
+    } if widths else {}
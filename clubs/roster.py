@@ -0,0 +1,154 @@
+# clubs/roster.py
+"""
+Club roster export and bulk import.
+
+Exports stream ClubMembership rows joined with their user's fields straight
+from a server-side iterator, so a roster of any size is sent without being
+held in memory. Imports resolve all usernames/emails with a few set-based
+IN queries and insert memberships with bulk_create(ignore_conflicts=True),
+so existing members are skipped by the unique (user, club) constraint
+instead of being checked row by row.
+"""
+import csv
+import io
+import itertools
+import json
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import ClubMembership
+from .signals import memberships_imported
+
+ROSTER_FIELDS = ('username', 'email', 'first_name', 'last_name', 'user_type', 'date_joined')
+LOOKUP_CHUNK = 500 # Identifiers per IN (...) query, below SQLite's parameter limit
+MAX_REPORTED = 50 # Unknown/invalid identifiers listed back to the uploader
+
+
+def roster_rows(club, chunk_size=2000):
+    """Yields one tuple of ROSTER_FIELDS per member, oldest membership first."""
+    return (
+        ClubMembership.objects.filter(club=club)
+        .order_by('date_joined', 'id')
+        .values_list('user__username', 'user__email', 'user__first_name', 'user__last_name',
+                     'user__user_type', 'date_joined')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class _Echo:
+    """File-like object whose write() returns the value, so csv.writer can feed a generator."""
+    def write(self, value):
+        return value
+
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r') # Spreadsheets run cells starting with these as formulas
+
+
+def _spreadsheet_safe(value):
+    # Names and emails are user input; a leading quote makes spreadsheets show them as text
+    return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+
+
+def _unquote_spreadsheet_safe(value):
+    # Undoes _spreadsheet_safe, so an exported roster can be imported again
+    return value[1:] if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES) else value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ROSTER_FIELDS)
+    for row in rows:
+        yield writer.writerow([_spreadsheet_safe(value) for value in row[:-1]] + [row[-1].isoformat()])
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(ROSTER_FIELDS, row[:-1] + (row[-1].isoformat(),)))) + '\n'
+
+
+@dataclass
+class RosterImportResult:
+    added: int = 0
+    already_members: int = 0
+    unknown: list = field(default_factory=list)
+    invalid: list = field(default_factory=list)
+
+
+def _chunks(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def parse_roster(uploaded_file):
+    """
+    Reads a CSV upload with a `username` and/or `email` header column and
+    returns (usernames, emails, invalid) with duplicates removed. A file
+    without those headers is read as one username or email per line.
+    """
+    reader = csv.reader(io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline=''))
+    first = next(reader, [])
+    header = [column.strip().lower() for column in first]
+    if 'username' in header or 'email' in header:
+        columns = [(header.index(kind), kind) for kind in ('username', 'email') if kind in header]
+    else:
+        columns = [(0, None)] # Decided per value below
+        reader = itertools.chain([first], reader)
+
+    usernames, emails, invalid = set(), set(), []
+    for row in reader:
+        # First filled identifier column wins, username before email
+        index, kind = next(((index, kind) for index, kind in columns if index < len(row) and row[index].strip()), (None, None))
+        if index is None:
+            continue
+        value = _unquote_spreadsheet_safe(row[index].strip())
+        if kind == 'username' or (kind is None and '@' not in value):
+            usernames.add(value)
+            continue
+        try:
+            validate_email(value)
+        except ValidationError:
+            invalid.append(value)
+            continue
+        emails.add(value.lower())
+    return usernames, emails, invalid
+
+
+def import_roster(club, uploaded_file, batch_size=1000):
+    """
+    Enrolls the users listed in uploaded_file (see parse_roster; emails are
+    matched case-insensitively) in club. Returns a RosterImportResult.
+    """
+    User = get_user_model()
+    usernames, emails, invalid = parse_roster(uploaded_file)
+    result = RosterImportResult(invalid=invalid)
+    user_ids = set()
+    found_usernames, found_emails = set(), set()
+    for chunk in _chunks(usernames):
+        for pk, username in User.objects.filter(username__in=chunk).values_list('pk', 'username'):
+            user_ids.add(pk)
+            found_usernames.add(username)
+    for chunk in _chunks(emails):
+        for pk, email in User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=chunk).values_list('pk', 'email_lower'):
+            user_ids.add(pk)
+            found_emails.add(email)
+    result.unknown = sorted((usernames - found_usernames) | (emails - found_emails))
+
+    with transaction.atomic():
+        before = ClubMembership.objects.filter(club=club).count()
+        ClubMembership.objects.bulk_create(
+            (ClubMembership(club=club, user_id=user_id) for user_id in user_ids),
+            batch_size=batch_size,
+            ignore_conflicts=True, # Existing members hit the unique (user, club) constraint and are skipped
+        )
+        # bulk_create skips post_save, so the counter is recomputed once instead of per row
+        club.refresh_member_count()
+    result.added = club.member_count - before
+    result.already_members = len(user_ids) - result.added
+    memberships_imported.send(sender=ClubMembership, club=club, user_ids=user_ids)
+    return result
@@ -0,0 +1,39 @@
+# clubs/signals.py
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver, Signal
+
+from .models import Club, ClubMembership
+from . import tasks
+
+# Sent after a bulk roster import (clubs.roster) with club= and user_ids=, since bulk_create skips post_save
+memberships_imported = Signal()
+
+@receiver(post_save, sender=ClubMembership)
+def membership_created(sender, instance, created, **kwargs):
+    # Runs inside the caller's transaction, so the row and the counter commit together
+    if created:
+        Club.objects.filter(pk=instance.club_id).update(member_count=F('member_count') + 1)
+
+@receiver(post_delete, sender=ClubMembership)
+def membership_deleted(sender, instance, **kwargs):
+    Club.objects.filter(pk=instance.club_id, member_count__gt=0).update(member_count=F('member_count') - 1)
+
+def _photo_saved(update_fields):
+    return update_fields is None or 'photo' in update_fields
+
+
+@receiver(pre_save, sender=Club)
+def club_photo_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Remember the stored photo, so edits that leave it alone don't queue a resize
+    if instance.pk and not raw and _photo_saved(update_fields):
+        instance._stored_photo = Club.objects.filter(pk=instance.pk).values_list('photo', flat=True).first()
+
+@receiver(post_save, sender=Club)
+def club_photo_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Build the resized photo variants on the job queue right after upload
+    if raw or not instance.photo or not _photo_saved(update_fields):
+        return
+    if instance.photo.name != getattr(instance, '_stored_photo', None):
+        tasks.generate_club_renditions.enqueue(instance.pk)
+    instance._stored_photo = instance.photo.name
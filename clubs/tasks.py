@@ -0,0 +1,12 @@
+# clubs/tasks.py
+from jobs.queue import task
+
+from .models import Club
+from . import renditions
+
+@task(queue='images', max_attempts=3, retry_delay=30)
+def generate_club_renditions(club_id):
+    """Resizes a club's photo into its WebP/JPEG renditions."""
+    club = Club.objects.filter(pk=club_id).only('photo').first()
+    if club and club.photo:
+        renditions.generate(club.photo)
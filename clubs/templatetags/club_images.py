@@ -0,0 +1,35 @@
+# clubs/templatetags/club_images.py
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from clubs import renditions
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_photo(photo, alt='', sizes='100vw', css_class='', style=''):
+    """
+    Renders a club photo as <picture> with WebP and JPEG srcsets of the resized
+    renditions, so browsers download the smallest file that fits `sizes`.
+    Falls back to a plain <img> of the original until the renditions exist.
+
+    Usage: {% responsive_photo club.photo alt=club.title sizes="(min-width: 992px) 33vw, 100vw" css_class="card-img-top" %}
+    """
+    variants = renditions.available_renditions(photo)
+    if not variants:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" style="{}" loading="lazy" decoding="async">',
+            photo.url, css_class, alt, style,
+        )
+
+    def srcset(ext):
+        return format_html_join(', ', '{} {}w', variants[ext])
+
+    jpeg = variants['jpg']
+    fallback_url = jpeg[min(1, len(jpeg) - 1)][0] # ~640px for browsers without srcset support
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" style="{}" loading="lazy" decoding="async"></picture>',
+        srcset('webp'), sizes, fallback_url, srcset('jpg'), sizes, css_class, alt, style,
+    )
@@ -1,3 +1,88 @@
-from django.test import TestCase
+import csv
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from jobs import queue
+from jobs.models import Job
+from . import renditions, roster
+from .models import Club
+
+User = get_user_model()
+
+
+class RosterExportTests(TestCase):
+    def test_csv_cells_that_look_like_formulas_are_quoted(self):
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        club = Club.objects.create(title='Chess', description='Chess club', manager=manager)
+        club.add_member(User.objects.create_user('member', 'member@example.com', None,
+                                                 first_name='=HYPERLINK("http://evil.example")', last_name='-2+3'))
+        club.add_member(User.objects.create_user('@home', 'home@example.com', None, first_name='Ada'))
+
+        lines = ''.join(roster.stream_csv(roster.roster_rows(club))).splitlines()
+        header, *rows = csv.reader(lines)
+
+        self.assertEqual(header, list(roster.ROSTER_FIELDS))
+        self.assertEqual([row[:4] for row in rows], [
+            ['member', 'member@example.com', '\'=HYPERLINK("http://evil.example")', "'-2+3"],
+            ["'@home", 'home@example.com', 'Ada', ''],
+        ])
+
+    def test_exported_roster_imports_again(self):
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        chess = Club.objects.create(title='Chess', description='Chess club', manager=manager)
+        drama = Club.objects.create(title='Drama', description='Drama club', manager=manager)
+        for username in ('@home', 'plain'):
+            chess.add_member(User.objects.create_user(username, f'{username.strip("@")}@example.com', None))
+
+        export = ''.join(roster.stream_csv(roster.roster_rows(chess))).encode()
+        usernames, emails, invalid = roster.parse_roster(io.BytesIO(export))
+
+        self.assertEqual((usernames, emails, invalid), ({'@home', 'plain'}, set(), []))
+        self.assertEqual(roster.import_roster(drama, io.BytesIO(export)).added, 2)
+
+
+class ClubPhotoRenditionJobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        storages = {'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'}}
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, STORAGES=storages, JOBS_RUN_INLINE=False))
+        self.addCleanup(renditions._queued.clear)
+        self.addCleanup(renditions._manifests.clear)
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        self.club = Club.objects.create(title='Chess', description='Chess club', manager=manager,
+                                        photo=SimpleUploadedFile('chess.jpg', b'not really a jpeg'))
+
+    def jobs(self):
+        return Job.objects.filter(task='clubs.tasks.generate_club_renditions').count()
+
+    def test_queues_renditions_for_new_and_replaced_photos_only(self):
+        self.assertEqual(self.jobs(), 1)
+
+        self.club.title = 'Chess & Go'
+        self.club.save()
+        Club.objects.get(pk=self.club.pk).save(update_fields=['description'])
+        self.assertEqual(self.jobs(), 1)
+
+        self.club.photo = SimpleUploadedFile('board.jpg', b'still not a jpeg')
+        self.club.save()
+        self.assertEqual(self.jobs(), 2)
+
+    def test_missing_renditions_are_queued_once_not_rendered_in_the_web_process(self):
+        Job.objects.all().delete()
+
+        self.assertEqual(renditions.available_renditions(self.club.photo), {})
+        self.assertEqual(renditions.available_renditions(self.club.photo), {})
+        self.assertEqual(self.jobs(), 1)
+
+        job, = queue.claim('worker:1', limit=1)
+        with self.assertLogs('clubs.renditions', 'ERROR'): # Not a real image, so the worker renders nothing
+            self.assertEqual(queue.run_job(job), Job.DONE)
+        renditions._queued.clear() # As in another web process
+        self.assertEqual(renditions.available_renditions(self.club.photo), {})
+        self.assertEqual(self.jobs(), 1) # The (empty) manifest marks the photo as done
@@ -10,4 +10,6 @@ urlpatterns = [
     path('<slug:slug>/leave/', views.leave_club, name='leave_club'),
     path('<slug:slug>/edit/', views.ClubUpdateView.as_view(), name='club_edit'),
     path('<slug:slug>/delete/', views.ClubDeleteView.as_view(), name='club_delete'),
+    path('<slug:slug>/roster/export/', views.ClubRosterExportView.as_view(), name='club_roster_export'),
+    path('<slug:slug>/roster/import/', views.ClubRosterImportView.as_view(), name='club_roster_import'),
 ]
\ No newline at end of file
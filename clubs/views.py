@@ -1,49 +1,89 @@
 # clubs/views.py
+import asyncio
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views import View
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, FormView
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Avg # For average rating
-from .models import Club, ClubMembership
-from .forms import ClubForm
+from .models import Club, ClubMembership, user_club_ids
+from feedback.models import RatingSummary
+from feedback import registry
+from .forms import ClubForm, RosterImportForm
+from . import roster
 from college_club_management.decorators import CollegeAdminRequiredMixin, ClubManagerRequiredMixin
+from college_club_management.pagination import CursorPaginationMixin
+from college_club_management.asyncviews import as_list, request_user, streaming_content
 
-class ClubListView(ListView):
+class ClubListView(CursorPaginationMixin, ListView):
     model = Club
     template_name = 'clubs/club_list.html'
     context_object_name = 'clubs'
     paginate_by = 9 # Display 9 clubs per page
+    cursor_ordering = ('title', 'id') # Keyset for ?cursor= pagination
+    cursor_count_mode = 'cached'
+
+    def get_queryset(self):
+        # Cards show club.manager.username, so fetch managers in the same query
+        return super().get_queryset().select_related('manager')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Load the user's club IDs once per request instead of club.members.all per card
+        joined_ids, managed_ids = user_club_ids(self.request.user)
+        clubs = list(context['object_list'])
+        for club in clubs:
+            club.is_member = club.id in joined_ids
+            club.is_manager = club.id in managed_ids
+        context['object_list'] = context[self.context_object_name] = clubs
+        return context
 
 class ClubDetailView(DetailView):
     model = Club
     template_name = 'clubs/club_detail.html'
     context_object_name = 'club'
     slug_url_kwarg = 'slug' # Ensure this matches your URL pattern
+    queryset = Club.objects.select_related('manager') # Template shows club.manager.username
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        club = self.get_object()
-        
-        is_member = False
-        if self.request.user.is_authenticated:
-            is_member = club.members.filter(id=self.request.user.id).exists()
-        
+    async def get(self, request, *args, **kwargs):
+        # Async under ASGI: once the club is loaded, the membership check, member list,
+        # rating summary and comments are fetched concurrently
+        try:
+            self.object = club = await self.get_queryset().aget(slug=kwargs[self.slug_url_kwarg])
+        except Club.DoesNotExist:
+            raise Http404("No club found matching the query")
+        user = await request_user(request)
+        content_type, *_ = await registry.aresolve_model('club')
+
+        async def check_membership():
+            if not user.is_authenticated:
+                return False
+            return await ClubMembership.objects.filter(club=club, user=user).aexists()
+
+        is_member, members, rating_summary, feedbacks = await asyncio.gather(
+            check_membership(),
+            as_list(club.members.all()),
+            # Average rating is read from the denormalized summary row (constant cost per club)
+            RatingSummary.objects.filter(content_type=content_type, object_id=club.pk).afirst(),
+            as_list(club.feedback.select_related('user').order_by('-created_at')), # Template shows fb.user.username
+        )
+
+        context = self.get_context_data(object=club)
         context['is_member'] = is_member
-        context['members'] = club.members.all()
-        # Calculate average rating
-        # Note: 'ratings' is a GenericRelation, so you need the feedback_tags for template side
-        context['average_rating'] = club.ratings.aggregate(Avg('rating'))['rating__avg']
-        context['feedbacks'] = club.feedback.all().order_by('-created_at')
-        return context
+        context['can_manage'] = user.is_authenticated and (user.is_college_admin() or club.manager_id == user.pk)
+        context['members'] = members
+        context['rating_summary'] = rating_summary
+        context['average_rating'] = rating_summary.average if rating_summary else None
+        context['feedbacks'] = feedbacks
+        return self.render_to_response(context)
 
 @login_required
 def join_club(request, slug):
     club = get_object_or_404(Club, slug=slug)
-    if not ClubMembership.objects.filter(user=request.user, club=club).exists():
-        ClubMembership.objects.create(user=request.user, club=club)
-        club.members.add(request.user) # Also add to ManyToMany field
+    if club.add_member(request.user): # Single insert-if-absent; member_count is bumped in the same transaction
         messages.success(request, f'You have successfully joined {club.title}!')
     else:
         messages.info(request, f'You are already a member of {club.title}.')
@@ -52,10 +92,7 @@ def join_club(request, slug):
 @login_required
 def leave_club(request, slug):
     club = get_object_or_404(Club, slug=slug)
-    membership = ClubMembership.objects.filter(user=request.user, club=club)
-    if membership.exists():
-        membership.delete()
-        club.members.remove(request.user) # Also remove from ManyToMany field
+    if club.remove_member(request.user):
         messages.success(request, f'You have successfully left {club.title}.')
     else:
         messages.info(request, f'You are not a member of {club.title}.')
@@ -92,4 +129,45 @@ class ClubDeleteView(LoginRequiredMixin, CollegeAdminRequiredMixin, DeleteView):
 
     def form_valid(self, form):
         messages.success(self.request, f'Club "{self.object.title}" deleted successfully!')
-        return super().form_valid(form)
\ No newline at end of file
+        return super().form_valid(form)
+
+# Roster export/import is restricted to College Admins or the assigned Club Manager
+class ClubRosterExportView(LoginRequiredMixin, ClubManagerRequiredMixin, View):
+    formats = {
+        'csv': (roster.stream_csv, 'text/csv; charset=utf-8'),
+        'jsonl': (roster.stream_jsonl, 'application/x-ndjson'),
+    }
+
+    def get(self, request, slug):
+        club = get_object_or_404(Club.objects.only('id', 'slug'), slug=slug)
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in self.formats:
+            fmt = 'csv'
+        stream, content_type = self.formats[fmt]
+        # Rows are streamed from a server-side iterator, never loaded into memory all at once
+        response = StreamingHttpResponse(streaming_content(request, stream(roster.roster_rows(club))), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{club.slug}-roster.{fmt}"'
+        return response
+
+class ClubRosterImportView(LoginRequiredMixin, ClubManagerRequiredMixin, FormView):
+    form_class = RosterImportForm
+    template_name = 'clubs/club_roster_import.html'
+
+    def dispatch(self, request, *args, **kwargs):
+        self.club = get_object_or_404(Club, slug=kwargs['slug'])
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['club'] = self.club
+        return context
+
+    def form_valid(self, form):
+        result = roster.import_roster(self.club, form.cleaned_data['roster'])
+        messages.success(self.request, f"Added {result.added} member(s) to {self.club.title}; {result.already_members} were already members.")
+        for label, values in (('Unknown', result.unknown), ('Invalid', result.invalid)):
+            if values:
+                shown = ', '.join(values[:roster.MAX_REPORTED])
+                more = f" and {len(values) - roster.MAX_REPORTED} more" if len(values) > roster.MAX_REPORTED else ''
+                messages.warning(self.request, f"{label} entries skipped ({len(values)}): {shown}{more}")
+        return redirect('club_detail', slug=self.club.slug)
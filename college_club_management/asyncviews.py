@@ -0,0 +1,59 @@
+# college_club_management/asyncviews.py
+"""
+Helpers for the async views that serve the read-heavy pages under ASGI.
+
+Async views only pay off when the whole middleware chain is async-capable
+(see AsyncWhiteNoiseMiddleware). Queries gathered inside one request still
+run one after another on that request's connection; what the event loop
+gains is that a request waiting on the DB, or on a slow client, doesn't hold
+a worker thread.
+"""
+import itertools
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+STREAM_BATCH = 100 # Parts pulled per thread hop by streaming_content()
+
+
+async def request_user(request):
+    """
+    request.auser(), also stored where request.user looks, so templates and
+    context processors rendered afterwards don't load the user a second time.
+    """
+    user = await request.auser()
+    request._cached_user = user
+    return user
+
+
+async def as_list(queryset):
+    """Evaluates a queryset with the async ORM."""
+    return [obj async for obj in queryset]
+
+
+def streaming_content(request, parts):
+    """
+    Body for a StreamingHttpResponse built from a sync generator (e.g. one
+    reading a queryset .iterator()). Under WSGI that is parts itself. Under
+    ASGI, Django would read a sync iterator into a list before sending
+    anything, so parts is pulled in batches through sync_to_async instead:
+    the body still goes out as it is produced, in constant memory.
+    """
+    if not isinstance(request, ASGIRequest):
+        return parts
+    return _pull_in_batches(iter(parts))
+
+
+async def _pull_in_batches(iterator):
+    # Thread-sensitive, so a server-side cursor stays on the request's DB connection
+    take = sync_to_async(lambda: list(itertools.islice(iterator, STREAM_BATCH)))
+    try:
+        while True:
+            batch = await take()
+            if not batch:
+                return
+            for part in batch:
+                yield part
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)() # Closes the cursor when the client disconnects early
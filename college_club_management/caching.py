@@ -0,0 +1,159 @@
+# college_club_management/caching.py
+"""
+cached_compute(): caches an expensive result so that it is recomputed by
+one caller at a time, usually before it expires.
+
+Each cached value is stored with its expiry and how long it took to compute.
+On every read, a caller may decide to recompute it early. The chance grows
+as expiry nears and with the compute time (the "XFetch" rule from Vattani
+et al., "Optimal Probabilistic Cache Stampede Prevention"). Under load, one
+request then refreshes the value shortly before it would expire.
+
+Whoever recomputes first takes a lock. Everyone else keeps getting the
+previous value, which stays cached for stale_ttl seconds past its expiry
+for that purpose. Callers only wait, up to LOCK_SECONDS, when the cache is
+cold and there is nothing to serve.
+
+The lock is cache.add(), which is atomic on Redis, and on local memory
+within one process. FileBasedCache.add() is a read followed by a write, so
+with the file backend the lock is a file created with O_EXCL next to the
+cache files instead. That holds for every process on one host; processes on
+different hosts don't share a file cache at all, which is why deployments
+with the worker on another machine want Redis (see check_shared_cache).
+"""
+import hashlib
+import math
+import os
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.redis import RedisCache
+
+BETA = 1.0 # XFetch's eagerness; above 1 recomputes earlier
+LOCK_SECONDS = 30 # Longest a computation may hold the lock, and the longest a cold-cache caller waits
+WAIT_POLL_SECONDS = 0.05
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _store(key, ttl, stale_ttl, fn):
+    start = time.monotonic()
+    value = fn()
+    delta = time.monotonic() - start
+    cache.set(key, (value, time.time() + ttl, delta), ttl + (ttl if stale_ttl is None else stale_ttl))
+    return value
+
+
+def _lock_path(backend, key):
+    name = hashlib.md5(backend.make_key(_lock_key(key)).encode()).hexdigest()
+    directory = os.path.abspath(settings.CACHES['default']['LOCATION']) # The file backend's cache directory
+    return os.path.join(directory, f'{name}.lock') # Not .djcache, so clear() and culling leave it alone
+
+
+def _acquire_file_lock(path, token):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    except FileExistsError:
+        try:
+            stale = time.time() - os.path.getmtime(path) > LOCK_SECONDS
+        except FileNotFoundError:
+            return False # Just released; the next poll or request takes it
+        if not stale:
+            return False
+        try:
+            # The holder died without releasing. Renaming is atomic, so one caller breaks the lock and retries
+            os.rename(path, f'{path}.{token}')
+        except FileNotFoundError:
+            return False
+        os.remove(f'{path}.{token}')
+        return _acquire_file_lock(path, token)
+    with os.fdopen(fd, 'w') as lock_file:
+        lock_file.write(token)
+    return True
+
+
+def _acquire(key, token):
+    backend = caches['default']
+    if isinstance(backend, FileBasedCache):
+        return _acquire_file_lock(_lock_path(backend, key), token)
+    return cache.add(_lock_key(key), token, LOCK_SECONDS)
+
+
+def _release(key, token):
+    backend = caches['default']
+    if isinstance(backend, FileBasedCache):
+        path = _lock_path(backend, key)
+        try:
+            with open(path) as lock_file:
+                if lock_file.read() == token: # Not someone else's lock taken after ours went stale
+                    os.remove(path)
+        except FileNotFoundError:
+            pass
+    elif cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def cached_compute(key, ttl, fn, stale_ttl=None):
+    """
+    Returns fn()'s result cached under key for ttl seconds, with single-flight
+    recomputation and probabilistic early refresh. A stale value may be served
+    for up to stale_ttl more seconds (default: ttl) while someone recomputes it.
+    fn's result must be picklable.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at, delta = entry
+        # -log(u) for u in (0, 1] is an exponential draw, so early refreshes stay rare until expiry is close
+        if time.time() - delta * BETA * math.log(1.0 - random.random()) < expires_at:
+            return value
+        token = uuid.uuid4().hex
+        if not _acquire(key, token):
+            return value # Someone else is already recomputing
+        try:
+            return _store(key, ttl, stale_ttl, fn)
+        finally:
+            _release(key, token)
+
+    # Cold cache: one caller computes, the others wait for its result
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_SECONDS
+    while not _acquire(key, token):
+        if time.monotonic() >= deadline:
+            return fn() # The lock holder is stuck or gone; don't wait forever
+        time.sleep(WAIT_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    try:
+        entry = cache.get(key) # Filled between our first read and taking the lock
+        if entry is not None:
+            return entry[0]
+        return _store(key, ttl, stale_ttl, fn)
+    finally:
+        _release(key, token)
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    `check --deploy`: warns when the default cache isn't shared between
+    hosts. Local-memory and file caches work, but when the web and job-worker
+    processes run on separate machines, invalidations made by the worker (e.g.
+    a roster import) never reach the web process, and single-flight only
+    holds per host.
+    """
+    if isinstance(caches['default'], RedisCache):
+        return []
+    return [checks.Warning(
+        'The default cache is not shared between hosts.',
+        hint='If the web and worker processes run on separate machines, set CACHE_URL to a redis:// URL both reach.',
+        id='caching.W001',
+    )]
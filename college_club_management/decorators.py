@@ -52,6 +52,16 @@ class ClubOfficerRequiredMixin(AccessMixin):
             return redirect(reverse_lazy('home'))
         return super().dispatch(request, *args, **kwargs)
 
+class ClubOfficerOrAdminRequiredMixin(AccessMixin):
+    """Verify that the current user is authenticated and is a club officer or a college admin."""
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission() # Redirects to login
+        if not (request.user.is_club_officer() or request.user.is_college_admin()):
+            messages.warning(request, "You do not have permission to access this page. (Club Officer Required)")
+            return redirect(reverse_lazy('home'))
+        return super().dispatch(request, *args, **kwargs)
+
 class ClubManagerRequiredMixin(AccessMixin):
     """
     Mixin to check if the user is the manager of the specific club
@@ -68,13 +78,14 @@ class ClubManagerRequiredMixin(AccessMixin):
             messages.error(request, "Club not found.")
             return redirect(reverse_lazy('club_list'))
 
+        from clubs.models import Club # Imported here: this module is loaded by the clubs app's own views
         try:
             club = Club.objects.get(slug=club_slug)
             # A college admin can manage any club
             if request.user.is_college_admin():
                 return super().dispatch(request, *args, **kwargs)
             # A club officer can manage only the club they are assigned to
-            if request.user.is_club_officer() and club.manager == request.user:
+            if request.user.is_club_officer() and club.manager_id == request.user.pk:
                 return super().dispatch(request, *args, **kwargs)
             else:
                 messages.warning(request, "You do not have permission to manage this club.")
@@ -0,0 +1,219 @@
+# college_club_management/pagination.py
+"""
+Opt-in keyset (cursor) pagination for the list views.
+
+Instead of OFFSET, each page filters on the last row's ordering values, so page
+500 costs the same as page 1. Cursors are signed, opaque tokens. No COUNT(*)
+is run unless the view asks for a cached or estimated total.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+CURSOR_SALT = 'college_club_management.pagination.cursor'
+
+
+def estimated_count(queryset):
+    """
+    PostgreSQL planner's row estimate for queryset: one EXPLAIN instead of a
+    full COUNT(*) scan. Only meaningful on PostgreSQL.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPage:
+    """A single page of results plus the cursors needed to move forwards or backwards."""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginates `queryset` by `ordering`, a sequence of field names (prefix '-' for
+    descending) that must end in a unique field such as 'id'.
+
+    count_mode controls the optional total:
+      None        - no count at all (default)
+      'cached'    - exact COUNT(*), cached for count_cache_timeout seconds
+      'estimated' - planner estimate on PostgreSQL, falls back to 'cached' elsewhere
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_mode=None, count_cache_timeout=60):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_mode = count_mode
+        self.count_cache_timeout = count_cache_timeout
+
+    @cached_property
+    def fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def _order_by(self, forward):
+        return [
+            f'-{field}' if descending == forward else field
+            for field, descending in self.fields
+        ]
+
+    def _keyset_filter(self, values, forward):
+        # Lexicographic "comes after (values)" in the requested direction:
+        # f1 > v1 OR (f1 = v1 AND f2 > v2) OR ... with > flipped for descending fields
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def _encode(self, obj, direction):
+        values = []
+        for field, _ in self.fields:
+            value = getattr(obj, field)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return signing.dumps({'v': values, 'd': direction}, salt=CURSOR_SALT, compress=True)
+
+    def _decode(self, cursor):
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+            values, direction = payload['v'], payload['d']
+        except (signing.BadSignature, KeyError, TypeError):
+            raise Http404("Invalid page cursor.")
+        if direction not in ('n', 'p') or len(values) != len(self.fields):
+            raise Http404("Invalid page cursor.")
+        return values, direction
+
+    def page(self, cursor=None):
+        """Returns the CursorPage that follows (or precedes) `cursor`; no cursor means the first page."""
+        if not cursor:
+            return self._forward_page(None)
+        values, direction = self._decode(cursor)
+        if direction == 'n':
+            return self._forward_page(values)
+        return self._backward_page(values)
+
+    def _forward_page(self, values):
+        queryset = self.queryset.order_by(*self._order_by(forward=True))
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = self._encode(rows[-1], 'n') if rows and has_more else None
+        previous_cursor = self._encode(rows[0], 'p') if rows and values is not None else None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def _backward_page(self, values):
+        queryset = self.queryset.order_by(*self._order_by(forward=False))
+        queryset = queryset.filter(self._keyset_filter(values, forward=False))
+        rows = list(queryset[:self.per_page + 1])
+        if not rows:
+            return self._forward_page(None)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        previous_cursor = self._encode(rows[0], 'p') if has_more else None
+        next_cursor = self._encode(rows[-1], 'n')
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    @cached_property
+    def count(self):
+        """Total row count according to count_mode, or None when counting is disabled."""
+        if not self.count_mode:
+            return None
+        queryset = self.queryset.order_by()
+        if self.count_mode == 'estimated' and connections[queryset.db].vendor == 'postgresql':
+            return estimated_count(queryset)
+        key = 'cursor_count:' + hashlib.md5(str(queryset.query).encode()).hexdigest()
+        return cache.get_or_set(key, queryset.count, self.count_cache_timeout)
+
+
+class CursorPaginationMixin:
+    """
+    ListView mixin that switches to CursorPaginator when the request carries a
+    `cursor` parameter (an empty one means the first page) or when
+    settings.CURSOR_PAGINATION is on. Views opt in by setting cursor_ordering.
+    """
+    cursor_ordering = None
+    cursor_count_mode = None
+
+    def use_cursor_pagination(self):
+        if not self.cursor_ordering:
+            return False
+        return 'cursor' in self.request.GET or getattr(settings, 'CURSOR_PAGINATION', False)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering, count_mode=self.cursor_count_mode)
+        page = paginator.page(self.request.GET.get('cursor'))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if isinstance(page, CursorPage):
+            # Templates render next/previous links instead of numbered pages
+            context['is_paginated'] = False
+            context['cursor_paginated'] = page.has_other_pages()
+            context['next_page_url'] = self._cursor_url(page.next_cursor)
+            context['previous_page_url'] = self._cursor_url(page.previous_cursor)
+        return context
+
+    def _cursor_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        query.pop('page', None)
+        return '?' + query.urlencode()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for very large admin changelists. On PostgreSQL it uses the
+    planner's estimate when that exceeds exact_count_threshold rows, so page
+    loads don't pay for a full COUNT(*); small results are still counted exactly.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'db') and connections[queryset.db].vendor == 'postgresql':
+            estimate = estimated_count(queryset)
+            if estimate > self.exact_count_threshold:
+                return estimate
+        return super().count
@@ -128,6 +128,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'"""
 # college_club_management/settings.py
 
 import os
+import tempfile
 from pathlib import Path
 import dj_database_url # Import for handling Render's database URL
 
@@ -179,13 +180,19 @@ INSTALLED_APPS = [
     'events.apps.EventsConfig',
     'announcements.apps.AnnouncementsConfig',
     'feedback.apps.FeedbackConfig', # Ensure this app is correctly named and configured
+    'search.apps.SearchConfig', # Full-text search over events, clubs and announcements
+    'jobs.apps.JobsConfig', # Database-backed background job queue (run with `manage.py runworker`)
+    'perf.apps.PerfConfig', # seed_scale / run_benchmark performance tooling
 ]
 
 # IMPORTANT: Middleware processing order is crucial.
 # Whitenoise must be placed directly after Django's SecurityMiddleware.
 MIDDLEWARE = [
+    'perf.middleware.RequestTimingMiddleware', # First, so its total covers every other middleware
+    'perf.middleware.SamplingProfilerMiddleware',
+    'perf.middleware.MemoryDiagnosticsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # ADDED: For serving static files in production on Render
+    'college_club_management.middleware.AsyncWhiteNoiseMiddleware', # WhiteNoise (static files on Render), async-capable for ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -215,6 +222,7 @@ TEMPLATES = [
 ]
 
 # WSGI application entry point for your web server (Gunicorn)
+# The Procfile serves college_club_management.asgi:application instead, through uvicorn workers
 WSGI_APPLICATION = 'college_club_management.wsgi.application'
 
 
@@ -231,9 +239,44 @@ print(f"DEBUG: Type of DATABASE_URL is: {type(DATABASE_URL)}")
 DATABASES = {
     'default': dj_database_url.config(
         default=DATABASE_URL, # Removed the SQLite fallback
-        conn_max_age=600 # Optional: Controls connection lifetime for performance
+        # Controls connection lifetime for performance. Set DB_CONN_MAX_AGE=0 under ASGI (see Procfile): each
+        # request runs its sync code on a fresh thread there, so persistent connections would pile up
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600))
     )
 }
+if DATABASES['default'].get('ENGINE') == 'django.db.backends.sqlite3':
+    # Take SQLite's write lock when a transaction starts, so concurrent writers (web + job workers)
+    # wait up to `timeout` seconds instead of failing with "database is locked"
+    DATABASES['default'].setdefault('OPTIONS', {}).update({'transaction_mode': 'IMMEDIATE', 'timeout': 20})
+
+
+# --- Cache ---
+# CACHE_URL picks the backend:
+#   redis://host:6379/0 (or rediss://, unix://): any Redis-protocol server (Redis, Valkey, KeyDB, ...),
+#       shared by every worker and the job worker. Needs the `redis` package. Use it when the web and worker
+#       processes run on separate machines (`check --deploy` warns otherwise, caching.W001).
+#   file:///path/to/dir: files on local disk, seen only by processes on the same host. The default, for
+#       development; web and worker services on separate machines (as on Render) each get their own.
+#   locmem://: this process only. Fine for a single dev server; with several processes, invalidations
+#       made in one (e.g. the job worker importing a roster) never reach the others.
+CACHE_URL = os.environ.get('CACHE_URL', 'file://' + os.path.join(tempfile.gettempdir(), 'college_club_cache'))
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL.startswith('file://'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_URL[len('file://'):],
+        'OPTIONS': {'MAX_ENTRIES': 10000}, # The default 300 would cull slug and club-set entries constantly
+    }}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'college-club'}}
+CACHES['default']['KEY_PREFIX'] = os.environ.get('CACHE_KEY_PREFIX', 'ccm') # Lets apps share one Redis database
+CACHES['default']['TIMEOUT'] = 300
+
+# Sessions are read from the cache and written through to the DB, so most requests skip the session query.
+# A per-process cache would serve other workers' sessions stale, so locmem keeps plain DB sessions.
+SESSION_ENGINE = ('django.contrib.sessions.backends.db' if CACHE_URL.startswith('locmem://')
+                  else 'django.contrib.sessions.backends.cached_db')
 
 
 # --- Password validation rules ---
@@ -295,6 +338,82 @@ STORAGES = {
 # is ephemeral, meaning uploaded files can be lost if your server restarts or scales.
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Processes `manage.py generate_renditions` uses to resize club photos into responsive renditions (see clubs/renditions.py)
+RENDITION_WORKERS = int(os.environ.get('RENDITION_WORKERS', '2'))
+
+# --- Request timing (perf/middleware.py) ---
+# Server-Timing headers go to college admins/staff and to a sampled share of other requests;
+# requests and queries over the thresholds are logged as JSON to the 'perf.slow' logger.
+# It wraps every query, template render and cache read process-wide, so outside DEBUG it is opt-in
+# (REQUEST_TIMING_ENABLED=true); the /metrics request counters need it too.
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', str(DEBUG)).lower() == 'true'
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', '0'))
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', '500'))
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', '100'))
+
+# Prometheus metrics at /metrics, aggregated across workers through per-process mmapped files.
+# METRICS_DIR must be shared by all workers of a server; files of exited workers are merged into one archive file.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'college_club_metrics'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '') # Bearer token the scraper sends; without one /metrics is DEBUG-only
+
+# Sampling profiler (perf/profiler.py): each worker samples the stacks of the requests it is serving
+# PROFILER_HZ times a second; read them with `manage.py profile_dump` or /perf/profile/.
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'False').lower() == 'true'
+PROFILER_HZ = int(os.environ.get('PROFILER_HZ', '50'))
+PROFILER_DIR = os.environ.get('PROFILER_DIR', os.path.join(tempfile.gettempdir(), 'college_club_profiles'))
+PROFILER_FLUSH_SECONDS = 10
+PROFILER_RETENTION_SECONDS = 3600
+
+# Memory diagnostics (perf/memory.py): per-request RSS/allocation deltas, plus tracemalloc
+# snapshots at /perf/memory/ or on MEMORY_SNAPSHOT_SIGNAL sent to a worker pid.
+# tracemalloc slows Python noticeably; keep MEMORY_TRACEMALLOC_FRAMES at 0 unless investigating.
+MEMORY_DIAGNOSTICS_ENABLED = os.environ.get('MEMORY_DIAGNOSTICS_ENABLED', 'False').lower() == 'true'
+MEMORY_TRACEMALLOC_FRAMES = int(os.environ.get('MEMORY_TRACEMALLOC_FRAMES', '0'))
+MEMORY_ALLOC_THRESHOLD_MB = int(os.environ.get('MEMORY_ALLOC_THRESHOLD_MB', '20'))
+MEMORY_SNAPSHOT_SIGNAL = 'SIGUSR2' # Empty to disable
+MEMORY_SNAPSHOT_GROUP_BY = 'lineno'
+MEMORY_DIR = os.environ.get('MEMORY_DIR', os.path.join(tempfile.gettempdir(), 'college_club_memory'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'perf.slow': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+        'perf.memory': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# --- Background jobs (jobs app) ---
+# Set JOBS_RUN_INLINE=True to run tasks immediately in the request instead of on a worker
+JOBS_RUN_INLINE = os.environ.get('JOBS_RUN_INLINE', 'False').lower() == 'true'
+JOBS_WORKER_CONCURRENCY = int(os.environ.get('JOBS_WORKER_CONCURRENCY', '4'))
+JOBS_VISIBILITY_TIMEOUT = 300 # Seconds before an unfinished claimed job is handed to another worker
+JOBS_KEEP_DONE_DAYS = 7 # Finished jobs older than this are purged by the worker
+
+# --- Live announcements (Server-Sent Events, see announcements/live.py) ---
+ANNOUNCEMENT_STREAM_HEARTBEAT_SECONDS = 20 # Keepalive comment on idle streams, under typical proxy idle timeouts
+ANNOUNCEMENT_STREAM_MAX_SECONDS = int(os.environ.get('ANNOUNCEMENT_STREAM_MAX_SECONDS', '300')) # Then the browser reconnects and catches up
+ANNOUNCEMENT_STREAM_RETRY_MS = 3000 # Browser's reconnect delay after a stream closes
+ANNOUNCEMENT_STREAM_POLL_SECONDS = 60 # Reconnect delay when served over WSGI, where streams can't stay open
+
+# --- Email (daily digest, see announcements/digest.py) ---
+# Locally mail is printed to the console; set EMAIL_BACKEND to
+# 'django.core.mail.backends.smtp.EmailBackend' (plus EMAIL_HOST etc.) in production,
+# or '...filebased.EmailBackend' with EMAIL_FILE_PATH to write messages to files.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'College Clubs <no-reply@localhost>')
+# Absolute base for links in emails, e.g. https://clubs.example.edu
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
 
 
 # --- Custom User Model & Authentication Redirects ---
@@ -314,4 +433,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CSRF_TRUSTED_ORIGINS = ['https://*.render.com']
 # Remember to add your custom domain here if you set one up, e.g.:
 # CSRF_TRUSTED_ORIGINS.append('https://yourcustomdomain.com')
-# CSRF_TRUSTED_ORIGINS.append('https://www.yourcustomdomain.com')
\ No newline at end of file
+# CSRF_TRUSTED_ORIGINS.append('https://www.yourcustomdomain.com')
+
+# --- Pagination ---
+# When true, the announcement, event and club lists use keyset (cursor) pagination by default.
+# Without it, cursor mode is still available per request via ?cursor=.
+CURSOR_PAGINATION = os.environ.get('CURSOR_PAGINATION', 'False').lower() == 'true'
@@ -0,0 +1,71 @@
+// static/js/announcements_live.js
+// Live announcements: listens to the Server-Sent Events stream named by an element's
+// data-announcement-stream attribute (see announcements/live.py) and adds each new
+// announcement to the page, so nobody has to refresh to see news.
+// data-announcement-layout="ticker" feeds the home page ticker, "list" the announcements page.
+
+document.addEventListener('DOMContentLoaded', function() {
+    var container = document.querySelector('[data-announcement-stream]');
+    if (!container || !window.EventSource) {
+        return;
+    }
+
+    function element(tag, className, text) {
+        var node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text) node.textContent = text; // Never innerHTML: titles and content are user input
+        return node;
+    }
+
+    function tickerItem(announcement) {
+        var item = element('span', 'ticker-item');
+        item.appendChild(element('i', 'fas fa-bullhorn me-1'));
+        item.appendChild(document.createTextNode(' '));
+        item.appendChild(element('strong', '', announcement.title + ':'));
+        item.appendChild(document.createTextNode(' ' + announcement.content + '      '));
+        return item;
+    }
+
+    function addToTicker(announcement) {
+        var empty = container.querySelector('[data-announcement-empty]');
+        if (empty) empty.remove();
+        // The ticker shows its items twice for a seamless loop, so the copy goes at the start of the second half
+        var firstCopy = container.querySelector('[data-ticker-copy]');
+        var copy = tickerItem(announcement);
+        copy.setAttribute('data-ticker-copy', '');
+        container.insertBefore(copy, firstCopy);
+        container.insertBefore(tickerItem(announcement), container.firstChild);
+    }
+
+    function addToList(announcement) {
+        var empty = document.querySelector('[data-announcement-empty]');
+        if (empty) empty.remove();
+        var body = element('div', 'card-body');
+        body.appendChild(element('h5', 'card-title', announcement.title));
+        var subtitle = element('h6', 'card-subtitle mb-2 text-muted',
+            'Posted by ' + (announcement.author || 'unknown') + ' just now - ');
+        subtitle.appendChild(element('span', announcement.is_global ? 'badge bg-primary' : 'badge bg-secondary',
+            announcement.is_global ? 'Global' : announcement.club));
+        body.appendChild(subtitle);
+        body.appendChild(element('p', 'card-text', announcement.content));
+        var link = element('a', 'btn btn-info btn-sm', 'View Details');
+        link.href = announcement.url;
+        body.appendChild(link);
+        var card = element('div', 'card shadow-sm');
+        card.appendChild(body);
+        var column = element('div', 'col');
+        column.appendChild(card);
+        container.insertBefore(column, container.firstChild);
+    }
+
+    var layout = container.getAttribute('data-announcement-layout');
+    var source = new EventSource(container.getAttribute('data-announcement-stream'));
+    source.addEventListener('announcement', function(event) {
+        var announcement = JSON.parse(event.data);
+        if (layout === 'ticker') {
+            addToTicker(announcement);
+        } else {
+            addToList(announcement);
+        }
+    });
+});
@@ -24,6 +24,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from accounts.views import home # Make sure this import is correct
+from perf.views import memory_view, metrics_view, profile_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -32,6 +33,10 @@ urlpatterns = [
     path('events/', include('events.urls')),     # Event management and calendar
     path('announcements/', include('announcements.urls')), # Announcements
     path('feedback/', include('feedback.urls')), # Rating and Feedback
+    path('search/', include('search.urls')), # Full-text search
+    path('metrics', metrics_view, name='metrics'), # Prometheus scrape endpoint (perf/metrics.py)
+    path('perf/profile/', profile_view, name='perf_profile'), # Sampling profiler output, college admins only
+    path('perf/memory/', memory_view, name='perf_memory'), # tracemalloc snapshots, college admins only
     path('', home, name='home'), # <--- THIS LINE IS CRUCIAL FOR YOUR HOME PAGE
     
 ]
@@ -8,6 +8,8 @@ from .models import Event
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'date', 'time', 'club', 'created_by', 'is_upcoming')
-    list_filter = ('date', 'club', 'created_by')
+    list_select_related = ('club', 'created_by')
+    list_filter = ('date', 'club') # No created_by sidebar: it would list every user
+    autocomplete_fields = ('club', 'created_by')
     search_fields = ('title', 'description', 'location')
     date_hierarchy = 'date'
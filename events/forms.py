@@ -1,6 +1,7 @@
 # events/forms.py
 from django import forms
 from .models import Event
+from clubs.models import Club
 
 class EventForm(forms.ModelForm):
     date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
@@ -20,4 +21,17 @@ class EventForm(forms.ModelForm):
         if user and user.user_type == 'club_manager':
             self.fields['club'].queryset = user.managed_clubs.all()
         # If the user is a normal student, they shouldn't create events directly linked to a club (unless allowed)
-        # If user is admin, they see all clubs.
\ No newline at end of file
+        # If user is admin, they see all clubs.
+
+class EventImportForm(forms.Form):
+    source = forms.FileField(
+        label="Schedule file",
+        help_text="CSV with columns title, date (YYYY-MM-DD), time (HH:MM), location, description, club (slug), or an .ics calendar.",
+    )
+    club = forms.ModelChoiceField(queryset=Club.objects.none(), required=False,
+                                  help_text="Used for rows that don't name a club.")
+    dry_run = forms.BooleanField(required=False, initial=True, label="Dry run (only show what would be imported)")
+
+    def __init__(self, *args, clubs=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['club'].queryset = clubs if clubs is not None else Club.objects.all()
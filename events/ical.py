@@ -0,0 +1,172 @@
+# events/ical.py
+"""
+Minimal RFC 5545 (iCalendar) serialization and parsing for Event rows.
+
+Everything here is a generator so feeds can be streamed straight from a
+queryset .iterator() without building the whole calendar in memory, and
+uploaded calendars can be read line by line (see events/importer.py).
+"""
+import datetime
+import re
+import zoneinfo
+
+from django.core import signing
+from django.utils import timezone
+
+FEED_TOKEN_SALT = 'events.ical.user_feed'
+PAST_EVENTS_DAYS = 180 # How far back feeds reach; keeps polled feeds small
+FEED_FIELDS = ('id', 'title', 'description', 'date', 'time', 'location', 'updated_at', 'club__title')
+
+
+def user_feed_token(user):
+    """Stable, unguessable token identifying user's personal feed."""
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign(str(user.pk))
+
+
+def user_id_from_token(token):
+    """Returns the user ID encoded in token, or None if the signature is invalid."""
+    try:
+        return int(signing.Signer(salt=FEED_TOKEN_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def feed_window_start():
+    return timezone.localdate() - datetime.timedelta(days=PAST_EVENTS_DAYS)
+
+
+def _escape(text):
+    return (
+        (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    # Content lines longer than 75 octets are folded with CRLF + space
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        chunk = encoded[:limit]
+        while True: # Don't split a multi-byte character
+            try:
+                text = chunk.decode('utf-8')
+                break
+            except UnicodeDecodeError:
+                chunk = chunk[:-1]
+        parts.append(text)
+        encoded = encoded[len(chunk):]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc_stamp(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _event_lines(event, host):
+    yield 'BEGIN:VEVENT'
+    yield f"UID:event-{event['id']}@{host}"
+    yield f"DTSTAMP:{_utc_stamp(event['updated_at'])}"
+    if event['time']:
+        start = timezone.make_aware(datetime.datetime.combine(event['date'], event['time']))
+        yield f'DTSTART:{_utc_stamp(start)}'
+        yield 'DURATION:PT1H' # Events have no end time; show them as one hour
+    else:
+        yield f"DTSTART;VALUE=DATE:{event['date'].strftime('%Y%m%d')}"
+        yield f"DTEND;VALUE=DATE:{(event['date'] + datetime.timedelta(days=1)).strftime('%Y%m%d')}"
+    yield f"SUMMARY:{_escape(event['title'])}"
+    if event['description']:
+        yield f"DESCRIPTION:{_escape(event['description'])}"
+    if event['location']:
+        yield f"LOCATION:{_escape(event['location'])}"
+    if event['club__title']:
+        yield f"CATEGORIES:{_escape(event['club__title'])}"
+    yield 'END:VEVENT'
+
+
+def stream_calendar(events, name, host):
+    """
+    Yields the iCalendar document chunk by chunk. `events` should be an
+    iterator of dicts with FEED_FIELDS (e.g. queryset.values(*FEED_FIELDS).iterator()).
+    """
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//College Club Management//Events//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ]
+    yield ''.join(_fold(line) for line in header)
+    for event in events:
+        yield ''.join(_fold(line) for line in _event_lines(event, host))
+    yield _fold('END:VCALENDAR')
+
+
+def _unescape(text):
+    return re.sub(r'\\([\\;,nN])', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), text)
+
+
+def _unfold(lines):
+    """Yields (line number, logical content line) from raw lines, joining folded continuations."""
+    current, start = None, 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current:
+        yield start, current
+
+
+def _parse_dtstart(params, value):
+    """Returns (date, time or None) in local time for a DTSTART property."""
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.datetime.strptime(value, '%Y%m%d').date(), None
+    start = datetime.datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        start = timezone.localtime(start.replace(tzinfo=datetime.timezone.utc))
+    elif 'TZID' in params:
+        start = timezone.localtime(start.replace(tzinfo=zoneinfo.ZoneInfo(params['TZID'])))
+    return start.date(), start.time()
+
+
+def parse_events(lines):
+    """
+    Streams VEVENTs out of an iCalendar document (any iterable of text lines)
+    and yields (line number, fields) where fields has title, description,
+    location, date, time and club (taken from X-CLUB or CATEGORIES), or
+    (line number, error message) as a str for events that can't be read.
+    """
+    event = None
+    for number, line in _unfold(lines):
+        name, _, value = line.partition(':')
+        name, *param_parts = name.split(';')
+        name = name.upper()
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event, event_line = {}, number
+        elif name == 'END' and value.upper() == 'VEVENT' and event is not None:
+            if 'date' not in event:
+                yield event_line, "VEVENT has no valid DTSTART."
+            else:
+                yield event_line, event
+            event = None
+        elif event is None:
+            continue
+        elif name == 'SUMMARY':
+            event['title'] = _unescape(value)
+        elif name in ('DESCRIPTION', 'LOCATION'):
+            event[name.lower()] = _unescape(value)
+        elif name == 'X-CLUB' or (name == 'CATEGORIES' and 'club' not in event):
+            event['club'] = _unescape(value).split(',')[0].strip()
+        elif name == 'DTSTART':
+            params = dict(part.split('=', 1) for part in param_parts if '=' in part)
+            try:
+                event['date'], event['time'] = _parse_dtstart(params, value.strip())
+            except (ValueError, zoneinfo.ZoneInfoNotFoundError):
+                pass # Reported as a missing DTSTART when the VEVENT ends
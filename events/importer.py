@@ -0,0 +1,169 @@
+# events/importer.py
+"""
+Bulk event import from CSV or iCalendar (.ics).
+
+Rows are parsed as a stream, clubs are resolved with one lookup query for
+the whole file, duplicates of existing events (same club, date, time and
+title) are found with one range query, and the new events are written with
+a single bulk_create inside one transaction. A dry run does everything but
+the write and returns the same report.
+"""
+import csv
+import datetime
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Q
+
+from clubs.models import Club
+from search import index as search_index
+from . import ical
+from .models import Event
+
+CSV_COLUMNS = ('title', 'date', 'time', 'location', 'description', 'club')
+TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%I:%M %p')
+
+
+@dataclass
+class EventImportReport:
+    created: list = field(default_factory=list) # Event objects (saved unless dry_run)
+    duplicates: list = field(default_factory=list) # (line, title) of rows matching an existing or earlier row
+    errors: list = field(default_factory=list) # (line, message)
+    dry_run: bool = False
+
+
+def _parse_time(value):
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time {value!r}; use HH:MM.")
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; use YYYY-MM-DD.") from None
+
+
+def parse_csv(lines):
+    """
+    Streams rows of a CSV with a header of CSV_COLUMNS (title and date
+    required; date as YYYY-MM-DD, club as a slug) and yields (line number,
+    fields) or (line number, error message).
+    """
+    reader = csv.DictReader(lines)
+    missing = {'title', 'date'} - {name.strip().lower() for name in reader.fieldnames or ()}
+    if missing:
+        yield 1, f"Missing required column(s): {', '.join(sorted(missing))}."
+        return
+    for row in reader:
+        if None in row: # DictReader files fields beyond the header under the key None
+            yield reader.line_num, f"Row has {len(row[None])} more field(s) than the header."
+            continue
+        row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+        try:
+            fields = {
+                'title': row['title'],
+                'date': _parse_date(row['date']),
+                'time': _parse_time(row['time']) if row.get('time') else None,
+                'location': row.get('location', ''),
+                'description': row.get('description', ''),
+                'club': row.get('club', ''),
+            }
+        except ValueError as error:
+            yield reader.line_num, str(error)
+            continue
+        yield reader.line_num, fields
+
+
+def _title_key(title):
+    return ' '.join(title.split()).casefold()
+
+
+def _resolve_clubs(references):
+    """Maps each club slug or title in references to a club ID with one query."""
+    if not references:
+        return {}
+    lookup = {}
+    for pk, slug, title in Club.objects.filter(Q(slug__in=references) | Q(title__in=references)).values_list('pk', 'slug', 'title'):
+        lookup[slug] = lookup[title] = pk
+    return lookup
+
+
+def import_events(rows, user=None, default_club=None, allowed_club_ids=None, dry_run=False):
+    """
+    Imports parsed rows (from parse_csv or ical.parse_events). Rows without a
+    club use default_club; if allowed_club_ids is given, rows for other clubs
+    are rejected. A file that can't be decoded or parsed as a whole imports
+    nothing and is reported as an error. Returns an EventImportReport.
+    """
+    report = EventImportReport(dry_run=dry_run)
+    parsed = []
+    line = 0
+    try:
+        for line, fields in rows:
+            if isinstance(fields, str):
+                report.errors.append((line, fields))
+            elif not fields.get('title'):
+                report.errors.append((line, "Event has no title."))
+            else:
+                parsed.append((line, fields))
+    except UnicodeDecodeError:
+        report.errors.append((line + 1, "The file is not UTF-8 text; save it as UTF-8 and upload it again."))
+        return report
+    except csv.Error as error:
+        report.errors.append((line + 1, f"The file could not be read as CSV: {error}."))
+        return report
+
+    clubs = _resolve_clubs({fields['club'] for _, fields in parsed if fields.get('club')})
+    candidates = []
+    for line, fields in parsed:
+        reference = fields.get('club')
+        club_id = clubs.get(reference) if reference else (default_club.pk if default_club else None)
+        if reference and club_id is None:
+            report.errors.append((line, f"Unknown club {reference!r}."))
+        elif club_id is None:
+            report.errors.append((line, "No club given and no default club selected."))
+        elif allowed_club_ids is not None and club_id not in allowed_club_ids:
+            report.errors.append((line, f"You can't add events to club {reference or default_club}."))
+        else:
+            candidates.append((line, Event(
+                title=fields['title'][:200],
+                description=fields.get('description', ''),
+                date=fields['date'],
+                time=fields.get('time'),
+                location=fields.get('location') or None,
+                club_id=club_id,
+                created_by=user,
+            )))
+
+    if candidates:
+        # Everything that could collide, in one query over the file's club/date span
+        dates = [event.date for _, event in candidates]
+        existing = Event.objects.filter(
+            club_id__in={event.club_id for _, event in candidates},
+            date__range=(min(dates), max(dates)),
+        ).values_list('club_id', 'date', 'time', 'title')
+        seen = {(club_id, date, time, _title_key(title)) for club_id, date, time, title in existing.iterator()}
+        for line, event in candidates:
+            key = (event.club_id, event.date, event.time, _title_key(event.title))
+            if key in seen:
+                report.duplicates.append((line, event.title))
+            else:
+                seen.add(key) # Also catches rows repeated within the file
+                report.created.append(event)
+
+    if report.created and not dry_run:
+        with transaction.atomic():
+            Event.objects.bulk_create(report.created, batch_size=500)
+            # bulk_create skips post_save, so the search index is updated here
+            search_index.index_objects(report.created)
+    return report
+
+
+def parse_upload(name, lines):
+    """Picks the parser from the file name: .ics files are iCalendar, anything else CSV."""
+    return ical.parse_events(lines) if name.lower().endswith('.ics') else parse_csv(lines)
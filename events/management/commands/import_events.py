@@ -0,0 +1,45 @@
+# events/management/commands/import_events.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from clubs.models import Club
+from events import importer
+
+
+class Command(BaseCommand):
+    help = "Bulk-imports events from a CSV (title,date,time,location,description,club) or .ics file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or .ics file to import.")
+        parser.add_argument('--club', help="Slug of the club for rows that don't name one.")
+        parser.add_argument('--user', help="Username recorded as the events' creator.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be imported without writing.")
+
+    def handle(self, *args, **options):
+        default_club = user = None
+        if options['club']:
+            default_club = Club.objects.filter(slug=options['club']).first()
+            if default_club is None:
+                raise CommandError(f"No club with slug {options['club']!r}.")
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as source:
+                report = importer.import_events(
+                    importer.parse_upload(options['path'], source),
+                    user=user, default_club=default_club, dry_run=options['dry_run'],
+                )
+        except OSError as error:
+            raise CommandError(error)
+
+        for line, message in report.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        for line, title in report.duplicates:
+            self.stdout.write(f"Line {line}: skipped duplicate {title!r}")
+        verb = "Would import" if report.dry_run else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(report.created)} event(s); {len(report.duplicates)} duplicate(s), {len(report.errors)} error(s)."
+        ))
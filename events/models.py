@@ -5,6 +5,7 @@ from django.db import models
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
+from django.contrib.contenttypes.fields import GenericRelation # For feedback app
 from clubs.models import Club # Assuming you have a Club model
 from django.conf import settings # To link to your CustomUser model
 
@@ -25,8 +26,18 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Generic relations for feedback and ratings, so they're deleted with the event
+    ratings = GenericRelation('feedback.Rating')
+    feedback = GenericRelation('feedback.Feedback')
+    rating_summaries = GenericRelation('feedback.RatingSummary') # Denormalized count/sum, at most one row
+
     class Meta:
         ordering = ['date', 'time'] # Order events by date, then time
+        indexes = [
+            # Date-window queries for the calendar and the range API
+            models.Index(fields=['date', 'time'], name='event_date_time_idx'),
+            models.Index(fields=['club', 'date'], name='event_club_date_idx'),
+        ]
         verbose_name = "Event"
         verbose_name_plural = "Events"
 
@@ -1,3 +1,152 @@
-from django.test import TestCase
+import datetime
+import io
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from clubs.models import Club
+from search import index as search_index
+from . import importer
+from .models import Event
+
+User = get_user_model()
+
+HEADER = 'title,date,time,location,description,club\n'
+
+
+class EventImporterTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        self.chess = Club.objects.create(title='Chess', description='Chess club', manager=self.manager)
+        self.drama = Club.objects.create(title='Drama', description='Drama club', manager=self.manager)
+
+    def run_import(self, text, **kwargs):
+        return importer.import_events(importer.parse_csv(io.StringIO(HEADER + text)), **kwargs)
+
+    def test_duplicates_of_existing_events_and_of_earlier_rows_are_skipped(self):
+        Event.objects.create(title='Weekly  Blitz', description='', date=datetime.date(2026, 3, 2),
+                             time=datetime.time(18, 0), club=self.chess)
+
+        report = self.run_import(
+            'weekly blitz,2026-03-02,18:00,,,chess\n' # Same event, other spacing and case
+            'Open night,2026-03-03,,,,chess\n'
+            'Open night,2026-03-03,,,,chess\n' # Repeated within the file
+            'Open night,2026-03-03,,,,drama\n' # Same title, other club
+        )
+
+        self.assertEqual(report.errors, [])
+        self.assertEqual(report.duplicates, [(2, 'weekly blitz'), (4, 'Open night')])
+        self.assertEqual(Event.objects.filter(title='Open night').count(), 2)
+
+    def test_bad_rows_are_reported_and_the_rest_imported(self):
+        report = self.run_import(
+            'Blitz,2026-03-02,18:00,,,chess\n'
+            'Bad date,03/02/2026,,,,chess\n'
+            'Bad time,2026-03-02,six,,,chess\n'
+            ',2026-03-02,,,,chess\n'
+            'Nowhere,2026-03-02,,,,no-such-club\n'
+            'No club,2026-03-02,,,,\n'
+            'Extra,2026-03-02,,Hall,Talk,chess,surplus\n'
+        )
+
+        self.assertEqual(sorted(line for line, _ in report.errors), [3, 4, 5, 6, 7, 8])
+        self.assertIn('more field', dict(report.errors)[8])
+        self.assertEqual([event.title for event in report.created], ['Blitz'])
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_officers_cannot_import_into_other_clubs(self):
+        report = self.run_import('Rehearsal,2026-03-02,,,,drama\n', allowed_club_ids={self.chess.pk})
+
+        self.assertEqual(len(report.errors), 1)
+        self.assertFalse(Event.objects.exists())
+
+    def test_dry_run_writes_nothing(self):
+        report = self.run_import('Blitz,2026-03-02,,,,chess\n', dry_run=True)
+
+        self.assertEqual(len(report.created), 1)
+        self.assertFalse(Event.objects.exists())
+
+    def test_missing_required_column(self):
+        report = importer.import_events(importer.parse_csv(io.StringIO('title,time\nBlitz,18:00\n')))
+
+        self.assertEqual(report.errors, [(1, 'Missing required column(s): date.')])
+
+    @override_settings(STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+    def test_upload_that_is_not_utf8_shows_an_error_instead_of_failing(self):
+        self.client.force_login(self.manager)
+        upload = SimpleUploadedFile('schedule.csv', (HEADER + 'Caf\xe9 night,2026-03-02,,,,chess\n').encode('latin-1'))
+
+        response = self.client.post(reverse('event_import'), {'source': upload, 'club': '', 'dry_run': 'on'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('not UTF-8', response.context['report'].errors[0][1])
+        self.assertFalse(Event.objects.exists())
+
+
+@override_settings(STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+class EventCalendarSearchTests(TestCase):
+    def test_search_finds_upcoming_events_behind_many_past_matches(self):
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        club = Club.objects.create(title='Chess', description='Chess club', manager=manager)
+        long_ago = datetime.date(2000, 1, 1)
+        past = Event.objects.bulk_create(
+            Event(title=f'Chess practice {n}', description='', date=long_ago, club=club) for n in range(1100)
+        )
+        search_index.index_objects(past)
+        upcoming = Event.objects.create(title='Chess practice finals', description='',
+                                        date=timezone.localdate() + datetime.timedelta(days=7), club=club)
+
+        response = self.client.get(reverse('event_calendar'), {'q': 'chess practice', 'club': club.slug})
+
+        self.assertEqual(list(response.context['events']), [upcoming])
+
+
+@override_settings(STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+class EventCalendarCursorPaginationTests(TestCase):
+    def setUp(self):
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        club = Club.objects.create(title='Chess', description='Chess club', manager=manager)
+        today = timezone.localdate()
+        # Ties on date and on time, and events without a time, so the keyset has to fall through every field
+        times = [None, datetime.time(9, 0), datetime.time(9, 0), datetime.time(18, 30)]
+        self.events = [
+            Event.objects.create(title=f'Event {n}', description='', club=club,
+                                 date=today + datetime.timedelta(days=n % 3), time=times[n % len(times)])
+            for n in range(25)
+        ]
+        Event.objects.create(title='Past', description='', club=club, date=today - datetime.timedelta(days=1))
+        self.events.sort(key=lambda event: (event.date, event.time or datetime.time.min, event.pk))
+
+    def page(self, query):
+        response = self.client.get(reverse('event_calendar') + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_next_and_previous_links_walk_every_upcoming_event_once(self):
+        pages = [self.page('?cursor=')]
+        while pages[-1]['next_page_url']:
+            pages.append(self.page(pages[-1]['next_page_url']))
+        forward = [event for context in pages for event in context['events']]
+
+        backward = [list(pages[-1]['events'])]
+        context = pages[-1]
+        while context['previous_page_url']:
+            context = self.page(context['previous_page_url'])
+            backward.insert(0, list(context['events']))
+
+        self.assertEqual([len(context['events']) for context in pages], [10, 10, 5])
+        self.assertEqual(forward, self.events)
+        self.assertEqual([event for page in backward for event in page], self.events)
+
+    def test_numbered_pages_use_the_cursor_order(self):
+        pages = [self.page(f'?page={number}') for number in (1, 2, 3)]
+
+        self.assertEqual([event for context in pages for event in context['events']], self.events)
+
+    def test_tampered_cursor_is_not_found(self):
+        response = self.client.get(reverse('event_calendar'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
@@ -7,6 +7,11 @@ from . import views
 urlpatterns = [
     path('', views.EventCalendarView.as_view(), name='event_calendar'), # The main calendar page
     path('create/', views.EventCreateView.as_view(), name='event_create'),
+    path('import/', views.EventImportView.as_view(), name='event_import'),
+    path('api/range', views.event_range_api, name='event_range_api'), # ?start=&end=&club= JSON for calendar grids
+    path('ical/club/<slug:slug>.ics', views.club_ical_feed, name='club_ical_feed'),
+    path('ical/user/<str:token>.ics', views.user_ical_feed, name='user_ical_feed'),
+    path('ical/my-feed/', views.my_ical_feed, name='my_ical_feed'),
     path('<int:pk>/', views.EventDetailView.as_view(), name='event_detail'),
     path('<int:pk>/update/', views.EventUpdateView.as_view(), name='event_update'),
     path('<int:pk>/delete/', views.EventDeleteView.as_view(), name='event_delete'),
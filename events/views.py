@@ -3,25 +3,48 @@
 
 
 # events/views.py
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, FormView
+from django.contrib import messages
+import io
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin # For views that require login
 from django.utils import timezone # For filtering by date
+from django.db.models import Count, Max, TimeField, Value
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse, StreamingHttpResponse, Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+import datetime
+import hashlib
 from .models import Event
-from .forms import EventForm # You'll create this form next
-from college_club_management.decorators import CollegeAdminRequiredMixin, ClubManagerRequiredMixin # Assuming these are defined
+from search import index as search_index
+from clubs.models import Club, ClubMembership
+from . import ical, importer
+from .forms import EventForm, EventImportForm # You'll create this form next
+from college_club_management.decorators import CollegeAdminRequiredMixin, ClubManagerRequiredMixin, ClubOfficerOrAdminRequiredMixin # Assuming these are defined
+from college_club_management.pagination import CursorPaginationMixin
+from college_club_management.asyncviews import streaming_content
 
-class EventCalendarView(ListView):
+class EventCalendarView(CursorPaginationMixin, ListView):
     model = Event
     template_name = 'events/event_calendar.html'
     context_object_name = 'events'
     paginate_by = 10 # Display 10 events per page
+    # Keyset for ?cursor= pagination; time is nullable, so the cursor uses a non-null sort key for it
+    cursor_ordering = ('date', 'time_key', 'id')
+    cursor_count_mode = 'estimated'
 
     def get_queryset(self):
         # By default, show only upcoming events, ordered by date and time
+        # Same keyset as cursor_ordering, so ?page= and ?cursor= list events in one order
+        # (untimed events first on each day, on every database)
         queryset = super().get_queryset().filter(
             date__gte=timezone.localdate() # Filter for events today or in the future
-        ).order_by('date', 'time')
+        ).annotate(
+            time_key=Coalesce('time', Value(datetime.time.min), output_field=TimeField())
+        ).order_by(*self.cursor_ordering).select_related('club') # Template links each event's club
 
         # Optional: Add filtering by club or search (example)
         club_slug = self.request.GET.get('club')
@@ -30,7 +53,8 @@ class EventCalendarView(ListView):
         
         search_query = self.request.GET.get('q')
         if search_query:
-            queryset = queryset.filter(title__icontains=search_query) # Simple title search
+            # Full-text match on title, description and location via the search index, within the date/club filters
+            queryset = search_index.filter_matching(queryset, search_query)
         
         return queryset
 
@@ -41,6 +65,121 @@ class EventCalendarView(ListView):
         context['selected_club'] = self.request.GET.get('club', '')
         return context
 
+# --- Date-range JSON API for calendar grids ---
+MAX_RANGE_DAYS = 93 # Roughly a quarter; a month grid with padding needs ~42 days
+
+class InvalidRange(ValueError):
+    pass
+
+def _parse_range(request):
+    """Parses ?start=YYYY-MM-DD&end=YYYY-MM-DD&club=<slug> into (start, end, club_slug)."""
+    try:
+        start = datetime.date.fromisoformat(request.GET.get('start', ''))
+        end = datetime.date.fromisoformat(request.GET.get('end', ''))
+    except ValueError:
+        raise InvalidRange("start and end are required dates in YYYY-MM-DD format.")
+    if end < start:
+        raise InvalidRange("end must not be before start.")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise InvalidRange(f"The date range may span at most {MAX_RANGE_DAYS} days.")
+    return start, end, request.GET.get('club') or None
+
+def _range_queryset(start, end, club_slug):
+    # Served by the (date, time) index, or (club, date) when filtering by club
+    queryset = Event.objects.filter(date__gte=start, date__lte=end)
+    if club_slug:
+        queryset = queryset.filter(club__slug=club_slug)
+    return queryset
+
+def _range_etag(request):
+    # One aggregate (count + newest updated_at) decides whether the window changed;
+    # a matching If-None-Match gets a 304 without fetching any event rows
+    try:
+        start, end, club_slug = _parse_range(request)
+    except InvalidRange:
+        return None
+    stats = _range_queryset(start, end, club_slug).order_by().aggregate(count=Count('id'), last_updated=Max('updated_at'))
+    key = f"{start}|{end}|{club_slug}|{stats['count']}|{stats['last_updated']}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+@require_GET
+@cache_control(max_age=0, must_revalidate=True)
+@condition(etag_func=_range_etag)
+def event_range_api(request):
+    try:
+        start, end, club_slug = _parse_range(request)
+    except InvalidRange as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    rows = _range_queryset(start, end, club_slug).order_by('date', 'time', 'id').values_list(
+        'id', 'title', 'date', 'time', 'location', 'club__slug'
+    )
+    events = [
+        {
+            'id': pk,
+            'title': title,
+            'date': date.isoformat(),
+            'time': time.strftime('%H:%M') if time else None,
+            'location': location,
+            'club': club,
+        }
+        for pk, title, date, time, location, club in rows
+    ]
+    return JsonResponse({'start': start.isoformat(), 'end': end.isoformat(), 'events': events})
+
+# --- iCalendar feeds (per club and per user) ---
+def _club_feed_queryset(slug):
+    return Event.objects.filter(club__slug=slug, date__gte=ical.feed_window_start())
+
+def _user_feed_queryset(token):
+    user_id = ical.user_id_from_token(token)
+    if user_id is None:
+        raise Http404("Unknown calendar feed.")
+    joined = ClubMembership.objects.filter(user_id=user_id, user__is_active=True).values('club_id')
+    return Event.objects.filter(club__in=joined, date__gte=ical.feed_window_start())
+
+def _feed_state(request, queryset):
+    # Calendar clients poll hard: one aggregate (shared by the ETag and Last-Modified
+    # checks) decides between a cheap 304 and streaming the full feed
+    if not hasattr(request, '_ical_feed_state'):
+        request._ical_feed_state = queryset.order_by().aggregate(count=Count('id'), last_updated=Max('updated_at'))
+    return request._ical_feed_state
+
+def _feed_etag(request, queryset):
+    state = _feed_state(request, queryset)
+    return hashlib.md5(f"{state['count']}|{state['last_updated']}".encode()).hexdigest()
+
+def _ical_response(queryset, name, request):
+    events = queryset.order_by('date', 'time', 'id').values(*ical.FEED_FIELDS).iterator(chunk_size=500)
+    response = StreamingHttpResponse(
+        streaming_content(request, ical.stream_calendar(events, name, request.get_host())),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response['Content-Disposition'] = 'inline; filename="events.ics"'
+    return response
+
+@require_GET
+@condition(
+    etag_func=lambda request, slug: _feed_etag(request, _club_feed_queryset(slug)),
+    last_modified_func=lambda request, slug: _feed_state(request, _club_feed_queryset(slug))['last_updated'],
+)
+def club_ical_feed(request, slug):
+    club = get_object_or_404(Club.objects.only('title'), slug=slug)
+    return _ical_response(_club_feed_queryset(slug), club.title, request)
+
+@require_GET
+@condition(
+    etag_func=lambda request, token: _feed_etag(request, _user_feed_queryset(token)),
+    last_modified_func=lambda request, token: _feed_state(request, _user_feed_queryset(token))['last_updated'],
+)
+def user_ical_feed(request, token):
+    return _ical_response(_user_feed_queryset(token), "My club events", request)
+
+@login_required
+def my_ical_feed(request):
+    # Sends the user to their personal, tokenized feed URL (to copy into a calendar app)
+    return redirect('user_ical_feed', token=ical.user_feed_token(request.user))
+
 # Optional: Detail view for a single event
 class EventDetailView(DetailView):
     model = Event
@@ -59,6 +198,43 @@ class EventCreateView(LoginRequiredMixin, ClubManagerRequiredMixin, CreateView):
         form.instance.created_by = self.request.user # Set the creator
         return super().form_valid(form)
 
+# Bulk import of a semester schedule; officers may only import into clubs they manage
+class EventImportView(LoginRequiredMixin, ClubOfficerOrAdminRequiredMixin, FormView):
+    form_class = EventImportForm
+    template_name = 'events/event_import.html'
+
+    def get_clubs(self):
+        if self.request.user.is_college_admin():
+            return Club.objects.all()
+        return Club.objects.filter(manager=self.request.user)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['clubs'] = self.get_clubs()
+        return kwargs
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['source']
+        allowed_club_ids = None
+        if not self.request.user.is_college_admin():
+            allowed_club_ids = set(self.get_clubs().values_list('id', flat=True))
+        lines = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='') # Parsed line by line, never read whole
+        report = importer.import_events(
+            importer.parse_upload(upload.name, lines),
+            user=self.request.user,
+            default_club=form.cleaned_data['club'],
+            allowed_club_ids=allowed_club_ids,
+            dry_run=form.cleaned_data['dry_run'],
+        )
+        if report.dry_run or (report.errors and not report.created):
+            # Show the report so the file can be fixed (or imported for real) before anything is saved
+            return self.render_to_response(self.get_context_data(form=form, report=report))
+        messages.success(self.request, f"Imported {len(report.created)} event(s); skipped {len(report.duplicates)} duplicate(s).")
+        if report.errors:
+            messages.warning(self.request, f"{len(report.errors)} row(s) could not be imported: " +
+                             "; ".join(f"line {line}: {message}" for line, message in report.errors[:10]))
+        return redirect('event_calendar')
+
 class EventUpdateView(LoginRequiredMixin, ClubManagerRequiredMixin, UpdateView):
     model = Event
     form_class = EventForm
@@ -3,18 +3,42 @@ from django.contrib import admin
 # Register your models here.
 # feedback/admin.py
 from django.contrib import admin
-from .models import Rating, Feedback
+from .models import Rating, Feedback, RatingSummary
+from college_club_management.pagination import EstimatedCountPaginator
+
+class GenericTargetAdminMixin:
+    """
+    Changelist settings for the large generic-FK tables: users are joined in,
+    content objects are prefetched in one query per content type instead of
+    one per row, and counts are estimated.
+    """
+    list_select_related = ('user', 'content_type')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('content_object')
 
 @admin.register(Rating)
-class RatingAdmin(admin.ModelAdmin):
+class RatingAdmin(GenericTargetAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'content_object', 'rating', 'created_at') # Note 'rating' here
     list_filter = ('content_type', 'rating', 'created_at')
     readonly_fields = ('user', 'created_at', 'content_type', 'object_id')
     search_fields = ('user__username',)
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(GenericTargetAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'content_object', 'comment', 'created_at')
     list_filter = ('content_type', 'created_at')
     readonly_fields = ('user', 'created_at', 'content_type', 'object_id')
-    search_fields = ('comment', 'user__username',)
\ No newline at end of file
+    search_fields = ('comment', 'user__username',)
+
+@admin.register(RatingSummary)
+class RatingSummaryAdmin(admin.ModelAdmin):
+    list_select_related = ('content_type',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_display = ('content_type', 'object_id', 'rating_count', 'rating_sum', 'updated_at')
+    list_filter = ('content_type',)
+    readonly_fields = ('content_type', 'object_id', 'rating_count', 'rating_sum',
+                       'count_1', 'count_2', 'count_3', 'count_4', 'count_5', 'updated_at')
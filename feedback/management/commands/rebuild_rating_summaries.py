@@ -0,0 +1,71 @@
+# feedback/management/commands/rebuild_rating_summaries.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from feedback.models import Rating, RatingSummary
+
+HISTOGRAM_FIELDS = [f'count_{stars}' for stars in range(1, 6)]
+SUMMARY_FIELDS = ['rating_count', 'rating_sum'] + HISTOGRAM_FIELDS
+
+
+def expected_summaries():
+    """Aggregates the Rating table into {(content_type_id, object_id): {field: value}}."""
+    rows = Rating.objects.order_by().values('content_type_id', 'object_id').annotate(
+        rating_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'count_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)}
+    )
+    return {
+        (row['content_type_id'], row['object_id']): {field: row[field] for field in SUMMARY_FIELDS}
+        for row in rows
+    }
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalized RatingSummary rows from the Rating table, or checks them with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only compare the summaries with the Rating table and report drift; exit non-zero if any is found.",
+        )
+
+    def handle(self, *args, **options):
+        expected = expected_summaries()
+
+        if options['check']:
+            self.check_summaries(expected)
+            return
+
+        with transaction.atomic():
+            RatingSummary.objects.all().delete()
+            RatingSummary.objects.bulk_create(
+                [
+                    RatingSummary(content_type_id=content_type_id, object_id=object_id, **values)
+                    for (content_type_id, object_id), values in expected.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(expected)} rating summaries."))
+
+    def check_summaries(self, expected):
+        mismatches = 0
+        seen = set()
+        for summary in RatingSummary.objects.values('content_type_id', 'object_id', *SUMMARY_FIELDS).iterator():
+            key = (summary['content_type_id'], summary['object_id'])
+            seen.add(key)
+            actual = {field: summary[field] for field in SUMMARY_FIELDS}
+            wanted = expected.get(key, {field: 0 for field in SUMMARY_FIELDS})
+            if actual != wanted:
+                mismatches += 1
+                self.stdout.write(f"Mismatch for content_type={key[0]} object_id={key[1]}: stored {actual}, expected {wanted}")
+
+        for key in expected.keys() - seen:
+            mismatches += 1
+            self.stdout.write(f"Missing summary for content_type={key[0]} object_id={key[1]}: expected {expected[key]}")
+
+        if mismatches:
+            raise CommandError(f"{mismatches} rating summaries are out of date. Run without --check to rebuild them.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(seen)} rating summaries match the Rating table."))
@@ -2,7 +2,9 @@ from django.db import models
 
 # Create your models here.
 # feedback/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -50,3 +52,95 @@ class Feedback(models.Model):
     def __str__(self):
         content_name = self.content_object.title if hasattr(self.content_object, 'title') else str(self.content_object)
         return f"Feedback by {self.user.username} on {content_name}: {self.comment[:50]}..."
+
+class RatingSummary(models.Model):
+    """
+    Denormalized per-object rating totals, kept in step with Rating rows so
+    average-rating reads never have to aggregate the whole Rating table.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    # Histogram of how many ratings landed on each star value
+    count_1 = models.PositiveIntegerField(default=0)
+    count_2 = models.PositiveIntegerField(default=0)
+    count_3 = models.PositiveIntegerField(default=0)
+    count_4 = models.PositiveIntegerField(default=0)
+    count_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('content_type', 'object_id') # One summary row per rated object
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id}: {self.rating_count} ratings"
+
+    @property
+    def average(self):
+        """Average star rating, or None when the object has not been rated yet."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def histogram(self):
+        """Returns {stars: count} for 1 to 5 stars."""
+        return {stars: getattr(self, f'count_{stars}') for stars in range(1, 6)}
+
+    @classmethod
+    def for_object(cls, obj):
+        """Returns the summary row for obj, or None if it has never been rated."""
+        return cls.objects.filter(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk
+        ).first()
+
+    @classmethod
+    def annotations_for(cls, model):
+        """
+        Returns annotate() kwargs adding avg_rating and rating_count to a queryset
+        of `model`, read from the summary rows via an indexed subquery per row.
+        """
+        summaries = cls.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=OuterRef('pk'),
+            rating_count__gt=0
+        )
+        average = Cast('rating_sum', FloatField()) / Cast('rating_count', FloatField())
+        return {
+            'avg_rating': Subquery(summaries.annotate(average=average).values('average')[:1], output_field=FloatField()),
+            'rating_count': Coalesce(Subquery(summaries.values('rating_count')[:1]), 0),
+        }
+
+    @classmethod
+    def record_rating(cls, content_type, object_id, new_rating, old_rating=None):
+        """
+        Applies a new rating (old_rating=None) or a re-rate (old_rating -> new_rating)
+        to the summary row. Uses F() expressions so concurrent submissions don't
+        overwrite each other; call inside the same transaction as the Rating write.
+        """
+        with transaction.atomic():
+            summary, _ = cls.objects.get_or_create(content_type=content_type, object_id=object_id)
+            if old_rating == new_rating:
+                return
+            updates = {
+                'rating_sum': F('rating_sum') + new_rating,
+                f'count_{new_rating}': F(f'count_{new_rating}') + 1,
+            }
+            if old_rating is None:
+                updates['rating_count'] = F('rating_count') + 1
+            else:
+                updates['rating_sum'] = F('rating_sum') + (new_rating - old_rating)
+                updates[f'count_{old_rating}'] = F(f'count_{old_rating}') - 1
+            cls.objects.filter(pk=summary.pk).update(**updates)
+
+    @classmethod
+    def remove_rating(cls, content_type, object_id, old_rating):
+        """Reverses a deleted rating in the summary row (if one exists)."""
+        cls.objects.filter(content_type=content_type, object_id=object_id, rating_count__gt=0).update(
+            rating_count=F('rating_count') - 1,
+            rating_sum=F('rating_sum') - old_rating,
+            **{f'count_{old_rating}': F(f'count_{old_rating}') - 1}
+        )
@@ -0,0 +1,121 @@
+# feedback/registry.py
+"""
+Registry of models that can receive ratings and feedback.
+
+Resolving a URL's (model_name, identifier) used to cost an uncached ContentType
+query plus an object lookup on every request. Here model names map to
+(ContentType, model class) through an in-process cache, slugs map to primary
+keys through the shared cache (invalidated by feedback.signals on save/delete),
+so a feedback endpoint resolves its target in at most one query. The
+a-prefixed variants are for the async views.
+"""
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+
+# URL model_name -> 'app_label.ModelName'
+RATABLE_MODELS = {
+    'club': 'clubs.Club',
+    'event': 'events.Event',
+}
+
+SLUG_CACHE_TIMEOUT = 60 * 60 * 24 # Invalidated on save/delete, so this is only a safety net
+
+_resolved = {} # model_name -> (ContentType, model class, has_slug), filled on first use per process
+
+
+def ratable_models():
+    """Returns the registered model classes."""
+    return [apps.get_model(label) for label in RATABLE_MODELS.values()]
+
+
+def resolve_model(model_name):
+    """Returns (content_type, model_class, has_slug) for a registered model name, or None."""
+    if model_name not in _resolved:
+        label = RATABLE_MODELS.get(model_name)
+        if label is None:
+            return None
+        model_class = apps.get_model(label)
+        has_slug = any(field.name == 'slug' for field in model_class._meta.get_fields())
+        _resolved[model_name] = (ContentType.objects.get_for_model(model_class), model_class, has_slug)
+    return _resolved[model_name]
+
+
+def _slug_key(model_class, slug):
+    return f'feedback:slug_pk:{model_class._meta.label_lower}:{slug}'
+
+
+def invalidate_slug(model_class, slug):
+    if slug:
+        cache.delete(_slug_key(model_class, slug))
+
+
+def resolve_object(model_name, identifier):
+    """
+    Returns (content_type, obj) for the object named by a feedback URL, or
+    (None, None). Numeric identifiers are primary keys; anything else is a
+    slug, whose pk is looked up in the cache first. Costs at most one query.
+    """
+    resolved = resolve_model(model_name)
+    if resolved is None:
+        return None, None
+    content_type, model_class, has_slug = resolved
+    identifier = str(identifier)
+
+    try:
+        if identifier.isdigit() or not has_slug:
+            obj = model_class.objects.get(pk=identifier)
+        else:
+            key = _slug_key(model_class, identifier)
+            pk = cache.get(key)
+            obj = model_class.objects.filter(pk=pk, slug=identifier).first() if pk is not None else None
+            if obj is None:
+                obj = model_class.objects.get(slug=identifier)
+                cache.set(key, obj.pk, SLUG_CACHE_TIMEOUT)
+    except (model_class.DoesNotExist, ValueError):
+        return None, None
+    return content_type, obj
+
+
+async def aresolve_model(model_name):
+    """Async resolve_model(); only the first call per model and process runs a query."""
+    if model_name in _resolved:
+        return _resolved[model_name]
+    return await sync_to_async(resolve_model)(model_name)
+
+
+async def aresolve_object(model_name, identifier):
+    """Async resolve_object(), for the async read views; runs it in one thread hop."""
+    return await sync_to_async(resolve_object)(model_name, identifier)
+
+
+async def aresolve_identifiers(model_name, identifiers):
+    """
+    Maps many URL identifiers (pks or slugs) of one registered model to primary
+    keys: {identifier: pk}. Slugs come from the cache where possible, with one
+    query for all misses; unknown identifiers are left out.
+    """
+    resolved_model = await aresolve_model(model_name)
+    if resolved_model is None:
+        return {}
+    _, model_class, has_slug = resolved_model
+
+    resolved = {}
+    pks = {identifier: int(identifier) for identifier in identifiers if str(identifier).isdigit()}
+    if pks:
+        existing = {pk async for pk in model_class.objects.filter(pk__in=pks.values()).values_list('pk', flat=True)}
+        resolved.update({identifier: pk for identifier, pk in pks.items() if pk in existing})
+
+    slugs = [identifier for identifier in identifiers if identifier not in pks]
+    if slugs and has_slug:
+        keys = {_slug_key(model_class, slug): slug for slug in slugs}
+        cached = await cache.aget_many(keys)
+        resolved.update({keys[key]: pk for key, pk in cached.items()})
+        missing = [slug for slug in slugs if slug not in resolved]
+        if missing:
+            found = {slug: pk async for slug, pk in model_class.objects.filter(slug__in=missing).values_list('slug', 'pk')}
+            await cache.aset_many({_slug_key(model_class, slug): pk for slug, pk in found.items()}, SLUG_CACHE_TIMEOUT)
+            resolved.update(found)
+    return resolved
+
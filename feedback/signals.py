@@ -0,0 +1,22 @@
+# feedback/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Rating, RatingSummary
+from . import registry
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    # Keep the denormalized summary in step when ratings are removed
+    # (admin deletes, user deletion cascades, etc.)
+    RatingSummary.remove_rating(instance.content_type_id, instance.object_id, instance.rating)
+
+
+def ratable_object_changed(sender, instance, **kwargs):
+    # Drop the cached slug -> pk mapping so a renamed or deleted object isn't resolved from cache
+    registry.invalidate_slug(sender, getattr(instance, 'slug', None))
+
+
+for model in registry.ratable_models():
+    post_save.connect(ratable_object_changed, sender=model, dispatch_uid=f'feedback_slug_{model._meta.label_lower}')
+    post_delete.connect(ratable_object_changed, sender=model, dispatch_uid=f'feedback_slug_del_{model._meta.label_lower}')
@@ -1,3 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from clubs.models import Club
+from events.models import Event
+from .management.commands.rebuild_rating_summaries import expected_summaries
+from .models import Feedback, Rating, RatingSummary
+
+User = get_user_model()
+
+
+class RatingSummaryTests(TestCase):
+    def setUp(self):
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        self.club = Club.objects.create(title='Chess', description='Chess club', manager=manager)
+        self.alice = User.objects.create_user('alice', 'alice@example.com', None)
+        self.bob = User.objects.create_user('bob', 'bob@example.com', None)
+
+    def rate(self, user, stars):
+        self.client.force_login(user)
+        url = reverse('submit_feedback', args=['club', self.club.slug])
+        response = self.client.post(url, {'rating': stars, 'submit_rating': '1'})
+        self.assertEqual(response.status_code, 302)
+
+    def summary(self):
+        return RatingSummary.for_object(self.club)
+
+    def test_new_ratings_are_counted_when_submitted(self):
+        self.rate(self.alice, 4)
+        self.rate(self.bob, 2)
+
+        summary = self.summary()
+        self.assertEqual((summary.rating_count, summary.rating_sum), (2, 6))
+        self.assertEqual(summary.average, 3)
+        self.assertEqual(summary.histogram, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0})
+
+    def test_rerating_moves_the_rating_without_counting_it_twice(self):
+        self.rate(self.alice, 4)
+        self.rate(self.alice, 5)
+
+        summary = self.summary()
+        self.assertEqual((summary.rating_count, summary.rating_sum), (1, 5))
+        self.assertEqual(summary.histogram, {1: 0, 2: 0, 3: 0, 4: 0, 5: 1})
+
+    def test_deleting_a_rating_reverses_it(self):
+        self.rate(self.alice, 4)
+        self.rate(self.bob, 2)
+
+        Rating.objects.get(user=self.alice).delete()
+        self.bob.delete() # Cascades to bob's rating
+
+        summary = self.summary()
+        self.assertEqual((summary.rating_count, summary.rating_sum), (0, 0))
+        self.assertIsNone(summary.average)
+        self.assertEqual(set(summary.histogram.values()), {0})
+
+    def test_summary_matches_a_full_rebuild(self):
+        self.rate(self.alice, 3)
+        self.rate(self.bob, 1)
+        self.rate(self.bob, 5)
+        Rating.objects.get(user=self.alice).delete()
+
+        content_type = ContentType.objects.get_for_model(Club)
+        expected = expected_summaries()[(content_type.pk, self.club.pk)]
+        summary = self.summary()
+        self.assertEqual({field: getattr(summary, field) for field in expected}, expected)
+
+    def test_deleting_a_club_removes_its_and_its_events_ratings_and_feedback(self):
+        event = Event.objects.create(title='Blitz', description='', date='2026-03-02', club=self.club)
+        self.rate(self.alice, 4)
+        self.client.force_login(self.bob)
+        self.client.post(reverse('submit_feedback', args=['event', event.pk]), {'rating': 2, 'submit_rating': '1'})
+        Feedback.objects.create(user=self.bob, content_object=event, comment='Fun')
+        self.assertEqual(RatingSummary.objects.count(), 2)
+
+        self.club.delete() # Cascades to the event
+
+        self.assertFalse(Rating.objects.exists())
+        self.assertFalse(RatingSummary.objects.exists())
+        self.assertFalse(Feedback.objects.exists())
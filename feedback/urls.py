@@ -7,4 +7,5 @@ urlpatterns = [
     path('submit/<str:model_name>/<str:identifier>/', views.SubmitFeedbackView.as_view(), name='submit_feedback'),
     path('list/<str:model_name>/<str:identifier>/', views.ObjectFeedbackListView.as_view(), name='object_feedback_list'),
     path('api/avg_rating/<str:model_name>/<str:identifier>/', views.get_average_rating_api, name='api_avg_rating'),
+    path('api/avg_ratings/', views.get_average_ratings_batch_api, name='api_avg_ratings_batch'), # Many model:identifier keys at once
 ]
\ No newline at end of file
@@ -7,33 +7,23 @@ from django.views import View
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import JsonResponse
-from django.db.models import Avg
-
-from django.contrib.contenttypes.models import ContentType
-from .models import Feedback, Rating
+from django.template.response import TemplateResponse
+from django.db import transaction
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+import asyncio
+import json
+
+from .models import Feedback, Rating, RatingSummary
+from . import registry
 from .forms import FeedbackForm, RatingForm
+from college_club_management.asyncviews import as_list
 
 # Helper function to get content_object from slug/PK and model name
 def get_content_object(model_name, identifier):
-    try:
-        model_class = ContentType.objects.get(model=model_name).model_class()
-    except ContentType.DoesNotExist:
-        return None # Model not found in ContentTypes
-
-    if not model_class:
-        return None # Should not happen if ContentType exists but just a safety
-
-    try:
-        # Check if the model has a slug field and identifier is not purely numeric
-        if hasattr(model_class, 'slug') and not str(identifier).isdigit():
-            obj = model_class.objects.get(slug=identifier)
-        else: # Otherwise, assume it's a primary key
-            obj = model_class.objects.get(pk=identifier)
-    except model_class.DoesNotExist:
-        return None
-    except ValueError: # Catch if PK conversion fails for non-digit identifier
-        return None
-    return obj
+    # Resolved through the ratable-model registry (cached ContentType and slug lookups)
+    return registry.resolve_object(model_name, identifier)[1]
 
 
 class SubmitFeedbackView(LoginRequiredMixin, View):
@@ -57,13 +47,11 @@ class SubmitFeedbackView(LoginRequiredMixin, View):
         return render(request, self.template_name, context)
 
     def post(self, request, model_name, identifier):
-        content_object = get_content_object(model_name, identifier)
+        content_type, content_object = registry.resolve_object(model_name, identifier)
         if not content_object:
             messages.error(request, "Object not found for feedback submission.")
             return redirect('home')
 
-        content_type = ContentType.objects.get_for_model(content_object)
-
         feedback_form = FeedbackForm(request.POST)
         rating_form = RatingForm(request.POST)
 
@@ -82,23 +70,32 @@ class SubmitFeedbackView(LoginRequiredMixin, View):
 
         elif 'submit_rating' in request.POST: # Check which form button was clicked
             if rating_form.is_valid():
-                # Check if user has already rated this object
-                existing_rating = Rating.objects.filter(
-                    user=request.user,
-                    content_type=content_type,
-                    object_id=content_object.id
-                ).first()
+                with transaction.atomic():
+                    # Check if user has already rated this object (row lock so a double submit can't race the summary)
+                    existing_rating = Rating.objects.select_for_update().filter(
+                        user=request.user,
+                        content_type=content_type,
+                        object_id=content_object.id
+                    ).first()
+
+                    new_value = rating_form.cleaned_data['rating'] # Use 'rating' here
+                    if existing_rating:
+                        old_value = existing_rating.rating
+                        existing_rating.rating = new_value
+                        existing_rating.save()
+                        # Summary update commits (or rolls back) with the rating, in step with rating_deleted
+                        RatingSummary.record_rating(content_type, content_object.id, new_value, old_rating=old_value)
+                    else:
+                        rating = rating_form.save(commit=False)
+                        rating.user = request.user
+                        rating.content_type = content_type
+                        rating.object_id = content_object.id
+                        rating.save()
+                        RatingSummary.record_rating(content_type, content_object.id, new_value)
 
                 if existing_rating:
                     messages.warning(request, "You have already rated this item. Your previous rating has been updated.")
-                    existing_rating.rating = rating_form.cleaned_data['rating'] # Use 'rating' here
-                    existing_rating.save()
                 else:
-                    rating = rating_form.save(commit=False)
-                    rating.user = request.user
-                    rating.content_type = content_type
-                    rating.object_id = content_object.id
-                    rating.save()
                     messages.success(request, "Your rating has been submitted!")
                 return redirect(content_object.get_absolute_url())
             else:
@@ -118,41 +115,116 @@ class SubmitFeedbackView(LoginRequiredMixin, View):
 class ObjectFeedbackListView(View):
     template_name = 'feedback/object_feedback_list.html'
 
-    def get(self, request, model_name, identifier):
-        content_object = get_content_object(model_name, identifier)
+    async def get(self, request, model_name, identifier):
+        # Async under ASGI: comments, ratings and the summary row are fetched concurrently
+        content_type, content_object = await registry.aresolve_object(model_name, identifier)
         if not content_object:
             messages.error(request, "Object not found for feedback list.")
             return redirect('home')
 
         feedbacks = Feedback.objects.filter(
-            content_type=ContentType.objects.get_for_model(content_object),
+            content_type=content_type,
             object_id=content_object.id
-        )
+        ).select_related('user') # Template shows fb.user.username
         ratings = Rating.objects.filter(
-            content_type=ContentType.objects.get_for_model(content_object),
+            content_type=content_type,
             object_id=content_object.id
-        )
+        ).select_related('user')
 
-        # Calculate average rating
-        # Use 'rating' here
-        average_rating = ratings.aggregate(Avg('rating'))['rating__avg']
+        # Average comes from the denormalized summary row instead of aggregating every rating
+        feedbacks, ratings, rating_summary = await asyncio.gather(
+            as_list(feedbacks),
+            as_list(ratings),
+            RatingSummary.objects.filter(content_type=content_type, object_id=content_object.id).afirst(),
+        )
 
         context = {
             'content_object': content_object,
             'feedbacks': feedbacks,
             'ratings': ratings,
-            'average_rating': average_rating,
+            'rating_summary': rating_summary,
+            'average_rating': rating_summary.average if rating_summary else None,
             'model_name': model_name, # Pass model_name for template logic
             'identifier': identifier, # Pass identifier for template logic
         }
-        return render(request, self.template_name, context)
+        return TemplateResponse(request, self.template_name, context)
 
 # Optional: API endpoint for average rating (e.g., for AJAX)
-def get_average_rating_api(request, model_name, identifier):
-    content_object = get_content_object(model_name, identifier)
+async def get_average_rating_api(request, model_name, identifier):
+    content_type, content_object = await registry.aresolve_object(model_name, identifier)
     if not content_object:
         return JsonResponse({'error': 'Object not found'}, status=404)
 
-    # Use 'rating' here
-    average_rating = content_object.ratings.aggregate(Avg('rating'))['rating__avg']
-    return JsonResponse({'average_rating': average_rating or 0})
\ No newline at end of file
+    rating_summary = await RatingSummary.objects.filter(content_type=content_type, object_id=content_object.pk).afirst()
+    if not rating_summary:
+        return JsonResponse({'average_rating': 0, 'rating_count': 0})
+    return JsonResponse({
+        'average_rating': rating_summary.average or 0,
+        'rating_count': rating_summary.rating_count,
+    })
+
+# Batched variant: averages for many objects in one request (e.g. every club card on a page)
+MAX_BATCH_KEYS = 100
+
+def _batch_keys(request):
+    """Reads 'model:identifier' keys from ?keys=a,b / repeated ?key= (GET) or a JSON/form body (POST)."""
+    if request.method == 'POST':
+        if request.content_type == 'application/json':
+            try:
+                keys = json.loads(request.body or b'{}').get('keys', [])
+            except (ValueError, AttributeError):
+                return None
+        else:
+            keys = request.POST.getlist('key') or request.POST.get('keys', '').split(',')
+    else:
+        keys = request.GET.getlist('key') or request.GET.get('keys', '').split(',')
+    if not isinstance(keys, list):
+        return None
+    return [str(key).strip() for key in keys if str(key).strip()]
+
+@csrf_exempt # Read-only lookup; POST is only there for long key lists
+@require_http_methods(['GET', 'POST'])
+@cache_control(public=True, max_age=60)
+async def get_average_ratings_batch_api(request):
+    keys = _batch_keys(request)
+    if keys is None:
+        return JsonResponse({'error': 'Invalid request body'}, status=400)
+    keys = list(dict.fromkeys(keys)) # De-duplicate, keep order
+    if len(keys) > MAX_BATCH_KEYS:
+        return JsonResponse({'error': f'At most {MAX_BATCH_KEYS} keys per request'}, status=400)
+
+    identifiers_by_model = {}
+    for key in keys:
+        model_name, _, identifier = key.partition(':')
+        if identifier:
+            identifiers_by_model.setdefault(model_name, []).append(identifier)
+
+    async def model_results(model_name, identifiers):
+        resolved = await registry.aresolve_model(model_name)
+        if resolved is None:
+            return {}
+        content_type = resolved[0]
+        pks = await registry.aresolve_identifiers(model_name, identifiers)
+        # One query per content type over the pre-aggregated summary rows
+        summaries = {
+            summary.object_id: summary
+            async for summary in RatingSummary.objects.filter(content_type=content_type, object_id__in=set(pks.values()))
+        }
+        results = {}
+        for identifier, pk in pks.items():
+            summary = summaries.get(pk)
+            results[f'{model_name}:{identifier}'] = {
+                'average_rating': (summary.average or 0) if summary else 0,
+                'rating_count': summary.rating_count if summary else 0,
+            }
+        return results
+
+    # Each model's lookups are independent of the others
+    results = {}
+    for found in await asyncio.gather(*(
+        model_results(model_name, identifiers) for model_name, identifiers in identifiers_by_model.items()
+    )):
+        results.update(found)
+
+    missing = [key for key in keys if key not in results]
+    return JsonResponse({'results': results, 'missing': missing})
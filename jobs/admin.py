@@ -0,0 +1,23 @@
+# jobs/admin.py
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+from college_club_management.pagination import EstimatedCountPaginator
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'queue', 'status', 'priority', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'queue')
+    search_fields = ('task',)
+    readonly_fields = ('attempts', 'locked_until', 'locked_by', 'last_error', 'created_at', 'finished_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['retry_jobs']
+
+    @admin.action(description="Retry selected jobs now")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), locked_until=None, locked_by='', finished_at=None,
+        )
+        self.message_user(request, f"{updated} job(s) queued for retry.")
@@ -0,0 +1,86 @@
+# jobs/management/commands/runworker.py
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs import queue
+
+
+def _execute(job):
+    close_old_connections()
+    try:
+        return queue.run_job(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (see jobs/queue.py) until stopped with Ctrl+C or SIGTERM."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues',
+                            help="Only run jobs from this queue (repeatable). Defaults to all queues.")
+        parser.add_argument('--concurrency', type=int, default=getattr(settings, 'JOBS_WORKER_CONCURRENCY', 4),
+                            help="Jobs run at the same time.")
+        parser.add_argument('--processes', action='store_true',
+                            help="Run jobs in a process pool instead of threads (for CPU-bound tasks like image resizing).")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--visibility-timeout', type=int, default=getattr(settings, 'JOBS_VISIBILITY_TIMEOUT', 300),
+                            help="Seconds before a claimed job that hasn't finished may be claimed by another worker.")
+        parser.add_argument('--once', action='store_true', help="Exit when no runnable jobs are left.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        keep_done = timedelta(days=getattr(settings, 'JOBS_KEEP_DONE_DAYS', 7))
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        if options['processes']:
+            # Spawned rather than forked, so pool processes never share the parent's DB connections
+            pool = ProcessPoolExecutor(concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup)
+        else:
+            pool = ThreadPoolExecutor(concurrency, thread_name_prefix='job')
+        self.stdout.write(f"Worker {worker_id} started with {concurrency} {'processes' if options['processes'] else 'threads'}.")
+
+        running = set()
+        processed = 0
+        next_purge = 0
+        try:
+            while not stop.is_set():
+                if time.monotonic() >= next_purge:
+                    queue.purge_finished(keep_done)
+                    next_purge = time.monotonic() + 3600
+
+                # Only claim what can start right away, so idle workers can take the rest
+                claimed = queue.claim(worker_id, concurrency - len(running), options['queues'], options['visibility_timeout'])
+                for job in claimed:
+                    running.add(pool.submit(_execute, job))
+
+                if not claimed and not running:
+                    if options['once']:
+                        break
+                    stop.wait(options['poll_interval'])
+                    continue
+                done, running = wait(running, timeout=0 if claimed else options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    processed += 1
+                    if future.exception():
+                        self.stderr.write(f"Job runner crashed: {future.exception()!r}")
+                close_old_connections()
+        finally:
+            # Let running jobs finish; anything not finished is retried after its visibility timeout
+            pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped after {processed} job(s)."))
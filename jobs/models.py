@@ -0,0 +1,47 @@
+# jobs/models.py
+from django.db import models
+from django.utils import timezone
+
+class Job(models.Model):
+    """
+    One queued call of a @task function (see jobs/queue.py), executed by
+    `manage.py runworker`. A worker claims a job by moving it to RUNNING with
+    locked_until set; if the worker dies, the job becomes claimable again once
+    that visibility timeout passes.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    task = models.CharField(max_length=200, help_text="Dotted name of the @task function.")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=50, default='default')
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Not claimed before this time (used for retry backoff).")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Claim query: claimable jobs of a queue, highest priority and oldest first
+            models.Index(fields=['queue', 'status', '-priority', 'run_at'], name='job_claim_idx'),
+            models.Index(fields=['status', 'finished_at'], name='job_purge_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,175 @@
+# jobs/queue.py
+"""
+A small database-backed job queue.
+
+Decorate a function in an app's tasks.py with @task and call
+`func.enqueue(*args, **kwargs)` to have `manage.py runworker` run it later.
+Arguments must be JSON-serializable (pass primary keys, not model instances).
+Enqueueing inside a transaction is safe: workers only see the job once the
+surrounding transaction commits, and never if it rolls back.
+
+Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED where the backend
+supports it (PostgreSQL), and with a conditional UPDATE everywhere else
+(SQLite serializes writers, so only one worker's UPDATE can match a row).
+Tasks run outside any transaction, so a slow one (an image resize) never
+holds a database write lock. A job whose worker dies, or overruns its
+visibility timeout, is run again by another worker, so tasks must be
+idempotent: running one twice has to leave the same result as running it once.
+"""
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {} # task name -> Task
+
+
+class Task:
+    def __init__(self, func, queue='default', priority=0, max_attempts=5, retry_delay=10):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay # Seconds before the first retry, doubled on each further attempt
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        return enqueue(self, args, kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+
+def task(func=None, **options):
+    """
+    Registers func as a queueable task. Usable bare (@task) or with options
+    (@task(queue='images', priority=5, max_attempts=3, retry_delay=30)).
+    func must be idempotent, since a job can run more than once.
+    """
+    def decorator(func):
+        registered = Task(func, **options)
+        _tasks[registered.name] = registered
+        return registered
+    return decorator(func) if func else decorator
+
+
+def get_task(name):
+    if name not in _tasks:
+        import_string(name) # Importing the module registers it
+    return _tasks[name]
+
+
+def enqueue(task, args=(), kwargs=None, *, queue=None, priority=None, delay=None):
+    """Adds a job for task (a Task or its dotted name) and returns it."""
+    if isinstance(task, str):
+        task = get_task(task)
+    if getattr(settings, 'JOBS_RUN_INLINE', False):
+        # Development/test mode: no worker process needed
+        task(*args, **(kwargs or {}))
+        return None
+    return Job.objects.create(
+        task=task.name,
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue or task.queue,
+        priority=task.priority if priority is None else priority,
+        max_attempts=task.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay or 0),
+    )
+
+
+def _claimable(queues, now):
+    jobs = Job.objects.filter(
+        Q(status=Job.QUEUED, run_at__lte=now) |
+        Q(status=Job.RUNNING, locked_until__lt=now) # Worker died or overran its visibility timeout
+    )
+    return jobs.filter(queue__in=queues) if queues else jobs
+
+
+def claim(worker_id, limit, queues=None, visibility_timeout=None):
+    """Atomically claims up to limit runnable jobs for worker_id and returns them."""
+    if limit <= 0:
+        return []
+    visibility_timeout = visibility_timeout or getattr(settings, 'JOBS_VISIBILITY_TIMEOUT', 300)
+    now = timezone.now()
+    token = f'{worker_id}:{uuid.uuid4().hex[:12]}'
+    claim_fields = {
+        'status': Job.RUNNING,
+        'locked_by': token,
+        'locked_until': now + timedelta(seconds=visibility_timeout),
+        'attempts': F('attempts') + 1,
+    }
+    ordering = ('-priority', 'run_at', 'id')
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            # Rows locked by another worker's claim are skipped instead of waited on
+            ids = list(_claimable(queues, now).select_for_update(skip_locked=True)
+                       .order_by(*ordering).values_list('pk', flat=True)[:limit])
+            Job.objects.filter(pk__in=ids).update(**claim_fields)
+        else:
+            ids = list(_claimable(queues, now).order_by(*ordering).values_list('pk', flat=True)[:limit])
+            # Re-checks claimability in the UPDATE itself, so rows another worker got first are left alone
+            _claimable(queues, now).filter(pk__in=ids).update(**claim_fields)
+    return list(Job.objects.filter(locked_by=token, status=Job.RUNNING).order_by(*ordering))
+
+
+def _backoff(task_obj, attempts):
+    delay = min(task_obj.retry_delay * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1)) # Jitter so failed jobs don't retry in lockstep
+
+
+def run_job(job):
+    """Runs a claimed job and records the outcome. Returns the job's final status."""
+    mine = Job.objects.filter(pk=job.pk, locked_by=job.locked_by, status=Job.RUNNING)
+    try:
+        task_obj = get_task(job.task)
+    except (ImportError, KeyError):
+        mine.update(status=Job.FAILED, finished_at=timezone.now(), last_error=f"Unknown task {job.task!r}")
+        return Job.FAILED
+    if job.attempts > job.max_attempts:
+        # Claimed again after timing out on its last attempt
+        mine.update(status=Job.FAILED, finished_at=timezone.now(), last_error=job.last_error or "Visibility timeout expired")
+        return Job.FAILED
+
+    try:
+        task_obj(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts)
+        if job.attempts < job.max_attempts:
+            status = Job.QUEUED
+            updated = mine.update(status=status, run_at=timezone.now() + _backoff(task_obj, job.attempts),
+                                  locked_until=None, last_error=error)
+        else:
+            status = Job.FAILED
+            updated = mine.update(status=status, finished_at=timezone.now(), locked_until=None, last_error=error)
+    else:
+        status = Job.DONE
+        updated = mine.update(status=status, finished_at=timezone.now(), locked_until=None, last_error='')
+    if not updated:
+        # The visibility timeout expired and another worker claimed the job; its outcome is the one recorded
+        logger.warning("Lost the lock on job %s (%s) while running it", job.pk, job.task)
+        return Job.RUNNING
+    return status
+
+
+def purge_finished(older_than):
+    """Deletes DONE jobs that finished before now - older_than (a timedelta). Failed jobs are kept for inspection."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+
+calls = []
+
+
+@queue.task
+def record(value):
+    calls.append(value)
+
+
+@queue.task(max_attempts=3, retry_delay=10)
+def always_fails():
+    raise RuntimeError("boom")
+
+
+@queue.task
+def overruns(job_id):
+    # Stands in for a job that outlives its visibility timeout: another worker takes it over meanwhile
+    Job.objects.filter(pk=job_id).update(locked_by='other-worker:1', locked_until=timezone.now() + timedelta(minutes=5))
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claims_highest_priority_then_oldest_run_at_first(self):
+        now = timezone.now()
+        low = queue.enqueue(record, ['low'])
+        later = queue.enqueue(record, ['later'], priority=5)
+        earlier = queue.enqueue(record, ['earlier'], priority=5)
+        Job.objects.filter(pk=later.pk).update(run_at=now - timedelta(minutes=1))
+        Job.objects.filter(pk=earlier.pk).update(run_at=now - timedelta(minutes=2))
+        queue.enqueue(record, ['not yet'], priority=9, delay=60)
+
+        claimed = queue.claim('worker:1', limit=10)
+
+        self.assertEqual([job.pk for job in claimed], [earlier.pk, later.pk, low.pk])
+        self.assertEqual({job.status for job in claimed}, {Job.RUNNING})
+        self.assertEqual(queue.claim('worker:2', limit=10), [])
+
+    def test_runs_a_job_and_marks_it_done(self):
+        queue.enqueue(record, ['hello'])
+        job, = queue.claim('worker:1', limit=1)
+
+        self.assertEqual(queue.run_job(job), Job.DONE)
+        self.assertEqual(calls, ['hello'])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_until), (Job.DONE, 1, None))
+
+    def test_failures_retry_with_growing_backoff_then_fail(self):
+        queue.enqueue(always_fails)
+        delays = []
+        for attempt in range(1, 4):
+            job, = queue.claim('worker:1', limit=1)
+            started = timezone.now()
+            with self.assertLogs('jobs.queue', 'ERROR'):
+                status = queue.run_job(job)
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+            if attempt < 3:
+                self.assertEqual(status, Job.QUEUED)
+                delays.append((job.run_at - started).total_seconds())
+                Job.objects.filter(pk=job.pk).update(run_at=timezone.now()) # Skip the wait
+        self.assertEqual(status, Job.FAILED)
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertTrue(8 < delays[0] < 12 and 17 < delays[1] < 23, delays) # 10s, then 20s, with jitter
+
+    def test_expired_visibility_timeout_lets_another_worker_claim_the_job(self):
+        queue.enqueue(record, ['slow'])
+        first, = queue.claim('worker:1', limit=1, visibility_timeout=60)
+        self.assertEqual(queue.claim('worker:2', limit=1), [])
+
+        Job.objects.filter(pk=first.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        second, = queue.claim('worker:2', limit=1)
+
+        self.assertEqual((second.pk, second.attempts), (first.pk, 2))
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.assertEqual(queue.run_job(first), Job.RUNNING) # The first worker no longer owns it
+        self.assertEqual(queue.run_job(second), Job.DONE)
+
+    def test_lost_lock_leaves_the_new_owners_claim_alone(self):
+        job = queue.enqueue(overruns, [0])
+        Job.objects.filter(pk=job.pk).update(args=[job.pk])
+        job, = queue.claim('worker:1', limit=1)
+
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.assertEqual(queue.run_job(job), Job.RUNNING)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.RUNNING, 'other-worker:1'))
+
+    @override_settings(JOBS_RUN_INLINE=True)
+    def test_run_inline_calls_the_task_without_a_job(self):
+        self.assertIsNone(record.enqueue('now'))
+        self.assertEqual(calls, ['now'])
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class PerfConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'perf'
+    verbose_name = "Performance tooling"
+
+    def ready(self):
+        from . import middleware, signals # noqa: F401 (signals connects the domain metric receivers)
+        middleware.install() # Template and cache timing hooks; a no-op unless REQUEST_TIMING_ENABLED
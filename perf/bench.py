@@ -0,0 +1,249 @@
+# perf/bench.py
+"""
+Stdlib HTTP benchmark runner for the main routes.
+
+Drives each route either in-process through django.test.Client (which also
+records the number of SQL queries per request) or against a running server
+such as a local gunicorn, over urllib with a thread pool. Results are plain
+JSON (latency percentiles, throughput, query counts per route) so runs from
+different commits can be diffed with compare().
+"""
+import datetime
+import json
+import math
+import platform
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model, BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from clubs.models import Club
+from .seed import USER_PREFIX
+
+
+class Route:
+    def __init__(self, name, path, method='GET', data=None, login=False):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data or {}
+        self.login = login
+
+
+def default_routes():
+    """The routes worth watching; per-club routes use the most popular club."""
+    club = Club.objects.order_by('-member_count', 'id').only('slug').first()
+    today = timezone.localdate()
+    routes = [
+        Route('home', '/'),
+        Route('club_list', '/clubs/'),
+        Route('announcement_list', '/announcements/', login=True),
+        Route('event_calendar', '/events/'),
+        Route('event_range_api', f'/events/api/range?start={today}&end={today + datetime.timedelta(days=30)}'),
+        Route('search', '/search/?q=workshop'),
+    ]
+    if club:
+        routes += [
+            Route('club_detail', f'/clubs/{club.slug}/'),
+            Route('feedback_list', f'/feedback/list/club/{club.slug}/'),
+            Route('submit_rating', f'/feedback/submit/club/{club.slug}/', method='POST',
+                  data={'rating': 4, 'submit_rating': '1'}, login=True),
+        ]
+    return routes
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1) # Nearest-rank
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed, queries=None):
+    """Latency stats in milliseconds for one route."""
+    ordered = sorted(latencies)
+    result = {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2) if ordered else None,
+        'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None,
+        'queries_median': None, 'queries_max': None,
+    }
+    for key, fraction in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99), ('max_ms', 1.0)):
+        value = _percentile(ordered, fraction)
+        result[key] = round(value * 1000, 2) if value is not None else None
+    if queries:
+        result['queries_median'] = statistics.median(queries)
+        result['queries_max'] = max(queries)
+    return result
+
+
+class InProcessRunner:
+    """Runs requests through the Django test client, sequentially, counting queries."""
+
+    def __init__(self, user=None):
+        # Server errors are counted like over HTTP instead of raised
+        self.anonymous = Client(raise_request_exception=False)
+        self.authenticated = Client(raise_request_exception=False)
+        if user:
+            self.authenticated.force_login(user)
+        self.mode = 'in-process'
+
+    def run(self, route, requests, warmup):
+        client = self.authenticated if route.login else self.anonymous
+        send = client.post if route.method == 'POST' else client.get
+        for _ in range(warmup):
+            send(route.path, route.data)
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                begin = time.perf_counter()
+                response = send(route.path, route.data)
+                duration = time.perf_counter() - begin
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(duration)
+                queries.append(len(captured))
+        return summarize(latencies, errors, time.perf_counter() - started, queries)
+
+
+class HTTPRunner:
+    """Runs requests against a live server (e.g. gunicorn) with `concurrency` threads."""
+
+    def __init__(self, base_url, concurrency=4, user=None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.cookies = self._login_cookies(user) if user else None
+        self.mode = f'http {self.base_url} x{concurrency}'
+
+    @staticmethod
+    def _login_cookies(user):
+        # A server-side session for user plus a CSRF secret sent as both cookie and header
+        from importlib import import_module
+        from django.middleware.csrf import _get_new_csrf_string
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        csrf = _get_new_csrf_string()
+        return {'cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}; {settings.CSRF_COOKIE_NAME}={csrf}', 'csrf': csrf}
+
+    def _request(self, route):
+        data = None
+        headers = {}
+        if route.login and self.cookies:
+            headers['Cookie'] = self.cookies['cookie']
+            headers['X-CSRFToken'] = self.cookies['csrf']
+        if route.method == 'POST':
+            data = urllib.parse.urlencode(route.data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        request = urllib.request.Request(self.base_url + route.path, data=data, headers=headers, method=route.method)
+        begin = time.perf_counter()
+        try:
+            with _NoRedirect.opener.open(request, timeout=30) as response:
+                response.read()
+                ok = response.status < 400
+        except urllib.error.HTTPError as error:
+            ok = error.code < 400 # 3xx after a POST is a success
+        except OSError:
+            ok = False
+        return ok, time.perf_counter() - begin
+
+    def run(self, route, requests, warmup):
+        for _ in range(warmup):
+            self._request(route)
+        latencies, errors = [], 0
+        lock = threading.Lock()
+
+        def one(_):
+            nonlocal errors
+            ok, duration = self._request(route)
+            with lock:
+                if ok:
+                    latencies.append(duration)
+                else:
+                    errors += 1
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            list(pool.map(one, range(requests)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Measure the route itself, not the page a POST redirects to
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+_NoRedirect.opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(routes, runner, requests=50, warmup=5, log=print):
+    results = {}
+    for route in routes:
+        results[route.name] = runner.run(route, requests, warmup)
+        stats = results[route.name]
+        log(f"{route.name:<20} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms "
+            f"rps={stats['throughput_rps']} queries={stats['queries_median']} errors={stats['errors']}")
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'mode': runner.mode,
+            'requests_per_route': requests,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'routes': results,
+    }
+
+
+def compare(baseline, current, keys=('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_median')):
+    """Returns {route: {key: (baseline, current, change %)}} for routes present in both runs."""
+    diff = {}
+    for name, stats in current['routes'].items():
+        before = baseline.get('routes', {}).get(name)
+        if not before:
+            continue
+        diff[name] = {}
+        for key in keys:
+            old, new = before.get(key), stats.get(key)
+            change = round((new - old) / old * 100, 1) if old and new is not None else None
+            diff[name][key] = (old, new, change)
+    return diff
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def benchmark_user():
+    """A regular seeded student to make logged-in requests as."""
+    User = get_user_model()
+    return (User.objects.filter(username__startswith=USER_PREFIX, user_type='student').order_by('pk').first()
+            or User.objects.filter(is_active=True).order_by('pk').first())
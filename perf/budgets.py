@@ -0,0 +1,239 @@
+# perf/budgets.py
+"""
+Query-count and query-time budgets per route.
+
+BUDGETS declares, for every renderable view in accounts, clubs, events,
+announcements and feedback, the most SQL queries one request may use against
+a database seeded with SEED_SIZE. The `check_query_budgets` command seeds a
+throwaway test database, renders each route as an anonymous user, a student,
+a club officer and a college admin, and fails listing the offending SQL (as a
+diff against the last passing snapshot when one exists), so N+1 regressions
+are caught before review. DB time is reported against db_ms but never fails a
+check: wall-clock time depends on the machine.
+
+Each route is requested once before it is measured, so per-process caches
+(content types, sessions, cached club sets) are warm, as on a busy server.
+Shared results that expire for everyone at once, such as the home page's
+featured clubs, are listed in cold_cache_keys and evicted before measuring,
+so the budget covers the request that has to recompute them. With that,
+query counts hold regardless of data size for well-behaved views, and a
+budget that only passes at a small seed size is itself a finding.
+"""
+import datetime
+import difflib
+import json
+from collections import Counter
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from announcements.models import Announcement
+from clubs.models import Club
+from events import ical
+from .seed import USER_PREFIX
+from .sql import normalize
+
+SEED_SIZE = {
+    'users': 2000,
+    'clubs': 40,
+    'events_per_club': 10,
+    'announcements': 500,
+    'ratings': 5000,
+    'feedback': 1000,
+}
+ROLES = ('anonymous', 'student', 'club_officer', 'college_admin')
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    db_ms: float = 50.0 # Reported, not enforced
+    cold_cache_keys: tuple = () # Shared cache entries evicted after the warm-up request
+
+
+# Route name -> budget, checked for every role. Views whose templates don't exist
+# yet (club_form, club_confirm_delete, event_detail, event_form, event_confirm_delete)
+# are left out until they can be rendered.
+BUDGETS = {
+    # accounts
+    'signup': Budget(queries=1),
+    'login': Budget(queries=1),
+    # core / search
+    'home': Budget(queries=3, cold_cache_keys=('home:featured_clubs',)),
+    'search': Budget(queries=3),
+    # clubs
+    'club_list': Budget(queries=5),
+    'club_detail': Budget(queries=6),
+    'club_roster_export': Budget(queries=4),
+    'club_roster_import': Budget(queries=3),
+    # events
+    'event_calendar': Budget(queries=3),
+    'event_import': Budget(queries=2),
+    'event_range_api': Budget(queries=2),
+    'club_ical_feed': Budget(queries=3),
+    'user_ical_feed': Budget(queries=2),
+    'my_ical_feed': Budget(queries=1),
+    # announcements
+    'announcement_list': Budget(queries=3),
+    'announcement_detail': Budget(queries=2),
+    'announcement_create': Budget(queries=2),
+    'announcement_update': Budget(queries=4),
+    'announcement_delete': Budget(queries=2),
+    # feedback
+    'submit_feedback': Budget(queries=2),
+    'object_feedback_list': Budget(queries=5),
+    'api_avg_rating': Budget(queries=2),
+    'api_avg_ratings_batch': Budget(queries=1),
+}
+
+
+def isolated_settings():
+    """
+    Settings overrides that keep the measured counts independent of the
+    deployment: plain static storage, a private cache, and a fixed session
+    engine (which CACHE_URL would otherwise switch, changing every count).
+    """
+    return {
+        # Manifest storage needs collectstatic; the budgets are about SQL, not assets
+        'STORAGES': {**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+        # So entries left by the server or an earlier run (for other rows) can't skew the counts
+        'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'check-query-budgets'}},
+        # The budgets assume sessions read from the cache, as in production
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'JOBS_RUN_INLINE': False,
+    }
+
+
+def role_users():
+    """One user per role from the seeded data (the officer manages the most popular club)."""
+    User = get_user_model()
+    club = Club.objects.filter(manager__isnull=False).order_by('-member_count', 'id').select_related('manager').first()
+    admin, _ = User.objects.get_or_create(username=f'{USER_PREFIX}budget_admin', defaults={'user_type': 'college_admin'})
+    student = User.objects.filter(username__startswith=USER_PREFIX, user_type='student', memberships__isnull=False).order_by('pk').first()
+    return {'anonymous': None, 'student': student, 'club_officer': club.manager if club else None, 'college_admin': admin}
+
+
+def route_urls(users):
+    """Route name -> URL, pointed at the most popular club and its newest announcement."""
+    club = Club.objects.order_by('-member_count', 'id').first()
+    announcement = Announcement.objects.filter(club=club).order_by('-created_at').first() or Announcement.objects.first()
+    today = timezone.localdate()
+    slug = {'slug': club.slug}
+    urls = {
+        'signup': reverse('signup'),
+        'login': reverse('login'),
+        'home': reverse('home'),
+        'search': reverse('search') + '?q=workshop',
+        'club_list': reverse('club_list'),
+        'club_detail': reverse('club_detail', kwargs=slug),
+        'club_roster_export': reverse('club_roster_export', kwargs=slug),
+        'club_roster_import': reverse('club_roster_import', kwargs=slug),
+        'event_calendar': reverse('event_calendar'),
+        'event_import': reverse('event_import'),
+        'event_range_api': reverse('event_range_api') + f'?start={today}&end={today + datetime.timedelta(days=31)}',
+        'club_ical_feed': reverse('club_ical_feed', kwargs=slug),
+        'user_ical_feed': reverse('user_ical_feed', kwargs={'token': ical.user_feed_token(users['student'])}),
+        'my_ical_feed': reverse('my_ical_feed'),
+        'submit_feedback': reverse('submit_feedback', kwargs={'model_name': 'club', 'identifier': club.slug}),
+        'object_feedback_list': reverse('object_feedback_list', kwargs={'model_name': 'club', 'identifier': club.slug}),
+        'api_avg_rating': reverse('api_avg_rating', kwargs={'model_name': 'club', 'identifier': club.slug}),
+        'api_avg_ratings_batch': reverse('api_avg_ratings_batch') + '?keys=' + ','.join(
+            f'club:{slug}' for slug in Club.objects.order_by('id').values_list('slug', flat=True)[:50]),
+    }
+    if announcement:
+        for name in ('announcement_detail', 'announcement_update', 'announcement_delete'):
+            urls[name] = reverse(name, kwargs={'pk': announcement.pk})
+    urls['announcement_list'] = reverse('announcement_list')
+    urls['announcement_create'] = reverse('announcement_create')
+    return urls
+
+
+@dataclass
+class Measurement:
+    route: str
+    role: str
+    status: int
+    queries: list # SQL strings
+    db_ms: float
+    budget: Budget
+
+    @property
+    def over_budget(self):
+        return len(self.queries) > self.budget.queries
+
+    @property
+    def slow(self):
+        return self.db_ms > self.budget.db_ms
+
+    @property
+    def failed(self):
+        return self.over_budget or self.status >= 500
+
+
+def measure(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content) # Streamed bodies run their queries while being consumed
+    db_ms = sum(float(query['time']) for query in captured.captured_queries) * 1000
+    return response.status_code, [query['sql'] for query in captured.captured_queries], db_ms
+
+
+def run(budgets=BUDGETS, roles=ROLES, routes=None):
+    """Renders every route for every role and returns the list of Measurements."""
+    users = role_users()
+    urls = route_urls(users)
+    results = []
+    for role in roles:
+        client = Client(raise_request_exception=False)
+        if users[role]:
+            client.force_login(users[role])
+        for route, budget in budgets.items():
+            if (routes and route not in routes) or route not in urls:
+                continue
+            client.get(urls[route]) # Warm per-process caches (content types, cached club sets, ...)
+            cache.delete_many(budget.cold_cache_keys)
+            status, queries, db_ms = measure(client, urls[route])
+            results.append(Measurement(route, role, status, queries, db_ms, budget))
+    return results
+
+
+def snapshot(measurements):
+    return {f'{m.route}:{m.role}': [normalize(sql) for sql in m.queries] for m in measurements if not m.failed}
+
+
+def explain(measurement, previous=None):
+    """Human-readable report of why a measurement failed."""
+    m = measurement
+    lines = [f"{m.route} as {m.role}: {len(m.queries)} queries (budget {m.budget.queries}), "
+             f"{m.db_ms:.1f}ms DB time (budget {m.budget.db_ms:.0f}ms), HTTP {m.status}"]
+    current = [normalize(sql) for sql in m.queries]
+    diff = list(difflib.unified_diff(previous, current, 'snapshot', 'now', lineterm='', n=1)) if previous is not None else []
+    if diff:
+        lines.append("  SQL diff against the last passing snapshot:")
+        lines.extend('    ' + line for line in diff)
+    else:
+        lines.append("  Statements by repetition (repeated ones are likely N+1 loops):")
+        for sql, count in Counter(current).most_common():
+            lines.append(f"    {count:>4} x {sql[:300]}")
+    return '\n'.join(lines)
+
+
+def load_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_snapshot(path, measurements):
+    with open(path, 'w') as f:
+        json.dump(snapshot(measurements), f, indent=1, sort_keys=True)
@@ -0,0 +1,63 @@
+# perf/management/commands/check_query_budgets.py
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from perf import budgets, seed
+
+
+class Command(BaseCommand):
+    help = ("Seeds a throwaway test database, renders every budgeted route as each role and fails if any "
+            "request runs more SQL queries than its budget in perf/budgets.py. DB time is reported only.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--route', action='append', dest='routes', help="Only check this route (repeatable).")
+        parser.add_argument('--role', action='append', dest='roles', choices=budgets.ROLES, help="Only check this role (repeatable).")
+        parser.add_argument('--snapshot', default=os.path.join(settings.BASE_DIR, 'perf', 'query_snapshot.json'),
+                            help="Query snapshot to diff failures against.")
+        parser.add_argument('--update-snapshot', action='store_true', help="Write the passing routes' queries to --snapshot.")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs.")
+
+    def handle(self, *args, **options):
+        if options['routes']:
+            unknown = set(options['routes']) - set(budgets.BUDGETS)
+            if unknown:
+                raise CommandError(f"Unknown route(s): {', '.join(sorted(unknown))}. Known: {', '.join(budgets.BUDGETS)}")
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, keepdb=options['keepdb'])
+        old_config = runner.setup_databases()
+        try:
+            with override_settings(**budgets.isolated_settings()):
+                seed.seed(**budgets.SEED_SIZE, log=lambda message: None)
+                results = budgets.run(roles=options['roles'] or budgets.ROLES, routes=options['routes'])
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'route':<24} {'role':<14} {'status':>6} {'queries':>9} {'db ms':>12}")
+        for m in results:
+            line = (f"{m.route:<24} {m.role:<14} {m.status:>6} {len(m.queries):>4}/{m.budget.queries:<4} "
+                    f"{m.db_ms:>6.1f}/{m.budget.db_ms:<5.0f}")
+            if m.failed:
+                line = self.style.ERROR(line)
+            elif m.slow:
+                line = self.style.WARNING(line) # Timing varies by machine, so it's only flagged
+            self.stdout.write(line)
+
+        failures = [m for m in results if m.failed]
+        if options['update_snapshot']:
+            budgets.save_snapshot(options['snapshot'], results)
+            self.stdout.write(f"Wrote {options['snapshot']}.")
+        if failures:
+            previous = budgets.load_snapshot(options['snapshot'])
+            for m in failures:
+                self.stderr.write('\n' + budgets.explain(m, previous.get(f'{m.route}:{m.role}')))
+            raise CommandError(f"{len(failures)} of {len(results)} route/role checks over budget or erroring.")
+        slow = sum(m.slow for m in results)
+        if slow:
+            self.stdout.write(self.style.WARNING(f"{slow} request(s) over their DB time budget (not enforced)."))
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} route/role checks within budget."))
@@ -0,0 +1,47 @@
+# perf/management/commands/profile_dump.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from perf import profiler
+
+
+class Command(BaseCommand):
+    help = ("Merges the sampling profiler's stacks from every worker for a recent time window and writes them "
+            "as collapsed stacks (for flamegraph.pl / speedscope) or a speedscope JSON file.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=int, default=300, help="How far back to read samples.")
+        parser.add_argument('--view', action='append', dest='views', help="Only this URL name (repeatable).")
+        parser.add_argument('--format', choices=('collapsed', 'speedscope'), default='collapsed')
+        parser.add_argument('--output', help="Write to this file instead of stdout.")
+        parser.add_argument('--top', type=int, default=0, help="Also print the N URL names with the most samples.")
+
+    def handle(self, *args, **options):
+        if options['seconds'] > settings.PROFILER_RETENTION_SECONDS:
+            raise CommandError(f"Only the last {settings.PROFILER_RETENTION_SECONDS}s of samples are kept.")
+        samples = profiler.load(options['seconds'], views=options['views'])
+        if not samples:
+            raise CommandError(f"No samples in {settings.PROFILER_DIR} for the last {options['seconds']}s. "
+                               "Is PROFILER_ENABLED set on the server?")
+        if options['format'] == 'speedscope':
+            output = json.dumps(profiler.speedscope(samples))
+        else:
+            output = profiler.collapsed(samples)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stdout.write(f"Wrote {sum(samples.values())} samples to {options['output']}.")
+        else:
+            self.stdout.write(output, ending='')
+
+        if options['top']:
+            by_view = {}
+            for stack, count in samples.items():
+                view = stack.split(';', 1)[0]
+                by_view[view] = by_view.get(view, 0) + count
+            total = sum(by_view.values())
+            self.stderr.write(f"\n{'URL name':<30} {'samples':>8} {'share':>7}")
+            for view, count in sorted(by_view.items(), key=lambda item: -item[1])[:options['top']]:
+                self.stderr.write(f"{view:<30} {count:>8} {count / total:>7.1%}")
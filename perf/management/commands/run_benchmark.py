@@ -0,0 +1,56 @@
+# perf/management/commands/run_benchmark.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.conf import settings
+
+from perf import bench
+
+
+class Command(BaseCommand):
+    help = ("Benchmarks the main routes in-process (with SQL query counts) or against a running server "
+            "and prints/writes p50/p95/p99 latency, throughput and query counts per route as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Base URL of a running server (e.g. http://127.0.0.1:8000). Default: in-process.")
+        parser.add_argument('--requests', type=int, default=50, help="Measured requests per route.")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per route first.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Client threads when using --url.")
+        parser.add_argument('--route', action='append', dest='routes', help="Only run this route (repeatable).")
+        parser.add_argument('--output', help="Write the JSON results to this file.")
+        parser.add_argument('--compare', help="Earlier results file to compare against.")
+
+    def handle(self, *args, **options):
+        routes = bench.default_routes()
+        if options['routes']:
+            unknown = set(options['routes']) - {route.name for route in routes}
+            if unknown:
+                raise CommandError(f"Unknown route(s): {', '.join(sorted(unknown))}. Known: {', '.join(r.name for r in routes)}")
+            routes = [route for route in routes if route.name in options['routes']]
+        user = bench.benchmark_user()
+
+        if options['url']:
+            runner = bench.HTTPRunner(options['url'], options['concurrency'], user)
+            results = bench.run(routes, runner, options['requests'], options['warmup'], log=self.stdout.write)
+        else:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                runner = bench.InProcessRunner(user)
+                results = bench.run(routes, runner, options['requests'], options['warmup'], log=self.stdout.write)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}.")
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
+
+        if options['compare']:
+            baseline = bench.load(options['compare'])
+            self.stdout.write(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('mode')}):")
+            for name, stats in bench.compare(baseline, results).items():
+                changes = ', '.join(
+                    f"{key} {old}->{new}" + (f" ({change:+}%)" if change is not None else '')
+                    for key, (old, new, change) in stats.items()
+                )
+                self.stdout.write(f"  {name}: {changes}")
@@ -0,0 +1,35 @@
+# perf/management/commands/seed_scale.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from perf import seed
+
+
+class Command(BaseCommand):
+    help = "Bulk-generates realistic users, clubs, memberships, events, announcements, ratings and feedback for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--clubs', type=int, default=200)
+        parser.add_argument('--events-per-club', type=int, default=20)
+        parser.add_argument('--announcements', type=int, default=5000)
+        parser.add_argument('--ratings', type=int, default=50000)
+        parser.add_argument('--feedback', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, so runs are reproducible.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per INSERT.")
+        parser.add_argument('--password', default='benchmark', help="Password shared by all seeded users.")
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded data instead of adding more.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['clear']:
+            seed.clear(log=self.stdout.write)
+        else:
+            seed.seed(
+                users=options['users'], clubs=options['clubs'], events_per_club=options['events_per_club'],
+                announcements=options['announcements'], ratings=options['ratings'], feedback=options['feedback'],
+                seed=options['seed'], batch_size=options['batch_size'], password=options['password'],
+                log=self.stdout.write,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.monotonic() - started:.1f}s."))
@@ -0,0 +1,117 @@
+# perf/memory.py
+"""
+Opt-in memory diagnostics for long-running workers.
+
+With MEMORY_DIAGNOSTICS_ENABLED, MemoryDiagnosticsMiddleware
+(perf/middleware.py) records each request's change in resident set size.
+With MEMORY_TRACEMALLOC_FRAMES > 0 it also records Python allocations
+(net and peak) through tracemalloc. Requests over MEMORY_ALLOC_THRESHOLD_MB
+are logged as JSON to the 'perf.memory' logger with their URL name.
+tracemalloc's peak is process-wide, so under threaded workers a request's
+peak can include its neighbours' allocations.
+
+Snapshots grouped by file or line come from the college-admin-only
+/perf/memory/ view, or from sending MEMORY_SNAPSHOT_SIGNAL to a worker pid
+(not the gunicorn master, which treats SIGUSR2 as "upgrade"). Each snapshot
+is diffed against the previous one taken in the same worker, so two requests
+a few hours apart show what grew in between. Signal-triggered reports are
+written to MEMORY_DIR and logged.
+"""
+import json
+import logging
+import os
+import resource
+import signal
+import time
+import tracemalloc
+
+from django.conf import settings
+
+logger = logging.getLogger('perf.memory')
+
+_baseline = None # This worker's previous snapshot, for diffs
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss():
+    """Current resident set size in bytes (peak RSS where /proc isn't available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 # Kilobytes on Linux
+
+
+def start():
+    """Starts tracemalloc and the snapshot signal handler in this worker, as configured."""
+    frames = settings.MEMORY_TRACEMALLOC_FRAMES
+    if frames and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    if settings.MEMORY_SNAPSHOT_SIGNAL:
+        try:
+            signal.signal(getattr(signal, settings.MEMORY_SNAPSHOT_SIGNAL), _on_signal)
+        except ValueError:
+            pass # Not the main thread; snapshots stay available through the view
+
+
+def _filtered(snapshot):
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def report(group_by='lineno', limit=25, diff=True):
+    """
+    Text report of this worker's biggest allocation sites, or of what changed
+    since its previous snapshot when diff is true and one exists. The new
+    snapshot becomes the baseline for the next diff.
+    """
+    global _baseline
+    lines = [f"pid {os.getpid()}, RSS {rss() / 2**20:.1f} MiB"]
+    if not tracemalloc.is_tracing():
+        lines.append("tracemalloc is off; set MEMORY_TRACEMALLOC_FRAMES to record allocation sites.")
+        return '\n'.join(lines) + '\n'
+    current, peak = tracemalloc.get_traced_memory()
+    lines.append(f"traced {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB), "
+                 f"tracemalloc overhead {tracemalloc.get_tracemalloc_memory() / 2**20:.1f} MiB")
+    snapshot = _filtered(tracemalloc.take_snapshot())
+    if diff and _baseline is not None:
+        lines.append(f"\nTop {limit} changes by {group_by} since the previous snapshot:")
+        stats = snapshot.compare_to(_baseline, group_by)
+    else:
+        lines.append(f"\nTop {limit} allocation sites by {group_by}:")
+        stats = snapshot.statistics(group_by)
+    lines.extend(str(stat) for stat in stats[:limit])
+    _baseline = snapshot
+    return '\n'.join(lines) + '\n'
+
+
+def _on_signal(signum, frame):
+    text = report(settings.MEMORY_SNAPSHOT_GROUP_BY)
+    os.makedirs(settings.MEMORY_DIR, exist_ok=True)
+    path = os.path.join(settings.MEMORY_DIR, f'memory_{os.getpid()}_{int(time.time())}.txt')
+    with open(path, 'w') as f:
+        f.write(text)
+    logger.info(json.dumps({'event': 'memory_snapshot', 'pid': os.getpid(), 'path': path}))
+
+
+class RequestMemory:
+    """RSS and (if tracing) allocation deltas across one request."""
+
+    def __init__(self):
+        self.tracing = tracemalloc.is_tracing()
+        self.rss_before = rss()
+        if self.tracing:
+            self.traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+    def finish(self):
+        result = {'rss_before': self.rss_before, 'rss_delta': rss() - self.rss_before}
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            result['alloc_delta'] = current - self.traced_before
+            result['alloc_peak'] = peak - self.traced_before
+        return result
@@ -0,0 +1,345 @@
+# perf/metrics.py
+"""
+Prometheus-style metrics shared across gunicorn workers.
+
+Each process writes its own samples to a memory-mapped file in METRICS_DIR
+(metrics_<pid>.db). Updating a value is a struct write into the process's
+own mapping, guarded by a lock that only that process's threads share.
+There are no DB writes and no locking between processes. The /metrics view
+reads every worker's file and adds them up. Files of workers that have
+exited are folded into metrics_archive.db at scrape time and removed, as
+prometheus_client's multiprocess mode does, so the totals keep their counts
+without METRICS_DIR growing by a file per worker ever started. Values that
+are current state, such as the job queue depth, are not stored; they're read
+from the DB at scrape time.
+
+Request, query and cache metrics are recorded by RequestTimingMiddleware
+(perf/middleware.py), so they need REQUEST_TIMING_ENABLED as well as
+METRICS_ENABLED.
+"""
+import functools
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+HEADER = struct.Struct('<I4x') # Bytes in use, then padding so values stay 8-byte aligned
+VALUE = struct.Struct('<d')
+INITIAL_SIZE = 1 << 16
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE_NAME = 'metrics_archive.db'
+LOCK_NAME = 'collect.lock'
+LOCK_SECONDS = 10 # A scrape holds the lock for well under this; older locks were left by a crash
+_WORKER_FILE = re.compile(r'metrics_(\d+)\.db$')
+
+
+class MmapedValues:
+    """
+    Append-only key -> float64 store in one mmapped file. Entries are
+    [uint32 key length][key, space-padded to 8 bytes][float64]; the header's
+    used-size is written after each new entry, so a reader never sees half an entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(INITIAL_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        self._positions = {key: position for key, _, position in self._entries(self._map, self._used)}
+
+    @staticmethod
+    def _entries(data, used):
+        offset = HEADER.size
+        while offset < used:
+            length = struct.unpack_from('<I', data, offset)[0]
+            key = bytes(data[offset + 4:offset + 4 + length]).decode()
+            position = offset + 4 + length + (-(4 + length) % 8)
+            yield key, VALUE.unpack_from(data, position)[0], position
+            offset = position + VALUE.size
+
+    def _grow(self, needed):
+        self._map.close()
+        while self._capacity < needed:
+            self._capacity *= 2
+        self._file.truncate(self._capacity)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def _add_key(self, key):
+        encoded = key.encode()
+        padding = -(4 + len(encoded)) % 8
+        entry = struct.pack('<I', len(encoded)) + encoded + b' ' * padding + VALUE.pack(0.0)
+        if self._used + len(entry) > self._capacity:
+            self._grow(self._used + len(entry))
+        self._map[self._used:self._used + len(entry)] = entry
+        self._positions[key] = self._used + 4 + len(encoded) + padding
+        self._used += len(entry)
+        HEADER.pack_into(self._map, 0, self._used)
+
+    def add(self, key, amount):
+        """Adds amount to key's value. Callers hold the process's lock."""
+        if key not in self._positions:
+            self._add_key(key)
+        position = self._positions[key]
+        VALUE.pack_into(self._map, position, VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+    @classmethod
+    def read(cls, path):
+        """(key, value) pairs from a file another process may still be writing."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            return []
+        used = min(HEADER.unpack_from(data, 0)[0], len(data))
+        return [(key, value) for key, value, _ in cls._entries(data, used)]
+
+
+_lock = threading.Lock()
+_store = None
+_store_pid = None
+
+
+def _values():
+    # Opened lazily and reopened after a fork, so every worker writes its own file
+    global _store, _store_pid
+    if _store_pid != os.getpid():
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _store = MmapedValues(os.path.join(settings.METRICS_DIR, f'metrics_{os.getpid()}.db'))
+        _store_pid = os.getpid()
+    return _store
+
+
+def _key(sample, labels):
+    return _encoded_key(sample, tuple(sorted(labels.items())))
+
+
+@functools.lru_cache(maxsize=4096)
+def _encoded_key(sample, items):
+    return json.dumps([sample, items])
+
+
+_registry = [] # Metrics in exposition order
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        _registry.append(self)
+
+    def _labels(self, values):
+        if set(values) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(values)}")
+        return {name: str(value) for name, value in values.items()}
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        key = _key(self.name + '_total', self._labels(labels))
+        with _lock:
+            _values().add(key, amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        labels = self._labels(labels)
+        # Each bucket counts only its own range here; exposition makes them cumulative
+        bound = next((b for b in self.buckets if value <= b), '+Inf')
+        with _lock:
+            values = _values()
+            values.add(_key(self.name + '_bucket', {**labels, 'le': str(bound)}), 1)
+            values.add(_key(self.name + '_sum', labels), value)
+            values.add(_key(self.name + '_count', labels), 1)
+
+
+class Gauge(Metric):
+    """Read at scrape time from `collect`, a callable returning [(labels, value)]."""
+    type = 'gauge'
+
+    def __init__(self, name, documentation, collect, labels=()):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+
+def _job_queue_depth():
+    from django.db.models import Count
+    from jobs.models import Job
+    rows = (Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING])
+            .values('queue', 'status').annotate(count=Count('id')).order_by())
+    return [({'queue': row['queue'], 'status': row['status']}, row['count']) for row in rows]
+
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', "Request latency by URL name.", labels=('view', 'method'))
+REQUESTS = Counter('http_requests', "Requests by URL name and status code.", labels=('view', 'status'))
+DB_QUERIES = Counter('db_queries', "SQL queries run while serving requests, by URL name.", labels=('view',))
+CACHE_REQUESTS = Counter('cache_requests', "Cache reads while serving requests, by result.", labels=('result',))
+CLUB_JOINS = Counter('club_joins', "Club memberships created.")
+RATINGS = Counter('ratings', "Ratings submitted (new ratings, not changes), by rated model.", labels=('model',))
+FEEDBACK_POSTS = Counter('feedback_posts', "Feedback comments posted, by model commented on.", labels=('model',))
+JOB_QUEUE_DEPTH = Gauge('job_queue_depth', "Queued and running jobs.", _job_queue_depth, labels=('queue', 'status'))
+
+
+def observe_request(view, method, status, seconds, stats):
+    """Records one finished request from the timing middleware's RequestStats."""
+    REQUEST_LATENCY.observe(seconds, view=view, method=method)
+    REQUESTS.inc(view=view, status=status)
+    if stats.query_count:
+        DB_QUERIES.inc(stats.query_count, view=view)
+    if stats.cache_hits:
+        CACHE_REQUESTS.inc(stats.cache_hits, result='hit')
+    if stats.cache_misses:
+        CACHE_REQUESTS.inc(stats.cache_misses, result='miss')
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass # Exists, under another user
+    return True
+
+
+def _acquire_collect_lock(path):
+    deadline = time.monotonic() + LOCK_SECONDS
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            return
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > LOCK_SECONDS:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue # Just released
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{path} is held by another scrape")
+            time.sleep(0.01)
+
+
+def archive_dead_workers():
+    """
+    Adds the samples of workers that have exited to the archive file and removes
+    their files. Every stored sample is a sum, so merging them keeps the totals.
+    Callers hold the collect lock.
+    """
+    if os.name != 'posix':
+        return # os.kill(pid, 0) terminates the process on Windows, and only gunicorn deployments fork workers
+    dead = [path for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics_*.db'))
+            if (match := _WORKER_FILE.search(path)) and int(match[1]) != os.getpid() and not _alive(int(match[1]))]
+    if not dead:
+        return
+    archive = MmapedValues(os.path.join(settings.METRICS_DIR, ARCHIVE_NAME))
+    try:
+        for path in dead:
+            for key, value in MmapedValues.read(path):
+                archive.add(key, value)
+            archive.flush() # On disk before the worker's file goes, so a crash can't lose its counts
+            os.remove(path)
+    finally:
+        archive.close()
+
+
+def collect():
+    """Every worker's samples, summed: {key: value}."""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    lock = os.path.join(settings.METRICS_DIR, LOCK_NAME)
+    # One scrape at a time, so none reads a file another is halfway through archiving
+    _acquire_collect_lock(lock)
+    try:
+        archive_dead_workers()
+        totals = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics_*.db')):
+            for key, value in MmapedValues.read(path):
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+    finally:
+        os.remove(lock)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}' if labels else ''
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def exposition():
+    """All metrics in the Prometheus text format (version 0.0.4)."""
+    by_sample = {}
+    for key, value in collect().items():
+        sample, labels = json.loads(key)
+        by_sample.setdefault(sample, []).append(([tuple(pair) for pair in labels], value))
+
+    lines = []
+    for metric in _registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        if isinstance(metric, Gauge):
+            for labels, value in metric.collect():
+                lines.append(f'{metric.name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+        elif isinstance(metric, Histogram):
+            lines.extend(_histogram_lines(metric, by_sample))
+        else:
+            for labels, value in sorted(by_sample.get(metric.name + '_total', [])):
+                lines.append(f'{metric.name}_total{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(metric, by_sample):
+    buckets = {}
+    for labels, value in by_sample.get(metric.name + '_bucket', []):
+        series = tuple((name, label) for name, label in labels if name != 'le')
+        bound = dict(labels)['le']
+        buckets.setdefault(series, {})[bound] = value
+    sums = {tuple(labels): value for labels, value in by_sample.get(metric.name + '_sum', [])}
+    counts = {tuple(labels): value for labels, value in by_sample.get(metric.name + '_count', [])}
+    lines = []
+    for series in sorted(counts):
+        own = buckets.get(series, {})
+        cumulative = 0.0
+        for bound in [*map(str, metric.buckets), '+Inf']:
+            cumulative += own.get(bound, 0.0)
+            labels = sorted([*series, ('le', bound)])
+            lines.append(f'{metric.name}_bucket{_format_labels(labels)} {_format_value(cumulative)}')
+        lines.append(f'{metric.name}_sum{_format_labels(list(series))} {_format_value(sums.get(series, 0.0))}')
+        lines.append(f'{metric.name}_count{_format_labels(list(series))} {_format_value(counts[series])}')
+    return lines
@@ -0,0 +1,327 @@
+# perf/middleware.py
+"""
+Per-request timing: DB time and query count, template render time, cache
+hits and misses, and total time.
+
+RequestTimingMiddleware collects the numbers for each request in a context
+variable. It sends them back as a Server-Timing header, so they appear in
+the browser's network panel. The header goes to college admins and staff
+(on views that load the user) and to a SERVER_TIMING_SAMPLE_RATE share of
+other requests. Requests slower than SLOW_REQUEST_MS are logged as one JSON
+line each to the 'perf.slow' logger, as are queries slower than
+SLOW_QUERY_MS. The log names the view and includes the normalized SQL.
+With METRICS_ENABLED the same numbers feed the /metrics counters (perf/metrics.py).
+
+With REQUEST_TIMING_ENABLED off the middleware removes itself from the
+chain, and install() does not patch anything, so nothing runs per request.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template
+
+from . import memory, metrics, profiler
+from .sql import normalize
+
+logger = logging.getLogger('perf.slow')
+memory_logger = logging.getLogger('perf.memory')
+
+MAX_RECORDED_QUERIES = 1000 # Per request, so a runaway loop can't grow the list without bound
+_MISSING = object()
+_current = contextvars.ContextVar('perf_request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.db_ms = 0.0
+        self.queries = [] # (sql, ms) in execution order
+        self.query_count = 0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def slowest(self, limit=5):
+        """The `limit` costliest statements by total time, grouped by normalized SQL."""
+        grouped = {}
+        for sql, ms in self.queries:
+            entry = grouped.setdefault(normalize(sql), [0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+        ranked = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [{'sql': sql, 'count': count, 'ms': round(ms, 2)} for sql, (count, ms) in ranked]
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        stats.db_ms += ms
+        stats.query_count += 1
+        if len(stats.queries) < MAX_RECORDED_QUERIES:
+            stats.queries.append((sql, ms))
+
+
+def _timed_render(render):
+    @functools.wraps(render)
+    def wrapper(self, *args, **kwargs):
+        stats = _current.get()
+        if stats is None or stats.template_depth: # Nested render_to_string calls are already inside the outer timing
+            return render(self, *args, **kwargs)
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            stats.template_ms += (time.perf_counter() - start) * 1000
+            stats.template_depth -= 1
+    return wrapper
+
+
+def _counted_get(get):
+    @functools.wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        stats = _current.get()
+        if stats is None:
+            return get(self, key, default, version)
+        value = get(self, key, _MISSING, version)
+        if value is _MISSING:
+            stats.cache_misses += 1
+            return default
+        stats.cache_hits += 1
+        return value
+    return wrapper
+
+
+def _counted_get_many(get_many):
+    @functools.wraps(get_many)
+    def wrapper(self, keys, version=None):
+        stats = _current.get()
+        found = get_many(self, keys, version)
+        if stats is not None:
+            keys = list(keys)
+            stats.cache_hits += len(found)
+            stats.cache_misses += len(keys) - len(found)
+        return found
+    return wrapper
+
+
+_installed = False
+
+
+def _wrap_connection(sender, connection, **kwargs):
+    # On every connection rather than per request: under ASGI a request's queries run on
+    # whichever thread sync_to_async picks, so its own connection isn't known up front
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """
+    Wraps DB connections' queries, template rendering and the configured cache
+    backends' reads. Called from PerfConfig.ready().
+    """
+    global _installed
+    if _installed or not settings.REQUEST_TIMING_ENABLED:
+        return
+    _installed = True
+    connection_created.connect(_wrap_connection)
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(None, connection)
+    Template.render = _timed_render(Template.render)
+    backends = {type(caches[alias]) for alias in settings.CACHES}
+    for backend in backends:
+        backend.get = _counted_get(backend.get)
+        # Backends without their own get_many use BaseCache's, which calls the (now counted) get
+        if 'get_many' in vars(backend):
+            backend.get_many = _counted_get_many(backend.get_many)
+
+
+class RequestTimingMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        self.slow_request_ms = settings.SLOW_REQUEST_MS
+        self.slow_query_ms = settings.SLOW_QUERY_MS
+        self.metrics_enabled = settings.METRICS_ENABLED
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        # Async ORM calls run on another thread's connection, but in a copy of this context, so they're counted too
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, start)
+
+    def finish(self, request, response, stats, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        if self._wants_header(request):
+            response['Server-Timing'] = self.server_timing(stats, total_ms)
+        self.log_slow(request, response, stats, total_ms)
+        if self.metrics_enabled:
+            match = getattr(request, 'resolver_match', None)
+            metrics.observe_request(match.view_name if match else '<unresolved>', request.method,
+                                    response.status_code, total_ms / 1000, stats)
+        return response
+
+    def _wants_header(self, request):
+        # Only a user the view already loaded: resolving request.user here would cost a
+        # session and a user query on views that never looked at them
+        user = getattr(request, '_cached_user', None)
+        if user is not None and user.is_authenticated and (user.is_staff or user.is_college_admin()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @staticmethod
+    def server_timing(stats, total_ms):
+        return ', '.join([
+            f'total;dur={total_ms:.1f}',
+            f'db;dur={stats.db_ms:.1f};desc="{stats.query_count} queries"',
+            f'tpl;dur={stats.template_ms:.1f}',
+            f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"',
+        ])
+
+    def log_slow(self, request, response, stats, total_ms):
+        slow_queries = [(sql, ms) for sql, ms in stats.queries if ms >= self.slow_query_ms]
+        if total_ms < self.slow_request_ms and not slow_queries:
+            return
+        match = getattr(request, 'resolver_match', None)
+        base = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+        }
+        for sql, ms in slow_queries:
+            logger.warning(json.dumps({'event': 'slow_query', **base, 'ms': round(ms, 2), 'sql': normalize(sql)}))
+        if total_ms >= self.slow_request_ms:
+            logger.warning(json.dumps({
+                'event': 'slow_request', **base,
+                'total_ms': round(total_ms, 2),
+                'db_ms': round(stats.db_ms, 2),
+                'queries': stats.query_count,
+                'template_ms': round(stats.template_ms, 2),
+                'cache_hits': stats.cache_hits,
+                'cache_misses': stats.cache_misses,
+                'top_queries': stats.slowest(),
+            }))
+
+
+class SamplingProfilerMiddleware:
+    """
+    Marks the request's thread for the sampling profiler (perf/profiler.py), tagged with its URL name.
+    Under ASGI the request is tagged in a context variable instead, since many share the event loop's thread.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profiler.ensure_started()
+        profiler.tag('<unresolved>') # Until URL resolution names the view
+        try:
+            return self.get_response(request)
+        finally:
+            profiler.untag()
+
+    async def __acall__(self, request):
+        profiler.ensure_started()
+        tagged = profiler.tag_async('<unresolved>')
+        try:
+            return await self.get_response(request)
+        finally:
+            profiler.untag_async(tagged)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Under ASGI this runs through sync_to_async on the request's own thread, which it tags too
+        profiler.tag(request.resolver_match.view_name)
+
+
+class MemoryDiagnosticsMiddleware:
+    """Logs requests whose RSS growth or Python allocations exceed MEMORY_ALLOC_THRESHOLD_MB (perf/memory.py)."""
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_DIAGNOSTICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.MEMORY_ALLOC_THRESHOLD_MB * 2**20
+        memory.start()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        measured = memory.RequestMemory()
+        response = self.get_response(request)
+        self.check(request, response, measured.finish())
+        return response
+
+    async def __acall__(self, request):
+        # Process-wide numbers, so concurrent requests on the event loop blur into each other
+        measured = memory.RequestMemory()
+        response = await self.get_response(request)
+        self.check(request, response, measured.finish())
+        return response
+
+    def check(self, request, response, result):
+        if max(result['rss_delta'], result.get('alloc_peak', 0)) >= self.threshold:
+            match = getattr(request, 'resolver_match', None)
+            memory_logger.warning(json.dumps({
+                'event': 'memory_heavy_request',
+                'view': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'pid': os.getpid(),
+                **{key: round(value / 2**20, 2) for key, value in result.items()}, # MiB
+            }))
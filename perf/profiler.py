@@ -0,0 +1,251 @@
+# perf/profiler.py
+"""
+Statistical CPU profiler for live traffic.
+
+Each worker samples PROFILER_HZ times a second (of CPU time, on a SIGPROF
+timer, when requests run on the main thread; otherwise from a background
+thread). It reads sys._current_frames() and records the stack of every
+thread that is serving a request. Stacks are tagged with the request's URL
+name and kept as folded stacks ("view;outer frame;...;inner frame" ->
+samples). Only request threads are sampled, and nothing is timed or traced
+in the request itself, so the cost stays flat however busy the worker is.
+
+Under ASGI many requests take turns on the event loop's thread, so that
+thread can't carry one tag. Async requests are tagged in a context variable
+instead. uvicorn runs the loop on the main thread, where the SIGPROF handler
+interrupts whichever request's task is running and reads its tag. The sync
+parts of the request (sync views and middleware, run by sync_to_async on a
+thread of their own) tag that thread as usual. With a background-thread
+sampler the loop's samples can't be told apart and are tagged <event loop>.
+
+Every PROFILER_FLUSH_SECONDS each worker writes what it has collected to a
+small JSON file in PROFILER_DIR and prunes its files older than
+PROFILER_RETENTION_SECONDS. load() merges all workers' files for a time window
+into collapsed-stack text (flamegraph.pl, speedscope, ...) or a speedscope
+JSON document. It is used by `manage.py profile_dump` and the admin-only
+/perf/profile/ view.
+"""
+import contextvars
+import glob
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+_active = {} # Thread ident -> URL name of the request it is serving
+_async_tag = contextvars.ContextVar('profiler_async_tag', default=None) # AsyncTag of the async request in this context
+_loop_threads = set() # Idents of threads that have run async requests
+_labels = {} # Code object -> frame label
+_sampler = None
+_sampler_pid = None
+_start_lock = threading.Lock()
+
+
+def _frame_label(code):
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename
+        for prefix in sorted({str(settings.BASE_DIR), *sys.path}, key=len, reverse=True):
+            if prefix and path.startswith(prefix + os.sep):
+                path = path[len(prefix) + 1:]
+                break
+        name = getattr(code, 'co_qualname', code.co_name)
+        label = _labels[code] = f'{name} ({path})'.replace(';', ':')
+    return label
+
+
+class Collector:
+    """Folds request threads' stacks into per-window counts and writes them out every flush_seconds."""
+
+    def __init__(self, hz, flush_seconds, directory, retention_seconds):
+        self.interval = 1 / hz
+        self.hz = hz
+        self.flush_seconds = flush_seconds
+        self.directory = directory
+        self.retention_seconds = retention_seconds
+        self.samples = Counter()
+        self.window_start = time.time()
+        self.next_flush = time.monotonic() + flush_seconds
+
+    def sample(self, skip=None, interrupted=None):
+        frames = sys._current_frames()
+        targets = dict.fromkeys(_loop_threads, '<event loop>')
+        targets.update(_active)
+        if interrupted is not None:
+            frames[threading.get_ident()] = interrupted # The frame the signal arrived in, not the handler's
+            current = _async_tag.get() # The handler runs in the context of the task it interrupted
+            if current is not None:
+                targets[threading.get_ident()] = current.view
+        for ident, view in targets.items():
+            frame = frames.get(ident)
+            if frame is None or ident == skip:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(view)
+            self.samples[';'.join(reversed(stack))] += 1
+        del frames # Holding frames keeps every local variable in them alive
+        if time.monotonic() >= self.next_flush:
+            self.flush()
+            self.next_flush = time.monotonic() + self.flush_seconds
+
+    def flush(self):
+        now = time.time()
+        if self.samples:
+            data = {'pid': os.getpid(), 'start': self.window_start, 'end': now, 'hz': self.hz, 'samples': dict(self.samples)}
+            path = os.path.join(self.directory, f'profile_{os.getpid()}_{int(self.window_start)}.json')
+            with open(path + '.tmp', 'w') as f:
+                json.dump(data, f)
+            os.replace(path + '.tmp', path) # Readers never see a half-written file
+            self.samples = Counter()
+        self.window_start = now
+        for path in glob.glob(os.path.join(self.directory, f'profile_{os.getpid()}_*.json')):
+            started = int(path.rsplit('_', 1)[1].split('.')[0])
+            if started < now - self.retention_seconds:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class SignalSampler(Collector):
+    """
+    Samples from a SIGPROF handler on a CPU-time interval timer. The handler
+    runs in the main thread between bytecodes, so samples are unbiased and an
+    idle worker takes none. Used when requests are served on the main thread
+    (gunicorn's default sync worker).
+    """
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self.handle)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def handle(self, signum, frame):
+        self.sample(interrupted=frame)
+
+
+class ThreadSampler(Collector):
+    """
+    Samples from a background thread, for threaded servers. The thread can
+    only sample once it gets the GIL, so code that releases it (database
+    calls, file I/O) shows up more often than its share of CPU time.
+    """
+
+    def start(self):
+        threading.Thread(target=self.run, name='perf-sampler', daemon=True).start()
+
+    def run(self):
+        own = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            self.sample(skip=own)
+
+
+def ensure_started():
+    """Starts this process's sampler (again after a fork, where timers and threads don't survive)."""
+    global _sampler, _sampler_pid
+    if _sampler_pid == os.getpid():
+        return
+    with _start_lock:
+        if _sampler_pid == os.getpid():
+            return
+        os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+        on_main_thread = threading.current_thread() is threading.main_thread()
+        sampler_class = SignalSampler if on_main_thread and hasattr(signal, 'setitimer') else ThreadSampler
+        _sampler = sampler_class(settings.PROFILER_HZ, settings.PROFILER_FLUSH_SECONDS,
+                                 settings.PROFILER_DIR, settings.PROFILER_RETENTION_SECONDS)
+        _sampler.start()
+        _sampler_pid = os.getpid()
+
+
+class AsyncTag:
+    """Tag of one async request, shared by its task and the sync_to_async threads it runs on."""
+
+    def __init__(self, view):
+        self.view = view
+        self.threads = set()
+
+
+def tag(view):
+    ident = threading.get_ident()
+    _active[ident] = view
+    current = _async_tag.get()
+    if current is not None: # Sync code of an async request: also retag the request itself
+        current.view = view
+        current.threads.add(ident)
+
+
+def untag():
+    _active.pop(threading.get_ident(), None)
+
+
+def tag_async(view):
+    """Tags the async request running in the current context; returns the tag for untag_async()."""
+    _loop_threads.add(threading.get_ident())
+    current = AsyncTag(view)
+    _async_tag.set(current)
+    return current
+
+
+def untag_async(current):
+    for ident in current.threads:
+        _active.pop(ident, None)
+    _async_tag.set(None)
+
+
+def load(seconds, views=None):
+    """Merged folded stacks {stack: samples} from every worker for the last `seconds`."""
+    since = time.time() - seconds
+    merged = Counter()
+    for path in glob.glob(os.path.join(settings.PROFILER_DIR, 'profile_*.json')):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue # Pruned or replaced while reading
+        if data['end'] < since:
+            continue
+        for stack, count in data['samples'].items():
+            if views and stack.split(';', 1)[0] not in views:
+                continue
+            merged[stack] += count
+    return merged
+
+
+def collapsed(samples):
+    """Brendan Gregg's collapsed-stack format, one 'frame;frame;frame count' line per stack."""
+    return ''.join(f'{stack} {count}\n' for stack, count in samples.most_common())
+
+
+def speedscope(samples, name='college_club_management'):
+    """A speedscope (https://www.speedscope.app) document with one sampled profile per URL name."""
+    frames, index = [], {}
+    by_view = {}
+    for stack, count in samples.items():
+        view, *rest = stack.split(';')
+        ids = []
+        for label in rest:
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({'name': label})
+            ids.append(index[label])
+        by_view.setdefault(view, []).append((ids, count))
+    profiles = []
+    for view, stacks in sorted(by_view.items(), key=lambda item: -sum(count for _, count in item[1])):
+        total = sum(count for _, count in stacks)
+        profiles.append({
+            'type': 'sampled', 'name': view, 'unit': 'none', 'startValue': 0, 'endValue': total,
+            'samples': [ids for ids, _ in stacks], 'weights': [count for _, count in stacks],
+        })
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name, 'exporter': 'perf.profiler',
+        'shared': {'frames': frames}, 'profiles': profiles,
+    }
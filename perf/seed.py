@@ -0,0 +1,241 @@
+# perf/seed.py
+"""
+Synthetic data at realistic scale, for benchmarking (see perf/bench.py).
+
+Club popularity follows a Zipf-like curve: a handful of clubs get most of the
+members, ratings, feedback and announcements, the long tail gets little, as
+on a real campus. Everything is written with bulk_create in batches, so the
+denormalized data that signals normally maintain (member counts, rating
+summaries, search entries) is rebuilt at the end. Seeded rows are recognizable
+by their prefix and can be removed with clear().
+"""
+import contextlib
+import datetime
+import random
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from announcements.models import Announcement
+from clubs.models import Club, ClubMembership
+from events.models import Event
+from feedback.models import Feedback, Rating
+
+USER_PREFIX = 'seed_user_'
+CLUB_PREFIX = 'Seed Club '
+
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Ananya', 'Kabir', 'Meera', 'Rohan', 'Saanvi', 'Vihaan', 'Zara', 'Arjun', 'Nisha']
+LAST_NAMES = ['Sharma', 'Patel', 'Reddy', 'Iyer', 'Khan', 'Singh', 'Das', 'Nair', 'Gupta', 'Mehta']
+TOPICS = ['Robotics', 'Drama', 'Photography', 'Chess', 'Debate', 'Music', 'Coding', 'Astronomy', 'Dance', 'Literature',
+          'Entrepreneurship', 'Environment', 'Film', 'Quiz', 'Art', 'Gaming', 'Hiking', 'Cooking', 'Volunteering', 'Math']
+EVENT_KINDS = ['Workshop', 'Meetup', 'Hackathon', 'Talk', 'Screening', 'Tournament', 'Open Mic', 'Field Trip', 'Orientation']
+LOCATIONS = ['Main Auditorium', 'Seminar Hall 1', 'Seminar Hall 2', 'Library Lawn', 'Lab Block 3', 'Sports Complex', 'Cafeteria']
+PHRASES = ['Great organisation', 'Loved the sessions', 'Could start on time', 'Very welcoming seniors',
+           'Needs more events', 'Best club on campus', 'Venue was too small', 'Learned a lot', 'Would recommend']
+RATING_WEIGHTS = [1, 1, 2, 4, 4] # Skewed towards 4-5 stars
+
+
+def zipf_cum_weights(n, exponent=1.1):
+    """Cumulative Zipf weights for n ranks (rank 1 is the most popular)."""
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+@contextlib.contextmanager
+def manual_timestamps(model, *field_names):
+    """Lets bulk_create keep explicit values for auto_now/auto_now_add fields."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Seeder:
+    def __init__(self, seed=42, batch_size=2000, password='benchmark', log=print):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.password_hash = make_password(password) # Hashed once and shared, hashing per user would dominate
+        self.log = log
+        self.now = timezone.now()
+
+    def _bulk(self, model, objects, **kwargs):
+        """bulk_create from any iterable in batches; returns the created objects' pks."""
+        pks, batch = [], []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                pks.extend(o.pk for o in model.objects.bulk_create(batch, **kwargs))
+                batch = []
+        if batch:
+            pks.extend(o.pk for o in model.objects.bulk_create(batch, **kwargs))
+        return pks
+
+    def _past(self, days):
+        return self.now - datetime.timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    def users(self, count, officers):
+        User = get_user_model()
+        start = User.objects.filter(username__startswith=USER_PREFIX).count()
+
+        def generate():
+            for i in range(start, start + count):
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                yield User(
+                    username=f'{USER_PREFIX}{i:06d}', email=f'{USER_PREFIX}{i:06d}@example.edu',
+                    first_name=first, last_name=last, password=self.password_hash,
+                    user_type='club_officer' if i - start < officers else 'student',
+                    date_joined=self._past(720),
+                )
+        pks = self._bulk(User, generate())
+        self.log(f"Created {len(pks)} users ({officers} club officers).")
+        return pks[:officers], pks
+
+    def clubs(self, count, officer_ids):
+        start = Club.objects.filter(title__startswith=CLUB_PREFIX).count()
+
+        def generate():
+            for i in range(start, start + count):
+                title = f'{CLUB_PREFIX}{i:04d} {TOPICS[i % len(TOPICS)]}'
+                yield Club(
+                    title=title, slug=slugify(title),
+                    description=f"The {TOPICS[i % len(TOPICS)].lower()} club. " + ' '.join(self.rng.sample(PHRASES, 3)) + '.',
+                    manager_id=officer_ids[(i - start) % len(officer_ids)] if officer_ids else None,
+                )
+        pks = self._bulk(Club, generate())
+        self.log(f"Created {len(pks)} clubs.")
+        return pks # In popularity order: index 0 is the most popular
+
+    def memberships(self, user_ids, club_ids, mean_clubs=2.5):
+        cum_weights = zipf_cum_weights(len(club_ids))
+        counts = Counter()
+
+        def generate():
+            for user_id in user_ids:
+                wanted = min(len(club_ids), 1 + int(self.rng.expovariate(1 / max(mean_clubs - 1, 0.1))))
+                chosen = set(self.rng.choices(club_ids, cum_weights=cum_weights, k=wanted * 2)) # Oversample, duplicates collapse
+                for club_id in list(chosen)[:wanted]:
+                    counts[club_id] += 1
+                    yield ClubMembership(user_id=user_id, club_id=club_id)
+        created = len(self._bulk(ClubMembership, generate()))
+        # bulk_create skips the post_save counter signal
+        clubs = list(Club.objects.filter(pk__in=counts).only('pk'))
+        for club in clubs:
+            club.member_count = counts[club.pk]
+        Club.objects.bulk_update(clubs, ['member_count'], batch_size=self.batch_size)
+        self.log(f"Created {created} memberships.")
+
+    def events(self, club_ids, per_club, creator_ids):
+        today = timezone.localdate()
+
+        def generate():
+            for club_id in club_ids:
+                for _ in range(per_club):
+                    kind = self.rng.choice(EVENT_KINDS)
+                    has_time = self.rng.random() > 0.2
+                    yield Event(
+                        title=f'{kind} #{self.rng.randint(1, 999)}', description=' '.join(self.rng.sample(PHRASES, 2)),
+                        date=today + datetime.timedelta(days=self.rng.randint(-120, 180)),
+                        time=datetime.time(self.rng.randint(8, 20), self.rng.choice((0, 30))) if has_time else None,
+                        location=self.rng.choice(LOCATIONS), club_id=club_id,
+                        created_by_id=self.rng.choice(creator_ids) if creator_ids else None,
+                    )
+        pks = self._bulk(Event, generate())
+        self.log(f"Created {len(pks)} events.")
+        return pks
+
+    def announcements(self, count, club_ids, author_ids, global_share=0.1):
+        cum_weights = zipf_cum_weights(len(club_ids))
+
+        def generate():
+            for i in range(count):
+                is_global = self.rng.random() < global_share
+                created = self._past(90)
+                yield Announcement(
+                    title=f"{'Campus' if is_global else 'Club'} update {i}", content=' '.join(self.rng.sample(PHRASES, 4)),
+                    author_id=self.rng.choice(author_ids) if author_ids else None, is_global=is_global,
+                    club_id=None if is_global else self.rng.choices(club_ids, cum_weights=cum_weights)[0],
+                    created_at=created, updated_at=created,
+                )
+        with manual_timestamps(Announcement, 'created_at', 'updated_at'):
+            created = len(self._bulk(Announcement, generate()))
+        self.log(f"Created {created} announcements.")
+
+    def _targets(self, club_ids, event_ids, count):
+        """Yields (content_type_id, object_id) targets, 70% clubs by popularity and 30% events."""
+        club_type = ContentType.objects.get_for_model(Club).pk
+        event_type = ContentType.objects.get_for_model(Event).pk
+        cum_weights = zipf_cum_weights(len(club_ids))
+        for _ in range(count):
+            if event_ids and self.rng.random() < 0.3:
+                yield event_type, self.rng.choice(event_ids)
+            else:
+                yield club_type, self.rng.choices(club_ids, cum_weights=cum_weights)[0]
+
+    def ratings(self, count, user_ids, club_ids, event_ids):
+        seen = set()
+
+        def generate():
+            for content_type_id, object_id in self._targets(club_ids, event_ids, count):
+                user_id = self.rng.choice(user_ids)
+                if (user_id, content_type_id, object_id) in seen:
+                    continue # One rating per user per object
+                seen.add((user_id, content_type_id, object_id))
+                yield Rating(user_id=user_id, content_type_id=content_type_id, object_id=object_id,
+                             rating=self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0], created_at=self._past(180))
+        with manual_timestamps(Rating, 'created_at'):
+            created = len(self._bulk(Rating, generate(), ignore_conflicts=True))
+        self.log(f"Created {created} ratings.")
+
+    def feedback(self, count, user_ids, club_ids, event_ids):
+        def generate():
+            for content_type_id, object_id in self._targets(club_ids, event_ids, count):
+                yield Feedback(user_id=self.rng.choice(user_ids), content_type_id=content_type_id, object_id=object_id,
+                               comment='. '.join(self.rng.sample(PHRASES, 2)) + '.', created_at=self._past(180))
+        with manual_timestamps(Feedback, 'created_at'):
+            created = len(self._bulk(Feedback, generate()))
+        self.log(f"Created {created} feedback comments.")
+
+
+def seed(users, clubs, events_per_club, announcements, ratings, feedback, seed=42, batch_size=2000,
+         password='benchmark', rebuild_derived=True, log=print):
+    """Generates the full data set in one transaction, then rebuilds derived tables."""
+    seeder = Seeder(seed=seed, batch_size=batch_size, password=password, log=log)
+    with transaction.atomic():
+        officer_ids, user_ids = seeder.users(users, officers=max(1, clubs // 2))
+        club_ids = seeder.clubs(clubs, officer_ids)
+        seeder.memberships(user_ids, club_ids)
+        event_ids = seeder.events(club_ids, events_per_club, officer_ids)
+        seeder.announcements(announcements, club_ids, officer_ids)
+        seeder.ratings(ratings, user_ids, club_ids, event_ids)
+        seeder.feedback(feedback, user_ids, club_ids, event_ids)
+    if rebuild_derived:
+        call_command('rebuild_rating_summaries')
+        call_command('rebuild_search_index')
+
+
+def clear(log=print):
+    """Deletes all seeded users and clubs (memberships, events, announcements, ratings and feedback cascade)."""
+    seeded_clubs = Club.objects.filter(title__startswith=CLUB_PREFIX)
+    with transaction.atomic():
+        # Ratings, summaries and feedback go with their club or event through its generic relations
+        clubs, _ = seeded_clubs.delete()
+        # Global announcements have no club; they'd survive their seeded author (SET_NULL)
+        Announcement.objects.filter(author__username__startswith=USER_PREFIX).delete()
+        users, _ = get_user_model().objects.filter(username__startswith=USER_PREFIX).delete()
+    log(f"Deleted {clubs + users} seeded rows.")
+    call_command('rebuild_rating_summaries')
+    call_command('rebuild_search_index')
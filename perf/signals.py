@@ -0,0 +1,31 @@
+# perf/signals.py
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save
+
+from clubs.models import ClubMembership
+from feedback.models import Feedback, Rating
+from . import metrics
+
+
+def _model_name(instance):
+    return ContentType.objects.get_for_id(instance.content_type_id).model # Cached, no query per save
+
+
+def membership_created(sender, instance, created, **kwargs):
+    if created:
+        metrics.CLUB_JOINS.inc()
+
+
+def rating_created(sender, instance, created, **kwargs):
+    if created:
+        metrics.RATINGS.inc(model=_model_name(instance))
+
+
+def feedback_created(sender, instance, created, **kwargs):
+    if created:
+        metrics.FEEDBACK_POSTS.inc(model=_model_name(instance))
+
+
+post_save.connect(membership_created, sender=ClubMembership, dispatch_uid='perf_metrics_club_join')
+post_save.connect(rating_created, sender=Rating, dispatch_uid='perf_metrics_rating')
+post_save.connect(feedback_created, sender=Feedback, dispatch_uid='perf_metrics_feedback')
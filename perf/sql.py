@@ -0,0 +1,10 @@
+# perf/sql.py
+import re
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_IN_LISTS = re.compile(r'IN \((?:\?, )+\?\)')
+
+
+def normalize(sql):
+    """SQL with literals and placeholders replaced by ?, so repeated statements compare equal."""
+    return _IN_LISTS.sub('IN (...)', _LITERALS.sub('?', sql))
@@ -0,0 +1,129 @@
+import io
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from jobs import queue
+from . import budgets, metrics, seed
+
+
+@override_settings(**budgets.isolated_settings())
+class QueryBudgetTests(TestCase):
+    """The check_query_budgets run, as part of `manage.py test`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with redirect_stdout(io.StringIO()): # The derived-table rebuilds report what they did
+            seed.seed(**budgets.SEED_SIZE, log=lambda message: None)
+
+    def test_every_route_stays_within_its_budget(self):
+        results = budgets.run()
+        previous = budgets.load_snapshot(os.path.join(settings.BASE_DIR, 'perf', 'query_snapshot.json'))
+
+        self.assertEqual(len(results), len(budgets.BUDGETS) * len(budgets.ROLES))
+        failures = [budgets.explain(m, previous.get(f'{m.route}:{m.role}')) for m in results if m.failed]
+        if failures:
+            self.fail('\n\n'.join(failures))
+
+
+@queue.task
+def noop():
+    pass
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir)
+        self.enterContext(override_settings(METRICS_DIR=self.metrics_dir, METRICS_ENABLED=True, JOBS_RUN_INLINE=False))
+        metrics._store_pid = None # Reopen this process's file in the temporary directory
+        self.addCleanup(self.close_store)
+
+    def close_store(self):
+        if metrics._store_pid is not None:
+            metrics._store.close()
+        metrics._store_pid = None
+
+    def worker_file(self, pid):
+        return os.path.join(self.metrics_dir, f'metrics_{pid}.db')
+
+    def test_file_layout(self):
+        path = self.worker_file(1)
+        values = metrics.MmapedValues(path)
+        values.add('abc', 1.5)
+        values.add('abc', 1.0)
+        values.add('xxxxx', -2.0)
+        values.close()
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        # [uint32 key length][key, space-padded so the value is 8-byte aligned][float64]
+        entries = (struct.pack('<I', 3) + b'abc' + b' ' * 1 + struct.pack('<d', 2.5)
+                   + struct.pack('<I', 5) + b'xxxxx' + b' ' * 7 + struct.pack('<d', -2.0))
+        self.assertEqual(len(data), metrics.INITIAL_SIZE)
+        self.assertEqual(data[:8], struct.pack('<I4x', 8 + len(entries)))
+        self.assertEqual(data[8:8 + len(entries)], entries)
+        self.assertEqual(metrics.MmapedValues.read(path), [('abc', 2.5), ('xxxxx', -2.0)])
+
+    def test_file_grows_and_reopens_with_its_values(self):
+        path = self.worker_file(1)
+        values = metrics.MmapedValues(path)
+        for n in range(3000):
+            values.add(f'key-{n:05}', n)
+        values.close()
+        self.assertGreater(os.path.getsize(path), metrics.INITIAL_SIZE)
+
+        values = metrics.MmapedValues(path) # As after a restart that reuses the pid
+        values.add('key-00007', 1)
+        values.add('new', 1)
+        values.close()
+
+        samples = dict(metrics.MmapedValues.read(path))
+        self.assertEqual((len(samples), samples['key-02999'], samples['key-00007'], samples['new']), (3001, 2999, 8, 1))
+
+    def test_exposition_sums_workers_and_makes_buckets_cumulative(self):
+        metrics.REQUESTS.inc(view='home', status=200)
+        metrics.REQUESTS.inc(view='a"b\\c', status=500)
+        metrics.REQUEST_LATENCY.observe(0.02, view='home', method='GET')
+        metrics.REQUEST_LATENCY.observe(3.0, view='home', method='GET')
+        other = metrics.MmapedValues(self.worker_file(os.getppid())) # Another live worker
+        other.add(metrics._key('http_requests_total', {'view': 'home', 'status': '200'}), 2)
+        other.close()
+        noop.enqueue()
+
+        lines = metrics.exposition().splitlines()
+
+        self.assertIn('# TYPE http_requests counter', lines)
+        self.assertIn('http_requests_total{status="200",view="home"} 3', lines)
+        self.assertIn('http_requests_total{status="500",view="a\\"b\\\\c"} 1', lines)
+        histogram = [line for line in lines if line.startswith('http_request_duration_seconds')]
+        self.assertEqual(histogram, [
+            *(f'http_request_duration_seconds_bucket{{le="{bound}",method="GET",view="home"}} {count}'
+              for bound, count in zip(metrics.DEFAULT_BUCKETS, [0, 0, 1, 1, 1, 1, 1, 1, 1, 2, 2])),
+            'http_request_duration_seconds_bucket{le="+Inf",method="GET",view="home"} 2',
+            'http_request_duration_seconds_sum{method="GET",view="home"} 3.02',
+            'http_request_duration_seconds_count{method="GET",view="home"} 2',
+        ])
+        self.assertIn('job_queue_depth{queue="default",status="queued"} 1', lines)
+
+    @unittest.skipUnless(os.name == 'posix', "Exited workers are only detected on POSIX")
+    def test_exited_workers_are_merged_into_the_archive(self):
+        exited = subprocess.Popen([sys.executable, '-c', ''])
+        exited.wait()
+        key = metrics._key('club_joins_total', {})
+        dead = metrics.MmapedValues(self.worker_file(exited.pid))
+        dead.add(key, 4)
+        dead.close()
+        metrics.CLUB_JOINS.inc()
+
+        self.assertEqual(metrics.collect()[key], 5)
+        self.assertEqual(set(os.listdir(self.metrics_dir)), {metrics.ARCHIVE_NAME, f'metrics_{os.getpid()}.db'})
+        self.assertEqual(metrics.collect()[key], 5) # Counted once, from the archive
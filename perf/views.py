@@ -0,0 +1,59 @@
+# perf/views.py
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_GET
+
+from college_club_management.decorators import college_admin_required
+from . import memory, metrics, profiler
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape endpoint; needs `Authorization: Bearer <METRICS_TOKEN>` unless DEBUG is on."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode(), settings.METRICS_TOKEN.encode()):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        raise Http404 # Without a token the endpoint only exists in development
+    return HttpResponse(metrics.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+@college_admin_required
+def profile_view(request):
+    """Sampling profiler output for the last ?seconds= (default 300), optionally for ?view= URL names only."""
+    try:
+        seconds = max(1, min(int(request.GET.get('seconds', 300)), settings.PROFILER_RETENTION_SECONDS))
+    except ValueError:
+        return HttpResponseBadRequest("seconds must be an integer.")
+    samples = profiler.load(seconds, views=request.GET.getlist('view') or None)
+    if request.GET.get('format') == 'speedscope':
+        response = JsonResponse(profiler.speedscope(samples))
+        response['Content-Disposition'] = f'attachment; filename="profile-{seconds}s.speedscope.json"'
+        return response
+    return HttpResponse(profiler.collapsed(samples), content_type='text/plain; charset=utf-8')
+
+
+@require_GET
+@college_admin_required
+def memory_view(request):
+    """
+    This worker's top allocation sites (?group=filename|lineno|traceback, ?limit=),
+    diffed against its previous snapshot unless ?diff=0.
+    """
+    if not settings.MEMORY_DIAGNOSTICS_ENABLED:
+        raise Http404
+    group_by = request.GET.get('group', 'lineno')
+    if group_by not in ('filename', 'lineno', 'traceback'):
+        return HttpResponseBadRequest("group must be filename, lineno or traceback.")
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 25)), 500))
+    except ValueError:
+        return HttpResponseBadRequest("limit must be an integer.")
+    text = memory.report(group_by, limit, diff=request.GET.get('diff') != '0')
+    return HttpResponse(text, content_type='text/plain; charset=utf-8')
@@ -0,0 +1,10 @@
+# search/admin.py
+from django.contrib import admin
+from .models import SearchEntry
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ('title', 'content_type', 'object_id', 'updated_at')
+    list_filter = ('content_type',)
+    search_fields = ('title',)
+    readonly_fields = ('content_type', 'object_id', 'title', 'body', 'updated_at')
@@ -0,0 +1,204 @@
+# search/index.py
+"""
+Registry of searchable models plus the backend-specific full-text queries.
+
+Models are registered with the fields that make up their title and body; the
+receivers in search.signals keep SearchEntry rows current on save/delete.
+Queries go to PostgreSQL full-text search (websearch_to_tsquery + ts_rank_cd
+over a GIN-indexed tsvector) or to SQLite FTS5 (MATCH + bm25), and fall back
+to icontains on other databases.
+"""
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import SearchEntry
+
+FTS_TABLE = 'search_searchentry_fts' # SQLite FTS5 virtual table (see migrations)
+DEFAULT_LIMIT = 20
+
+# model class -> {'title': field, 'body': [fields], 'queryset': callable(request) or None}
+_registry = {}
+
+
+def register(model, title, body, queryset=None):
+    """
+    Registers `model` as searchable. `queryset`, if given, is called with the
+    request and restricts which objects a user may get back (e.g. announcement visibility).
+    """
+    _registry[model] = {'title': title, 'body': list(body), 'queryset': queryset}
+
+
+def registered_models():
+    return list(_registry)
+
+
+def is_registered(model):
+    return model in _registry
+
+
+def _entry_for(obj):
+    options = _registry[type(obj)]
+    body_parts = [getattr(obj, field) or '' for field in options['body']]
+    return SearchEntry(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+        title=(getattr(obj, options['title']) or '')[:255],
+        body='\n'.join(part for part in body_parts if part),
+        updated_at=timezone.now(),
+    )
+
+
+def index_objects(objs, batch_size=500):
+    """Upserts search entries for objs in batches (one INSERT ... ON CONFLICT per batch)."""
+    entries = [_entry_for(obj) for obj in objs]
+    SearchEntry.objects.bulk_create(
+        entries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['content_type', 'object_id'],
+        update_fields=['title', 'body', 'updated_at'],
+    )
+    return len(entries)
+
+
+def unindex_object(obj):
+    SearchEntry.objects.filter(content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk).delete()
+
+
+def _fts5_query(query):
+    # Quote every word so user input can't inject FTS5 syntax; prefix-match the words
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _visibility_sql(allowed, prefix):
+    """
+    SQL conditions limiting entries of each content type in allowed
+    ({content_type_id: queryset of objects the user may see}) to those objects.
+    """
+    conditions, params = [], []
+    for content_type_id, queryset in allowed.items():
+        allowed_sql, allowed_params = queryset.order_by().values('pk').query.sql_with_params()
+        conditions.append(f" AND ({prefix}content_type_id <> %s OR {prefix}object_id IN ({allowed_sql}))")
+        params += [content_type_id, *allowed_params]
+    return ''.join(conditions), params
+
+
+def _ranked_matches(query, content_type_ids, limit, allowed=None):
+    """
+    Returns [(content_type_id, object_id, rank)] best-first. allowed
+    ({content_type_id: queryset}) is applied in the same query, so hidden
+    objects never take up any of the limit.
+    """
+    allowed = allowed or {}
+    placeholders = ', '.join(['%s'] * len(content_type_ids))
+    if connection.vendor == 'postgresql':
+        visibility, visibility_params = _visibility_sql(allowed, '')
+        sql = (
+            "SELECT content_type_id, object_id, ts_rank_cd(document, query) AS rank "
+            "FROM search_searchentry, websearch_to_tsquery('english', %s) query "
+            f"WHERE document @@ query AND content_type_id IN ({placeholders}){visibility} "
+            "ORDER BY rank DESC, id LIMIT %s"
+        )
+        params = [query, *content_type_ids, *visibility_params, limit]
+    elif connection.vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return []
+        visibility, visibility_params = _visibility_sql(allowed, 'e.')
+        sql = (
+            f"SELECT e.content_type_id, e.object_id, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank "
+            f"FROM {FTS_TABLE} JOIN search_searchentry e ON e.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.content_type_id IN ({placeholders}){visibility} "
+            "ORDER BY rank DESC, e.id LIMIT %s"
+        )
+        params = [match, *content_type_ids, *visibility_params, limit]
+    else:
+        entries = SearchEntry.objects.filter(
+            Q(title__icontains=query) | Q(body__icontains=query),
+            content_type_id__in=content_type_ids,
+        )
+        for content_type_id, queryset in allowed.items():
+            entries = entries.filter(~Q(content_type_id=content_type_id) | Q(object_id__in=queryset.values('pk')))
+        rows = entries.values_list('content_type_id', 'object_id')[:limit]
+        return [(content_type_id, object_id, 0.0) for content_type_id, object_id in rows]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def filter_matching(queryset, query):
+    """
+    Narrows queryset (of a registered model) to the objects matching query.
+    The match is a subquery in the same SQL statement, so the caller's own
+    filters and ordering apply to every match, not to a capped top-N.
+    """
+    content_type_id = ContentType.objects.get_for_model(queryset.model).id
+    if connection.vendor == 'postgresql':
+        sql = (
+            "SELECT object_id FROM search_searchentry "
+            "WHERE content_type_id = %s AND document @@ websearch_to_tsquery('english', %s)"
+        )
+        params = [content_type_id, query]
+    elif connection.vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return queryset.none()
+        sql = (
+            f"SELECT e.object_id FROM {FTS_TABLE} JOIN search_searchentry e ON e.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.content_type_id = %s"
+        )
+        params = [match, content_type_id]
+    else:
+        entries = SearchEntry.objects.filter(Q(title__icontains=query) | Q(body__icontains=query),
+                                             content_type_id=content_type_id)
+        return queryset.filter(pk__in=entries.values('object_id'))
+    return queryset.filter(pk__in=RawSQL(sql, params))
+
+
+def search(query, request=None, models=None, limit=DEFAULT_LIMIT):
+    """
+    Ranked search across the registered models (or the given subset). Returns a
+    list of {'object', 'model_name', 'rank'} dicts, best first, resolving the
+    matched objects with one query per model.
+    """
+    query = (query or '').strip()
+    models = [model for model in (models or registered_models()) if model in _registry]
+    if not query or not models:
+        return []
+
+    content_types = ContentType.objects.get_for_models(*models)
+    models_by_ct = {content_type.id: model for model, content_type in content_types.items()}
+    querysets, allowed = {}, {}
+    for content_type_id, model in models_by_ct.items():
+        restrict = _registry[model]['queryset']
+        if restrict and request is not None:
+            querysets[content_type_id] = allowed[content_type_id] = restrict(request)
+        else:
+            querysets[content_type_id] = model._default_manager.all()
+    # Visibility is part of the ranked query, so objects the user can't see don't use up the limit
+    matches = _ranked_matches(query, list(models_by_ct), limit, allowed)
+
+    ids_by_ct = {}
+    for content_type_id, object_id, _ in matches:
+        ids_by_ct.setdefault(content_type_id, []).append(object_id)
+
+    objects = {}
+    for content_type_id, ids in ids_by_ct.items():
+        model = models_by_ct[content_type_id]
+        for obj in querysets[content_type_id].filter(pk__in=ids):
+            objects[(model, obj.pk)] = obj
+
+    results = []
+    for content_type_id, object_id, rank in matches:
+        model = models_by_ct[content_type_id]
+        obj = objects.get((model, object_id))
+        if obj is not None: # Skips stale entries
+            results.append({'object': obj, 'model_name': model._meta.model_name, 'rank': rank})
+    return results
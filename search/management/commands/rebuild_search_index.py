@@ -0,0 +1,30 @@
+# search/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search import index
+from search.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search entries for every registered model."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Objects indexed per INSERT.")
+
+    def handle(self, *args, **options):
+        total = 0
+        with transaction.atomic():
+            SearchEntry.objects.all().delete()
+            for model in index.registered_models():
+                count = 0
+                batch = []
+                for obj in model._default_manager.all().iterator(chunk_size=options['batch_size']):
+                    batch.append(obj)
+                    if len(batch) >= options['batch_size']:
+                        count += index.index_objects(batch, options['batch_size'])
+                        batch = []
+                count += index.index_objects(batch, options['batch_size'])
+                self.stdout.write(f"Indexed {count} {model._meta.verbose_name_plural}.")
+                total += count
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index with {total} entries."))
@@ -0,0 +1,96 @@
+# Creates the backend-specific full-text index next to search_searchentry and
+# fills it from the existing events, clubs and announcements.
+
+from django.db import migrations
+from django.utils import timezone
+
+POSTGRES_FORWARD = [
+    # Generated column: PostgreSQL keeps the tsvector current on every insert/update
+    "ALTER TABLE search_searchentry ADD COLUMN document tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED",
+    "CREATE INDEX search_searchentry_document_gin ON search_searchentry USING GIN (document)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS search_searchentry_document_gin",
+    "ALTER TABLE search_searchentry DROP COLUMN IF EXISTS document",
+]
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table over search_searchentry, kept in sync by triggers
+    "CREATE VIRTUAL TABLE search_searchentry_fts USING fts5("
+    "title, body, content='search_searchentry', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER search_searchentry_ai AFTER INSERT ON search_searchentry BEGIN "
+    "INSERT INTO search_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_searchentry_ad AFTER DELETE ON search_searchentry BEGIN "
+    "INSERT INTO search_searchentry_fts(search_searchentry_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_searchentry_au AFTER UPDATE ON search_searchentry BEGIN "
+    "INSERT INTO search_searchentry_fts(search_searchentry_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS search_searchentry_au",
+    "DROP TRIGGER IF EXISTS search_searchentry_ad",
+    "DROP TRIGGER IF EXISTS search_searchentry_ai",
+    "DROP TABLE IF EXISTS search_searchentry_fts",
+]
+
+# (app_label, model_name, title field, body fields) - mirrors the registrations in search/signals.py
+INDEXED_MODELS = [
+    ('events', 'Event', 'title', ['description', 'location']),
+    ('clubs', 'Club', 'title', ['description']),
+    ('announcements', 'Announcement', 'title', ['content']),
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+
+
+def backfill_entries(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    SearchEntry = apps.get_model('search', 'SearchEntry')
+    now = timezone.now()
+    for app_label, model_name, title, body in INDEXED_MODELS:
+        model = apps.get_model(app_label, model_name)
+        content_type = ContentType.objects.get_for_model(model)
+        entries = []
+        for obj in model.objects.all().iterator():
+            body_text = '\n'.join(getattr(obj, field) or '' for field in body if getattr(obj, field))
+            entries.append(SearchEntry(content_type=content_type, object_id=obj.pk,
+                                       title=(getattr(obj, title) or '')[:255], body=body_text, updated_at=now))
+        SearchEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        ('announcements', '0003_feed_indexes'),
+        ('clubs', '0002_single_membership_table'),
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(backfill_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# search/models.py
+from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+
+class SearchEntry(models.Model):
+    """
+    One row of searchable text per indexed object (Event, Club, Announcement).
+    The full-text index itself lives beside this table and is created by the
+    migration for the active backend: a generated tsvector column with a GIN
+    index on PostgreSQL, or an FTS5 virtual table kept in sync by triggers on SQLite.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('content_type', 'object_id') # One entry per indexed object
+        verbose_name_plural = "Search entries"
+
+    def __str__(self):
+        return f"{self.content_type.model}: {self.title}"
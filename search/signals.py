@@ -0,0 +1,27 @@
+# search/signals.py
+from django.db.models.signals import post_save, post_delete
+
+from announcements.feed import visible_announcements
+from announcements.models import Announcement
+from clubs.models import Club
+from events.models import Event
+from . import index
+
+index.register(Event, title='title', body=['description', 'location'])
+index.register(Club, title='title', body=['description'])
+index.register(Announcement, title='title', body=['content'],
+               queryset=lambda request: visible_announcements(request.user))
+
+
+def update_search_entry(sender, instance, raw=False, **kwargs):
+    if not raw: # Skip fixture loading
+        index.index_objects([instance])
+
+
+def remove_search_entry(sender, instance, **kwargs):
+    index.unindex_object(instance)
+
+
+for model in index.registered_models():
+    post_save.connect(update_search_entry, sender=model, dispatch_uid=f'search_index_{model._meta.label_lower}')
+    post_delete.connect(remove_search_entry, sender=model, dispatch_uid=f'search_unindex_{model._meta.label_lower}')
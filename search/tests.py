@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from announcements.models import Announcement
+from clubs.models import Club
+from . import index
+
+User = get_user_model()
+
+
+# Visible club sets are cached; a private cache keeps other runs' entries (for the same user ids) out
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'search-tests'}})
+class SearchVisibilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        manager = User.objects.create_user('manager', 'manager@example.com', None, user_type='club_officer')
+        self.private = Club.objects.create(title='Chess', description='Chess club', manager=manager)
+        self.student = User.objects.create_user('student', 'student@example.com', None)
+        # Better matches than the global one (the term is in the title), but only for the club's members
+        for n in range(30):
+            Announcement.objects.create(title=f'Robotics meetup {n}', content='Members only', author=manager,
+                                        is_global=False, club=self.private)
+        self.visible = Announcement.objects.create(title='Open day', content='Robotics demos for everyone',
+                                                   author=manager, is_global=True)
+
+    def search(self, user, limit=5):
+        request = RequestFactory().get('/search/')
+        request.user = user
+        return [result['object'] for result in index.search('robotics', request=request, models=[Announcement], limit=limit)]
+
+    def test_hidden_matches_do_not_crowd_out_visible_ones(self):
+        self.assertEqual(self.search(self.student), [self.visible])
+
+    def test_members_see_their_clubs_announcements(self):
+        self.private.add_member(self.student)
+
+        results = self.search(self.student)
+
+        self.assertEqual(len(results), 5)
+        self.assertNotIn(self.visible, results) # Outranked by the title matches
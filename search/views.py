@@ -0,0 +1,25 @@
+# search/views.py
+from django.shortcuts import render
+from django.views import View
+
+from . import index
+
+class SearchView(View):
+    """Site-wide ranked search over events, clubs and announcements."""
+    template_name = 'search/search_results.html'
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        models_by_name = {model._meta.model_name: model for model in index.registered_models()}
+        selected_type = request.GET.get('type', '')
+
+        models = [models_by_name[selected_type]] if selected_type in models_by_name else None
+        results = index.search(query, request=request, models=models) if query else []
+
+        context = {
+            'query': query,
+            'results': results,
+            'selected_type': selected_type,
+            'search_types': sorted(models_by_name),
+        }
+        return render(request, self.template_name, context)